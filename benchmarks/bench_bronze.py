@@ -0,0 +1,176 @@
+"""Throughput benchmark of the bronze cleaning step per engine and file size.
+
+Each case runs in a fresh interpreter so the peak RSS it reports belongs to
+that engine alone. Usage from the repository root:
+
+    python -m benchmarks.bench_bronze --sizes 1e4 1e5 1e6
+    python -m benchmarks.bench_bronze --sizes 1e5 --save-baseline
+    python -m benchmarks.bench_bronze --sizes 1e5 --check
+
+``--check`` exits with status 1 when a case is slower or uses more memory
+than the stored baseline beyond ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from src.metrics import StageMetrics, peak_rss_bytes
+from src.synthetic import generate_transactions
+from src.transformations import RAW_FILE_TEMPLATE
+
+BASELINE_PATH = Path(__file__).parent / "baseline_bronze.json"
+BENCH_DAY = date(2025, 12, 1)
+
+# Name -> clean_daily_transactions kwargs
+CASES = {
+    "pandas": {"engine": "pandas"},
+    "pandas_streaming": {"engine": "pandas", "batch_size": 100_000},
+    "arrow": {"engine": "arrow"},
+    "duckdb": {"engine": "duckdb"},
+}
+
+
+def _worker(raw_dir: Path, clean_dir: Path, case: str) -> None:
+    """Run one case in this process and print its measurements as JSON."""
+    # pylint: disable=import-outside-toplevel
+    from src.transformations import clean_daily_transactions
+
+    metrics = StageMetrics(stage="bronze")
+    start = time.perf_counter()
+    clean_daily_transactions(BENCH_DAY, raw_dir, clean_dir, metrics=metrics, **CASES[case])
+    wall_seconds = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "wall_seconds": wall_seconds,
+                "peak_rss_bytes": peak_rss_bytes(),
+                "fingerprint_bytes": metrics.details.get("fingerprint_bytes"),
+            }
+        )
+    )
+
+
+def run_case(raw_dir: Path, clean_dir: Path, case: str, rows: int) -> dict:
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_bronze",
+            "--worker",
+            case,
+            "--raw-dir",
+            str(raw_dir),
+            "--clean-dir",
+            str(clean_dir),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    measured = json.loads(process.stdout.strip().splitlines()[-1])
+    return {
+        "case": case,
+        "rows": rows,
+        "wall_seconds": measured["wall_seconds"],
+        "rows_per_second": rows / measured["wall_seconds"],
+        "peak_rss_bytes": measured["peak_rss_bytes"],
+        "fingerprint_bytes": measured["fingerprint_bytes"],
+    }
+
+
+def run_benchmark(sizes: list[int], cases: list[str], work_dir: Path) -> list[dict]:
+    results = []
+    for size in sizes:
+        raw_dir = work_dir / f"raw_{size}"
+        raw_path = raw_dir / RAW_FILE_TEMPLATE.format(ds_nodash=BENCH_DAY.strftime("%Y%m%d"))
+        if not raw_path.exists():
+            generate_transactions(raw_path, size, day=BENCH_DAY)
+        for case in cases:
+            result = run_case(raw_dir, work_dir / f"clean_{size}_{case}", case, size)
+            results.append(result)
+            print(
+                f"{case:>18} {size:>11,} rows  {result['wall_seconds']:8.2f}s  "
+                f"{result['rows_per_second']:>12,.0f} rows/s  "
+                f"{result['peak_rss_bytes'] / 2**20:8.1f} MiB peak RSS"
+            )
+            if result["fingerprint_bytes"] is not None:
+                fingerprint_mib = result["fingerprint_bytes"] / 2**20
+                print(f"{'':>18} {fingerprint_mib:8.1f} MiB of row fingerprints")
+    return results
+
+
+def find_regressions(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Cases slower or heavier than the baseline by more than ``tolerance``."""
+    reference = {(item["case"], item["rows"]): item for item in baseline}
+    regressions = []
+    for result in results:
+        base = reference.get((result["case"], result["rows"]))
+        if base is None:
+            continue
+        if result["rows_per_second"] < base["rows_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{result['case']} @ {result['rows']:,}: {result['rows_per_second']:,.0f} rows/s "
+                f"vs baseline {base['rows_per_second']:,.0f}"
+            )
+        if result["peak_rss_bytes"] > base["peak_rss_bytes"] * (1 + tolerance):
+            regressions.append(
+                f"{result['case']} @ {result['rows']:,}: {result['peak_rss_bytes']:,} bytes "
+                f"peak RSS vs baseline {base['peak_rss_bytes']:,}"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e4, 1e5])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--work-dir", type=Path, help="keeps generated files between runs")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--worker", choices=list(CASES), help=argparse.SUPPRESS)
+    parser.add_argument("--raw-dir", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--clean-dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.raw_dir, args.clean_dir, args.worker)
+        return 0
+
+    sizes = [int(size) for size in args.sizes]
+    if args.work_dir:
+        results = run_benchmark(sizes, args.cases, args.work_dir)
+    else:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results = run_benchmark(sizes, args.cases, Path(tmpdir))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.check:
+        if not args.baseline.exists():
+            print(f"No baseline at {args.baseline}, run with --save-baseline first")
+            return 1
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""DAG parse benchmark: what the scheduler's DAG processor pays per parse of dags/.
+
+Each repetition runs in a fresh interpreter, as the DAG processor parses
+files in child processes. Airflow is imported before the clock starts,
+since the processor already has it loaded. The worker then times a
+``DagBag`` load of the DAG folder and lists the HEAVY_MODULES the parse
+imported. The parse is also reported relative to the time the same
+interpreter took to import Airflow, a baseline that scales with the
+machine. Usage from the repository root:
+
+    python -m benchmarks.bench_dag_parse --repeat 10
+    python -m benchmarks.bench_dag_parse --repeat 10 --check
+
+``--check`` exits with status 1 when the median parse is slower than
+``--budget`` seconds or PARSE_BUDGET_RATIO of the Airflow import, or when
+a parse imports any of HEAVY_MODULES.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+DAGS_DIR = Path(__file__).resolve().parents[1] / "dags"
+# Only the task callables may import these
+HEAVY_MODULES = ("pandas", "pyarrow", "numpy", "duckdb", "dbt", "src")
+PARSE_BUDGET_SECONDS = 0.25
+# Parse time over the bare Airflow import time: about 0.01 when only Airflow
+# and the stdlib are imported, above 0.2 with pandas, pyarrow and DuckDB
+PARSE_BUDGET_RATIO = 0.1
+
+
+def _worker(dags_dir: Path) -> None:
+    """Parse the DAG folder in this process and print the measurements as JSON."""
+    start = time.perf_counter()
+    # pylint: disable=import-outside-toplevel
+    from airflow.models.dagbag import DagBag
+
+    airflow_import_seconds = time.perf_counter() - start
+    loaded = set(sys.modules)
+    start = time.perf_counter()
+    dagbag = DagBag(str(dags_dir), include_examples=False)
+    parse_seconds = time.perf_counter() - start
+    imported = {name.split(".")[0] for name in set(sys.modules) - loaded}
+    errors = {path: str(error) for path, error in dagbag.import_errors.items()}
+    print(
+        json.dumps(
+            {
+                "parse_seconds": parse_seconds,
+                "airflow_import_seconds": airflow_import_seconds,
+                "dag_ids": sorted(dagbag.dag_ids),
+                "import_errors": errors,
+                "heavy_modules": sorted(imported.intersection(HEAVY_MODULES)),
+            }
+        )
+    )
+
+
+def parse_once(dags_dir: Path = DAGS_DIR) -> dict:
+    """Parse ``dags_dir`` in a fresh interpreter and return the worker's measurements."""
+    process = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_dag_parse", "--worker", str(dags_dir)],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(repeat: int, dags_dir: Path = DAGS_DIR) -> dict:
+    runs = [parse_once(dags_dir) for _ in range(repeat)]
+    seconds = sorted(run["parse_seconds"] for run in runs)
+    return {
+        "repeat": repeat,
+        "median_seconds": statistics.median(seconds),
+        "max_seconds": seconds[-1],
+        "median_ratio": statistics.median(
+            run["parse_seconds"] / run["airflow_import_seconds"] for run in runs
+        ),
+        "dag_ids": runs[0]["dag_ids"],
+        "import_errors": runs[0]["import_errors"],
+        "heavy_modules": sorted({name for run in runs for name in run["heavy_modules"]}),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=PARSE_BUDGET_SECONDS)
+    parser.add_argument("--check", action="store_true", help="fail over the budget")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker)
+        return 0
+
+    result = run_benchmark(args.repeat)
+    print(
+        f"{len(result['dag_ids'])} DAGs  median {result['median_seconds'] * 1e3:7.1f} ms  "
+        f"max {result['max_seconds'] * 1e3:7.1f} ms  "
+        f"vs airflow import {result['median_ratio']:.3f}  "
+        f"heavy modules: {', '.join(result['heavy_modules']) or 'none'}"
+    )
+    for path, error in result["import_errors"].items():
+        print(f"IMPORT ERROR {path}: {error}")
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    if args.check:
+        over_budget = (
+            result["median_seconds"] > args.budget
+            or result["median_ratio"] > PARSE_BUDGET_RATIO
+        )
+        if over_budget:
+            print(
+                f"OVER BUDGET median parse above {args.budget * 1e3:.0f} ms "
+                f"or {PARSE_BUDGET_RATIO:.0%} of the airflow import"
+            )
+        return 1 if over_budget or result["heavy_modules"] or result["import_errors"] else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Bronze-to-warehouse handoff benchmark: parquet round-trip vs zero-copy Arrow.
+
+``parquet`` cleans the day to parquet and loads it into the warehouse with
+``read_parquet``, as stg_transactions does; ``arrow`` hands the clean Arrow
+table to warehouse.load_clean_table while the parquet is written in the
+background. Each case runs in a fresh interpreter. Usage from the repository
+root:
+
+    python -m benchmarks.bench_handoff --sizes 1e5 1e6
+    python -m benchmarks.bench_handoff --sizes 1e6 --engines duckdb
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_bronze import BENCH_DAY
+from src.metrics import peak_rss_bytes
+from src.synthetic import generate_transactions
+from src.transformations import ENGINES, RAW_FILE_TEMPLATE
+
+MODES = ("parquet", "arrow")
+
+
+def _worker(raw_dir: Path, work_dir: Path, engine: str, mode: str) -> None:
+    """Clean and load one day in this process and print its measurements as JSON."""
+    # pylint: disable=import-outside-toplevel
+    import duckdb
+
+    from src.metrics import StageMetrics
+    from src.transformations import clean_daily_transactions
+    from src.warehouse import BRONZE_COLUMNS, BRONZE_TABLE, load_clean_table
+
+    ds_nodash = BENCH_DAY.strftime("%Y%m%d")
+    metrics = StageMetrics(stage="bronze")
+    start = time.perf_counter()
+    with duckdb.connect(str(work_dir / "warehouse.duckdb")) as con:
+        if mode == "arrow":
+            clean_daily_transactions(
+                BENCH_DAY,
+                raw_dir,
+                work_dir / "clean",
+                engine=engine,
+                metrics=metrics,
+                handoff=functools.partial(load_clean_table, con, ds_nodash),
+            )
+        else:
+            clean_path = clean_daily_transactions(
+                BENCH_DAY, raw_dir, work_dir / "clean", engine=engine, metrics=metrics
+            )
+            load_start = time.perf_counter()
+            columns = ", ".join(f"{name} {kind}" for name, kind in BRONZE_COLUMNS.items())
+            con.execute(f"CREATE TABLE IF NOT EXISTS {BRONZE_TABLE} ({columns}, ds_nodash VARCHAR)")
+            con.execute(f"DELETE FROM {BRONZE_TABLE} WHERE ds_nodash = ?", [ds_nodash])
+            con.execute(
+                f"INSERT INTO {BRONZE_TABLE} SELECT {', '.join(BRONZE_COLUMNS)}, ? "
+                "FROM read_parquet(?)",
+                [ds_nodash, str(clean_path)],
+            )
+            metrics.timings["handoff"] = time.perf_counter() - load_start
+    wall_seconds = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "wall_seconds": wall_seconds,
+                "handoff_seconds": metrics.timings.get("handoff", 0.0),
+                "write_seconds": metrics.timings.get("write", 0.0),
+                "peak_rss_bytes": peak_rss_bytes(),
+            }
+        )
+    )
+
+
+def run_case(raw_dir: Path, work_dir: Path, engine: str, mode: str, rows: int) -> dict:
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_handoff",
+            "--worker",
+            engine,
+            mode,
+            "--raw-dir",
+            str(raw_dir),
+            "--work-dir",
+            str(work_dir),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    measured = json.loads(process.stdout.strip().splitlines()[-1])
+    return {
+        "engine": engine,
+        "mode": mode,
+        "rows": rows,
+        **measured,
+        "rows_per_second": rows / measured["wall_seconds"],
+    }
+
+
+def run_benchmark(
+    sizes: list[int], engines: list[str], work_dir: Path, repeat: int
+) -> list[dict]:
+    results = []
+    for size in sizes:
+        raw_dir = work_dir / f"raw_{size}"
+        raw_path = raw_dir / RAW_FILE_TEMPLATE.format(ds_nodash=BENCH_DAY.strftime("%Y%m%d"))
+        if not raw_path.exists():
+            generate_transactions(raw_path, size, day=BENCH_DAY)
+        for engine in engines:
+            for mode in MODES:
+                case_dir = work_dir / f"handoff_{size}_{engine}_{mode}"
+                case_dir.mkdir(parents=True, exist_ok=True)
+                # Best of ``repeat`` runs, the warehouse day is replaced each time
+                result = min(
+                    (run_case(raw_dir, case_dir, engine, mode, size) for _ in range(repeat)),
+                    key=lambda item: item["wall_seconds"],
+                )
+                results.append(result)
+                print(
+                    f"{engine:>7} {mode:>8} {size:>11,} rows  {result['wall_seconds']:8.2f}s  "
+                    f"{result['rows_per_second']:>12,.0f} rows/s  "
+                    f"load {result['handoff_seconds']:6.2f}s  "
+                    f"{result['peak_rss_bytes'] / 2**20:8.1f} MiB peak RSS"
+                )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e5])
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--work-dir", type=Path, help="keeps generated files between runs")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--worker", nargs=2, metavar=("ENGINE", "MODE"), help=argparse.SUPPRESS)
+    parser.add_argument("--raw-dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.raw_dir, args.work_dir, *args.worker)
+        return 0
+
+    sizes = [int(size) for size in args.sizes]
+    if args.work_dir:
+        results = run_benchmark(sizes, args.engines, args.work_dir, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results = run_benchmark(sizes, args.engines, Path(tmpdir), args.repeat)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
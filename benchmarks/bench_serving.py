@@ -0,0 +1,152 @@
+"""Read API benchmark: latency and throughput of customer metric lookups.
+
+A warehouse with a synthetic fct_customer_transactions of ``--customers``
+rows is published as a serving snapshot, then each case looks up random
+customer_ids:
+
+- ``adhoc``: open the warehouse, query and close per lookup, as readers did
+  before the read API
+- ``point``: CustomerMetricsReader.get without cache
+- ``point_cached``: the same lookups again, answered from the LRU cache
+- ``batch_<n>``: CustomerMetricsReader.get_many of n ids without cache
+
+Usage from the repository root:
+
+    python -m benchmarks.bench_serving --customers 1e6
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import duckdb
+
+from src.serving import SERVING_TABLE, CustomerMetricsReader, publish_snapshot
+
+
+def _build_warehouse(path: Path, customers: int) -> None:
+    with duckdb.connect(str(path)) as con:
+        con.execute(
+            f"""
+            CREATE OR REPLACE TABLE {SERVING_TABLE} AS
+            SELECT
+                (1000 + i)::BIGINT AS customer_id,
+                (1 + i % 50)::BIGINT AS transaction_count,
+                round(random() * 10000, 2) AS total_amount_completed,
+                round(random() * 20000, 2) AS total_amount_all
+            FROM range(?) AS t(i)
+            """,
+            [customers],
+        )
+
+
+def _measure(
+    name: str, lookup: Callable[[list[int]], object], batches: list, threads: int
+) -> dict:
+    latencies = []
+
+    def timed(batch):
+        start = time.perf_counter()
+        lookup(batch)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(timed, batches))
+    else:
+        for batch in batches:
+            timed(batch)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    result = {
+        "case": name,
+        "requests": len(batches),
+        "ids_per_request": len(batches[0]),
+        "p50_ms": statistics.median(latencies) * 1e3,
+        "p99_ms": latencies[max(0, math.ceil(len(latencies) * 0.99) - 1)] * 1e3,
+        "lookups_per_second": sum(len(batch) for batch in batches) / elapsed,
+    }
+    print(
+        f"{name:>14}  p50 {result['p50_ms']:8.3f} ms  p99 {result['p99_ms']:8.3f} ms  "
+        f"{result['lookups_per_second']:>12,.0f} lookups/s"
+    )
+    return result
+
+
+def run_benchmark(
+    customers: int, requests: int, batch_sizes: list[int], threads: int, work_dir: Path
+) -> list[dict]:
+    warehouse_path = work_dir / "warehouse.duckdb"
+    serving_dir = work_dir / "serving"
+    _build_warehouse(warehouse_path, customers)
+    with duckdb.connect(str(warehouse_path)) as con:
+        publish_snapshot(con, serving_dir, "bench")
+
+    rng = random.Random(0)
+    point_ids = [[1000 + rng.randrange(customers)] for _ in range(requests)]
+
+    def adhoc(batch: list[int]) -> list:
+        with duckdb.connect(str(warehouse_path), read_only=True) as con:
+            return con.execute(
+                f"SELECT * FROM {SERVING_TABLE} WHERE customer_id = ?", batch
+            ).fetchall()
+
+    results = [_measure("adhoc", adhoc, point_ids, threads=1)]
+
+    uncached = CustomerMetricsReader(serving_dir, pool_size=max(1, threads), cache_size=0)
+    cached = CustomerMetricsReader(serving_dir, pool_size=max(1, threads), cache_size=requests)
+    results.append(_measure("point", uncached.get_many, point_ids, threads))
+    for batch in point_ids:
+        cached.get_many(batch)
+    results.append(_measure("point_cached", cached.get_many, point_ids, threads))
+    for size in batch_sizes:
+        batches = [
+            [1000 + rng.randrange(customers) for _ in range(size)]
+            for _ in range(max(1, requests // size))
+        ]
+        results.append(_measure(f"batch_{size}", uncached.get_many, batches, threads))
+    uncached.close()
+    cached.close()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=float, default=1e5)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[100, 1000])
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--work-dir", type=Path, help="keeps the generated warehouse")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    args = parser.parse_args()
+
+    customers = int(args.customers)
+    if args.work_dir:
+        args.work_dir.mkdir(parents=True, exist_ok=True)
+        results = run_benchmark(
+            customers, args.requests, args.batch_sizes, args.threads, args.work_dir
+        )
+    else:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results = run_benchmark(
+                customers, args.requests, args.batch_sizes, args.threads, Path(tmpdir)
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Staging materialization benchmark: ``dbt run`` and ``dbt test`` wall time per mode.
+
+The benchmark day is cleaned once, then for each STAGING_MATERIALIZATION a
+fresh warehouse is built with ``dbt run`` and checked with ``dbt test``. With
+``view`` every test that reads stg_transactions scans the clean parquet
+again; with ``incremental`` the day is scanned once by ``dbt run`` and the
+tests read the DuckDB table. Each case runs in a fresh interpreter. Usage
+from the repository root:
+
+    python -m benchmarks.bench_staging --sizes 1e6
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.bench_bronze import BENCH_DAY
+from src.synthetic import generate_transactions
+from src.transformations import RAW_FILE_TEMPLATE, clean_daily_transactions
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+DBT_DIR = REPO_DIR / "dbt"
+PROFILES_DIR = REPO_DIR / "profiles"
+MATERIALIZATIONS = ("view", "incremental")
+
+
+def _worker(work_dir: Path, materialization: str) -> None:
+    """Build and test a fresh warehouse and print the measurements as JSON."""
+    # pylint: disable=import-outside-toplevel
+    from src.dbt_runner import run_dbt
+
+    warehouse_path = work_dir / f"warehouse_{materialization}.duckdb"
+    warehouse_path.unlink(missing_ok=True)
+    env = {
+        **os.environ,
+        "DBT_PROFILES_DIR": os.environ.get("DBT_PROFILES_DIR", str(PROFILES_DIR)),
+        "CLEAN_DIR": str(work_dir / "clean"),
+        "DS_NODASH": BENCH_DAY.strftime("%Y%m%d"),
+        "DUCKDB_PATH": str(warehouse_path),
+        "STAGING_MATERIALIZATION": materialization,
+    }
+    measured = {}
+    for command in ("run", "test"):
+        invocation = run_dbt(command, DBT_DIR, env)
+        if not invocation.success:
+            raise RuntimeError(f"dbt {command} failed:\n{invocation.stdout}\n{invocation.stderr}")
+        measured[f"{command}_seconds"] = invocation.elapsed_seconds
+        measured[f"{command}_nodes"] = len(invocation.nodes)
+    print(json.dumps(measured))
+
+
+def run_case(work_dir: Path, materialization: str, rows: int) -> dict:
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_staging",
+            "--worker",
+            materialization,
+            "--work-dir",
+            str(work_dir),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    measured = json.loads(process.stdout.strip().splitlines()[-1])
+    return {"materialization": materialization, "rows": rows, **measured}
+
+
+def run_benchmark(
+    sizes: list[int], materializations: list[str], work_dir: Path, repeat: int
+) -> list[dict]:
+    results = []
+    for size in sizes:
+        raw_dir = work_dir / f"raw_{size}"
+        raw_path = raw_dir / RAW_FILE_TEMPLATE.format(ds_nodash=BENCH_DAY.strftime("%Y%m%d"))
+        if not raw_path.exists():
+            generate_transactions(raw_path, size, day=BENCH_DAY)
+        case_dir = work_dir / f"staging_{size}"
+        clean_daily_transactions(BENCH_DAY, raw_dir, case_dir / "clean", engine="duckdb")
+        for materialization in materializations:
+            # Best of ``repeat`` runs, each one with its own warehouse
+            runs = [run_case(case_dir, materialization, size) for _ in range(repeat)]
+            result = {
+                **runs[0],
+                "run_seconds": min(run["run_seconds"] for run in runs),
+                "test_seconds": min(run["test_seconds"] for run in runs),
+            }
+            results.append(result)
+            print(
+                f"{materialization:>11} {size:>11,} rows  "
+                f"run {result['run_seconds']:6.2f}s  "
+                f"test {result['test_seconds']:6.2f}s ({result['test_nodes']} tests)"
+            )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e5])
+    parser.add_argument(
+        "--materializations", nargs="+", choices=MATERIALIZATIONS, default=list(MATERIALIZATIONS)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--work-dir", type=Path, help="keeps generated files between runs")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--worker", choices=MATERIALIZATIONS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.work_dir, args.worker)
+        return 0
+
+    sizes = [int(size) for size in args.sizes]
+    if args.work_dir:
+        results = run_benchmark(sizes, args.materializations, args.work_dir, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results = run_benchmark(sizes, args.materializations, Path(tmpdir), args.repeat)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
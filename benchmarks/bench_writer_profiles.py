@@ -0,0 +1,164 @@
+"""Parquet writer profile benchmark: file size, write time and dbt mart build time.
+
+For each WRITER_PROFILES entry the benchmark day is cleaned with that profile
+and ``dbt run`` builds int_customer_transactions_daily and
+fct_customer_transactions from it into a fresh warehouse. The mart build time
+is the execution time dbt reports for those two models, the ones that scan
+and group the clean parquet by customer_id. Each case runs in a fresh
+interpreter. Usage from the repository root:
+
+    python -m benchmarks.bench_writer_profiles --sizes 1e6
+    python -m benchmarks.bench_writer_profiles --engine duckdb --profiles default clustered
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.bench_bronze import BENCH_DAY
+from src.synthetic import generate_transactions
+from src.transformations import ENGINES, RAW_FILE_TEMPLATE
+from src.writer_profiles import WRITER_PROFILES
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+DBT_DIR = REPO_DIR / "dbt"
+PROFILES_DIR = REPO_DIR / "profiles"
+# Models whose build time depends on how the clean parquet is laid out
+MART_MODELS = (
+    "model.medallion_dbt.int_customer_transactions_daily",
+    "model.medallion_dbt.fct_customer_transactions",
+)
+
+
+def _worker(raw_dir: Path, work_dir: Path, engine: str, profile: str) -> None:
+    """Clean the day with ``profile``, build the marts and print the measurements as JSON."""
+    # pylint: disable=import-outside-toplevel
+    from src.dbt_runner import run_dbt
+    from src.metrics import StageMetrics
+    from src.transformations import clean_daily_transactions
+
+    ds_nodash = BENCH_DAY.strftime("%Y%m%d")
+    clean_dir = work_dir / "clean"
+    warehouse_path = work_dir / "warehouse.duckdb"
+    warehouse_path.unlink(missing_ok=True)
+    metrics = StageMetrics(stage="bronze")
+    clean_daily_transactions(
+        BENCH_DAY, raw_dir, clean_dir, engine=engine, metrics=metrics, parquet_profile=profile
+    )
+    invocation = run_dbt(
+        "run",
+        DBT_DIR,
+        {
+            **os.environ,
+            "DBT_PROFILES_DIR": os.environ.get("DBT_PROFILES_DIR", str(PROFILES_DIR)),
+            "CLEAN_DIR": str(clean_dir),
+            "DS_NODASH": ds_nodash,
+            "DUCKDB_PATH": str(warehouse_path),
+        },
+    )
+    if not invocation.success:
+        raise RuntimeError(f"dbt run failed:\n{invocation.stdout}\n{invocation.stderr}")
+    print(
+        json.dumps(
+            {
+                "file_bytes": metrics.bytes_out,
+                "write_seconds": metrics.timings.get("write", 0.0),
+                "mart_seconds": sum(
+                    node["execution_time"]
+                    for node in invocation.nodes
+                    if node["unique_id"] in MART_MODELS
+                ),
+            }
+        )
+    )
+
+
+def run_case(raw_dir: Path, work_dir: Path, engine: str, profile: str, rows: int) -> dict:
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_writer_profiles",
+            "--worker",
+            engine,
+            profile,
+            "--raw-dir",
+            str(raw_dir),
+            "--work-dir",
+            str(work_dir),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    measured = json.loads(process.stdout.strip().splitlines()[-1])
+    return {"engine": engine, "profile": profile, "rows": rows, **measured}
+
+
+def run_benchmark(
+    sizes: list[int], engine: str, profiles: list[str], work_dir: Path, repeat: int
+) -> list[dict]:
+    results = []
+    for size in sizes:
+        raw_dir = work_dir / f"raw_{size}"
+        raw_path = raw_dir / RAW_FILE_TEMPLATE.format(ds_nodash=BENCH_DAY.strftime("%Y%m%d"))
+        if not raw_path.exists():
+            generate_transactions(raw_path, size, day=BENCH_DAY)
+        for profile in profiles:
+            case_dir = work_dir / f"profile_{size}_{engine}_{profile}"
+            case_dir.mkdir(parents=True, exist_ok=True)
+            # Best of ``repeat`` runs, each one with its own warehouse
+            runs = [run_case(raw_dir, case_dir, engine, profile, size) for _ in range(repeat)]
+            result = {
+                **runs[0],
+                "write_seconds": min(run["write_seconds"] for run in runs),
+                "mart_seconds": min(run["mart_seconds"] for run in runs),
+            }
+            results.append(result)
+            print(
+                f"{engine:>7} {profile:>10} {size:>11,} rows  "
+                f"{result['file_bytes'] / 2**20:8.2f} MiB  "
+                f"write {result['write_seconds']:6.2f}s  "
+                f"mart {result['mart_seconds']:6.2f}s"
+            )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e5])
+    parser.add_argument("--engine", choices=ENGINES, default="pandas")
+    parser.add_argument(
+        "--profiles", nargs="+", choices=list(WRITER_PROFILES), default=list(WRITER_PROFILES)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--work-dir", type=Path, help="keeps generated files between runs")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--worker", nargs=2, metavar=("ENGINE", "PROFILE"), help=argparse.SUPPRESS)
+    parser.add_argument("--raw-dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.raw_dir, args.work_dir, *args.worker)
+        return 0
+
+    sizes = [int(size) for size in args.sizes]
+    if args.work_dir:
+        results = run_benchmark(sizes, args.engine, args.profiles, args.work_dir, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results = run_benchmark(sizes, args.engine, args.profiles, Path(tmpdir), args.repeat)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,28 +2,33 @@
 
 from __future__ import annotations
 
+import functools
 import json
-import os
-import subprocess
-import sys
 import logging
-from datetime import datetime
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator
 
 import pendulum
 from airflow import DAG
 from airflow.exceptions import AirflowException, AirflowSkipException
 from airflow.operators.python import PythonOperator
 
-# pylint: disable=import-error,wrong-import-position
+# pylint: disable=import-error,import-outside-toplevel
 
-BASE_DIR = Path(__file__).resolve().parents[1]
-if str(BASE_DIR) not in sys.path:
-    sys.path.append(str(BASE_DIR))
+# El DAG processor vuelve a parsear este archivo en cada loop: acá solo se
+# importan Airflow y la stdlib. pandas, pyarrow, DuckDB, dbt y los módulos de
+# src/ se importan dentro de los callables, cuando corre la task. src/ tiene
+# que estar en el PYTHONPATH de los workers (ver docker-compose.yml).
+if TYPE_CHECKING:
+    from src.data_quality import QualityReport
+    from src.dbt_runner import DbtInvocation
+    from src.metrics import StageMetrics
 
-from src.transformations import (
-    clean_daily_transactions,
-)
+BASE_DIR = Path(__file__).resolve().parents[1]
 
 RAW_DIR = BASE_DIR / "data/raw"
 CLEAN_DIR = BASE_DIR / "data/clean"
@@ -31,40 +36,289 @@ QUALITY_DIR = BASE_DIR / "data/quality"
 DBT_DIR = BASE_DIR / "dbt"
 PROFILES_DIR = BASE_DIR / "profiles"
 WAREHOUSE_PATH = BASE_DIR / "warehouse/medallion.duckdb"
+# Snapshots de solo lectura que sirve src/serving.py, publicados por Gold
+SERVING_DIR = BASE_DIR / "warehouse/serving"
+MANIFEST_PATH = BASE_DIR / "data/manifest.json"
+# transaction_id ya cargados por día, para descartar reenvíos de días anteriores
+ID_INDEX_DIR = BASE_DIR / "data/index/transaction_ids"
+# Módulos cuya lógica determina la salida de Bronze: limpieza y sus motores,
+# perfiles de parquet, índice de IDs y métricas del día
+BRONZE_SOURCES = tuple(
+    BASE_DIR / "src" / module
+    for module in (
+        "transformations.py",
+        "cleaning.py",
+        "pandas_engine.py",
+        "arrow_engine.py",
+        "duckdb_engine.py",
+        "writer_profiles.py",
+        "id_index.py",
+        "metrics.py",
+    )
+)
+# Chunks limpios del día entre las tasks mapeadas de Bronze y la de merge
+CHUNK_DIR = BASE_DIR / "data/chunks"
+CHUNK_PLAN_FILE = "plan.json"
+# Artefactos de profiling por día, cuando se pide (param `profile` o PIPELINE_PROFILE=1)
+PROFILE_DIR = QUALITY_DIR / "profiles"
+# Segundos de un parseo de dbt sin partial_parse.msgpack, para medir lo que ahorra
+# el parseo parcial compartido entre procesos
+DBT_TIMINGS_PATH = QUALITY_DIR / "dbt_parse_timings.json"
+# Archivos del proyecto dbt que afectan lo que carga `dbt run`
+DBT_RUN_SOURCES = (
+    "dbt_project.yml",
+    "models/**/*.sql",
+    "models/**/*.yml",
+    "macros/**/*.sql",
+)
+
+# Motor de limpieza por defecto de la capa Bronze: pandas, arrow o duckdb
+BRONZE_ENGINE = os.environ.get("BRONZE_ENGINE", "pandas")
+# Layout de data/clean: file (un parquet por día) o partitioned (hive por transaction_date)
+CLEAN_LAYOUT = os.environ.get("CLEAN_LAYOUT", "file")
+# De dónde lee Silver: parquet (data/clean) o warehouse (Bronze carga la tabla
+# bronze_transactions directo desde Arrow y el parquet se escribe en paralelo)
+CLEAN_SOURCE = os.environ.get("CLEAN_SOURCE", "parquet")
+# COMPACT_TYPES=1: amount como DECIMAL(18,2) en el parquet y en staging, y cada
+# columna de IDs int32 o int64 según el rango del día (staging usa la más ancha
+# con que se escribió algún día, ver _dbt_id_types)
+COMPACT_TYPES = os.environ.get("COMPACT_TYPES") == "1"
+# Perfil de escritura del parquet limpio (WRITER_PROFILES): default, zstd, clustered o archive
+PARQUET_PROFILE = os.environ.get("PARQUET_PROFILE", "default")
+# stg_transactions como view sobre el parquet o incremental (tabla DuckDB por ds_nodash)
+STAGING_MATERIALIZATION = os.environ.get("STAGING_MATERIALIZATION", "view")
+# Alias de status extra en JSON, p. ej. {"done": "completed"}, sumados a STATUS_MAPPING
+STATUS_ALIASES = json.loads(os.environ.get("STATUS_ALIASES", "{}"))
+# inprocess (dbtRunner, reutiliza el manifest parseado) o subprocess (CLI de dbt)
+DBT_EXECUTION_MODE = os.environ.get("DBT_EXECUTION_MODE", "inprocess")
+# scan: las reglas de column_checks se evalúan con una consulta por modelo
+# (src/data_quality.py) y `dbt test` corre el resto; dbt: todo con `dbt test`
+DQ_ENGINE = os.environ.get("DQ_ENGINE", "scan")
+# Procesos que limpian días en paralelo en el DAG medallion_backfill
+BACKFILL_WORKERS = int(os.environ.get("BACKFILL_WORKERS", os.cpu_count() or 1))
+# Procesos que limpian en paralelo los shards de un día (transactions_<ds>_*.csv[.gz|.zst])
+BRONZE_SHARD_WORKERS = int(os.environ.get("BRONZE_SHARD_WORKERS", os.cpu_count() or 1))
+# BRONZE_CHUNK_BYTES > 0: Bronze parte el día en chunks de ~esos bytes y limpia
+# cada uno en una task mapeada, que el executor reparte entre los workers
+BRONZE_CHUNK_BYTES = int(os.environ.get("BRONZE_CHUNK_BYTES", "0"))
+# Los chunks se limpian con los kernels de arrow, como los shards
+CHUNKED_ENGINE = "arrow"
 
 logger = logging.getLogger(__name__)
 
 
-def _build_env(ds_nodash: str) -> dict[str, str]:
-    """Build environment variables needed by dbt commands."""
+def _force_requested(params: dict | None) -> bool:
+    """El param `force` del DAG (o FORCE_RUN=1) ignora el manifest y re-ejecuta."""
+    return bool((params or {}).get("force")) or os.environ.get("FORCE_RUN") == "1"
+
+
+def _profile_requested(params: dict | None) -> bool:
+    """El param `profile` del DAG (o PIPELINE_PROFILE=1) perfila las tasks del día."""
+    return (
+        bool((params or {}).get("profile")) or os.environ.get("PIPELINE_PROFILE") == "1"
+    )
+
+
+@contextmanager
+def _profiled(stage: str, ds_nodash: str, params: dict | None) -> Iterator[Path | None]:
+    """Perfila el bloque si se pidió profiling y devuelve el directorio de artefactos.
+
+    Sin profiling no importa nada ni mide nada: devuelve None.
+    """
+    if not _profile_requested(params):
+        yield None
+        return
+    from src.profiling import profile_run
+
+    with profile_run(PROFILE_DIR / ds_nodash, stage) as profile_dir:
+        logger.info("Profiling %s for %s into %s", stage, ds_nodash, profile_dir)
+        yield profile_dir
+
+
+def _dbt_id_types() -> dict[str, str]:
+    """
+    Tipo SQL de cada columna de IDs en staging: bigint salvo que todos los días
+    registrados por Bronze la hayan escrito en int32 con COMPACT_TYPES=1. Es la
+    marca más alta del manifest, así un día int64 no vuelve a angostar la tabla.
+    """
+    from src.cleaning import ID_COLUMNS
+    from src.manifest import load_manifest
+
+    if not COMPACT_TYPES:
+        return dict.fromkeys(ID_COLUMNS, "bigint")
+    days = load_manifest(MANIFEST_PATH).get("bronze", {}).values()
+    return {
+        name: (
+            "bigint"
+            if any(
+                not day["inputs"].get("compact_types")
+                or (day.get("id_types") or {}).get(name) == "int64"
+                for day in days
+            )
+            else "integer"
+        )
+        for name in ID_COLUMNS
+    }
+
+
+def _build_env(ds_nodash: str, end_ds_nodash: str | None = None) -> dict[str, str]:
+    """Build environment variables needed by dbt commands.
+
+    With ``end_ds_nodash`` dbt loads every day from ``ds_nodash`` to it.
+    """
     env = os.environ.copy()
     env.update(
         {
             "DBT_PROFILES_DIR": str(PROFILES_DIR),
             "CLEAN_DIR": str(CLEAN_DIR),
+            "CLEAN_LAYOUT": CLEAN_LAYOUT,
+            "CLEAN_SOURCE": CLEAN_SOURCE,
+            "COMPACT_TYPES": "1" if COMPACT_TYPES else "0",
+            **{
+                f"{name.upper()}_TYPE": sql_type
+                for name, sql_type in _dbt_id_types().items()
+            },
+            "STAGING_MATERIALIZATION": STAGING_MATERIALIZATION,
             "DS_NODASH": ds_nodash,
+            "END_DS_NODASH": end_ds_nodash or "",
             "DUCKDB_PATH": str(WAREHOUSE_PATH),
         }
     )
     return env
 
 
-def _run_dbt_command(command: str, ds_nodash: str) -> subprocess.CompletedProcess:
-    """Execute a dbt command and return the completed process."""
-    env = _build_env(ds_nodash)
-    return subprocess.run(
-        [
-            "dbt",
-            command,
-            "--project-dir",
-            str(DBT_DIR),
-        ],
-        cwd=DBT_DIR,
-        env=env,
-        capture_output=True,
-        text=True,
-        check=False,
+def _run_dbt_command(
+    command: str,
+    ds_nodash: str,
+    end_ds_nodash: str | None = None,
+    args: tuple[str, ...] = (),
+    profile_dir: Path | None = None,
+) -> DbtInvocation:
+    """Execute a dbt command (in-process by default) and return its result.
+
+    With ``profile_dir`` dbt runs on the ``profile`` target, which logs the
+    DuckDB metrics of every query to ``profile_dir/duckdb_<command>/``, and
+    ``duckdb_<command>_queries.csv`` lists them one row per query.
+    """
+    from src.dbt_runner import run_dbt
+
+    env = _build_env(ds_nodash, end_ds_nodash)
+    timings_path: Path | None = DBT_TIMINGS_PATH
+    if profile_dir is not None:
+        log_dir = profile_dir / f"duckdb_{command}"
+        shutil.rmtree(log_dir, ignore_errors=True)
+        env["DUCKDB_PROFILE_DIR"] = str(log_dir)
+        args = (*args, "--target", "profile")
+        # Un dbt perfilado no sirve de referencia para el tiempo de parseo
+        timings_path = None
+    result = run_dbt(
+        command,
+        DBT_DIR,
+        env,
+        mode=DBT_EXECUTION_MODE,
+        timings_path=timings_path,
+        args=args,
+    )
+    if profile_dir is not None:
+        from src.profiling import QUERY_LOG_ENTRIES, summarize_query_log
+
+        if (log_dir / QUERY_LOG_ENTRIES).exists():
+            summarize_query_log(log_dir, profile_dir / f"duckdb_{command}_queries.csv")
+    return result
+
+
+def _run_quality_checks(
+    ds_nodash: str, end_ds_nodash: str | None = None, profile_dir: Path | None = None
+) -> tuple[DbtInvocation, QualityReport | None]:
+    """Corre los tests de Gold según DQ_ENGINE.
+
+    Con `scan` las reglas de column_checks se evalúan con una consulta por
+    modelo y `dbt test` excluye esos tests; con `dbt` no hay reporte propio.
+    """
+    from src.data_quality import CHECKS_TEST, load_model_checks, run_model_checks
+
+    if DQ_ENGINE == "dbt":
+        return (
+            _run_dbt_command("test", ds_nodash, end_ds_nodash, profile_dir=profile_dir),
+            None,
+        )
+    checks = run_model_checks(
+        WAREHOUSE_PATH, load_model_checks(DBT_DIR), ds_nodash, end_ds_nodash
+    )
+    result = _run_dbt_command(
+        "test",
+        ds_nodash,
+        end_ds_nodash,
+        args=("--exclude", f"test_name:{CHECKS_TEST}"),
+        profile_dir=profile_dir,
     )
+    return result, checks
+
+
+def _record_node_timings(
+    stage: str,
+    result: DbtInvocation,
+    batch: tuple[str, str],
+    checks: QualityReport | None = None,
+) -> None:
+    """Agrega los nodos de la invocación a la tabla dbt_node_timings del warehouse.
+
+    Avisa en el log los nodos de esta invocación cuyo tiempo empeoró contra
+    su historia (ver timing_regressions). Un error de DuckDB acá solo se
+    avisa en el log, para no tapar el resultado de dbt que decide la task.
+    """
+    import duckdb
+
+    from src.timing_history import record_node_timings, timing_regressions
+
+    extra_nodes = checks.as_nodes() if checks else []
+    try:
+        with duckdb.connect(str(WAREHOUSE_PATH)) as con:
+            record_node_timings(con, stage, result, *batch, extra_nodes=extra_nodes)
+            regressions = timing_regressions(con)
+    except duckdb.Error:
+        logger.warning("Could not record the %s dbt node timings", stage, exc_info=True)
+        return
+    invoked = {node["unique_id"] for node in [*result.nodes, *extra_nodes]}
+    for regression in regressions:
+        if regression["unique_id"] in invoked:
+            logger.warning(
+                "%s took %.2fs, %.1fx its baseline of %.2fs",
+                regression["unique_id"],
+                regression["execution_time"],
+                regression["ratio"],
+                regression["baseline"],
+            )
+
+
+@contextmanager
+def _bronze_handoff(
+    ds_nodash: str, wait_turn: Callable[[], None] | None = None
+) -> Iterator[Callable | None]:
+    """Con CLEAN_SOURCE=warehouse, carga la tabla limpia del día en el warehouse.
+
+    En un backfill el warehouse se abre recién cuando le toca al día, porque
+    DuckDB admite un solo proceso escritor.
+    """
+    if CLEAN_SOURCE != "warehouse":
+        yield None
+        return
+    import duckdb
+
+    from src.warehouse import load_clean_table
+
+    WAREHOUSE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    if wait_turn is not None:
+
+        def load_in_turn(table):
+            wait_turn()
+            with duckdb.connect(str(WAREHOUSE_PATH)) as con:
+                return load_clean_table(con, ds_nodash, table)
+
+        yield load_in_turn
+        return
+    with duckdb.connect(str(WAREHOUSE_PATH)) as con:
+        yield functools.partial(load_clean_table, con, ds_nodash)
 
 
 # =========================
@@ -72,69 +326,561 @@ def _run_dbt_command(command: str, ds_nodash: str) -> subprocess.CompletedProces
 # =========================
 
 
-def _bronze_clean_task(ds_nodash: str, **_context) -> None:
+def _bronze_clean_task(
+    ds_nodash: str,
+    engine: str = BRONZE_ENGINE,
+    params: dict | None = None,
+    wait_turn: Callable[[], None] | None = None,
+    **_context,
+) -> None:
     """
     Capa Bronze:
-    - Lee el CSV del día desde data/raw
-    - Aplica limpieza con pandas
-    - Escribe parquet en data/clean/transactions_<ds_nodash>_clean.parquet
+    - Lee el CSV del día desde data/raw o, si no existe, sus shards
+      transactions_<ds_nodash>_*.csv[.gz|.zst], que se limpian en paralelo en
+      BRONZE_SHARD_WORKERS procesos y se unen sin duplicados entre shards
+    - Aplica limpieza con el motor elegido (pandas, arrow o duckdb)
+    - Escribe parquet en data/clean/transactions_<ds_nodash>_clean.parquet, o en
+      data/clean/transaction_date=YYYY-MM-DD/ si CLEAN_LAYOUT=partitioned, con el
+      codec, row groups y orden de filas del perfil PARQUET_PROFILE (y amount
+      DECIMAL(18,2) e IDs int32, o int64 si el día no entra, si COMPACT_TYPES=1)
+    - Guarda las filas rechazadas, con sus valores originales y el motivo, en
+      data/clean/transactions_<ds_nodash>_rejected.parquet
+    - Con CLEAN_SOURCE=warehouse carga además la tabla Arrow limpia en
+      bronze_transactions del warehouse, sin pasar por el parquet
+    - Descarta los transaction_id ya cargados en días anteriores según el índice
+      de data/index/transaction_ids y registra los del día
+    - No hace nada si el CSV, la configuración, el código de limpieza y el parquet
+      coinciden con lo registrado en data/manifest.json
+    - Registra filas leídas/escritas/descartadas por motivo, bytes, tiempos y
+      memoria en data/quality/metrics_<ds_nodash>.json
+    - En un backfill (`wait_turn`) limpia en paralelo con otros días y espera a
+      los días anteriores antes de usar el índice, el warehouse y el manifest
+    - Con BRONZE_CHUNK_BYTES > 0 el DAG reemplaza esta task por
+      bronze_plan_chunks, bronze_clean_chunk (mapeada) y bronze_merge_chunks
+    - Con el param `profile` (o PIPELINE_PROFILE=1) guarda un perfil de CPU y
+      de memoria en data/quality/profiles/<ds_nodash>/bronze*
     """
-    # Reconstruimos la fecha a partir de ds_nodash (YYYYMMDD)
-    execution_date = pendulum.from_format(ds_nodash, "YYYYMMDD")
+    with _profiled("bronze", ds_nodash, params):
+        # Reconstruimos la fecha a partir de ds_nodash (YYYYMMDD)
+        execution_date = pendulum.from_format(ds_nodash, "YYYYMMDD")
+        inputs, raw_stats = _bronze_inputs(ds_nodash, engine)
+        if raw_stats is not None and _bronze_unchanged(ds_nodash, inputs, params):
+            logger.info("Bronze inputs for %s unchanged, skipping cleaning", ds_nodash)
+            return
+
+        try:
+            metrics = _clean_bronze_day(ds_nodash, engine, wait_turn)
+        except FileNotFoundError as exc:
+            # Nice to have: si no hay archivo para ese día, saltar la task
+            logger.warning("No raw file found for %s: %s", execution_date, exc)
+            raise AirflowSkipException(
+                f"No raw data available for {execution_date.date()}, skipping bronze step."
+            ) from exc
+        _record_bronze(ds_nodash, inputs, raw_stats, metrics, wait_turn)
+
+
+def _bronze_inputs(ds_nodash: str, engine: str) -> tuple[dict, dict | None]:
+    """Entradas de Bronze registradas en el manifest y stats del CSV o los shards del día.
+
+    Sin datos crudos para el día devuelve ({}, None).
+    """
+    from src.cleaning import STATUS_MAPPING
+    from src.manifest import (
+        code_version,
+        fingerprint_file,
+        fingerprint_shards,
+        get_entry,
+        load_manifest,
+    )
+    from src.transformations import RAW_FILE_TEMPLATE, raw_input_files
+
+    raw_path = RAW_DIR / RAW_FILE_TEMPLATE.format(ds_nodash=ds_nodash)
+    raw_paths = raw_input_files(RAW_DIR, ds_nodash)
+    if not raw_paths:
+        return {}, None
+    previous_raw = get_entry(load_manifest(MANIFEST_PATH), "bronze", ds_nodash).get(
+        "raw"
+    )
+    if raw_paths == [raw_path]:
+        raw_stats = fingerprint_file(raw_path, previous_raw)
+    else:
+        raw_stats = fingerprint_shards(raw_paths, previous_raw)
+    inputs = {
+        "raw_sha256": raw_stats["sha256"],
+        "engine": engine,
+        "layout": CLEAN_LAYOUT,
+        "clean_source": CLEAN_SOURCE,
+        "compact_types": COMPACT_TYPES,
+        "parquet_profile": PARQUET_PROFILE,
+        "status_aliases": {**STATUS_MAPPING, **STATUS_ALIASES},
+        "code_version": code_version(*BRONZE_SOURCES),
+    }
+    return inputs, raw_stats
 
-    try:
+
+def _bronze_unchanged(ds_nodash: str, inputs: dict, params: dict | None) -> bool:
+    """True si el manifest tiene las mismas entradas y el parquet del día sigue igual."""
+    from src.manifest import fingerprint_files, is_unchanged, load_manifest
+    from src.transformations import clean_output_files
+
+    output = fingerprint_files(
+        clean_output_files(CLEAN_DIR, ds_nodash, CLEAN_LAYOUT), CLEAN_DIR
+    )
+    return not _force_requested(params) and is_unchanged(
+        load_manifest(MANIFEST_PATH), "bronze", ds_nodash, inputs, output
+    )
+
+
+def _clean_bronze_day(
+    ds_nodash: str,
+    engine: str,
+    wait_turn: Callable[[], None] | None = None,
+    chunk_paths: list[Path] | None = None,
+) -> StageMetrics:
+    """Corre clean_daily_transactions con la configuración del DAG y devuelve sus métricas."""
+    from src.backfill import OrderedIdIndex
+    from src.cleaning import STATUS_MAPPING
+    from src.id_index import TransactionIdIndex
+    from src.metrics import StageMetrics
+    from src.transformations import clean_daily_transactions
+
+    metrics = StageMetrics(stage="bronze")
+    if wait_turn is None:
+        id_index = TransactionIdIndex(ID_INDEX_DIR)
+    else:
+        id_index = OrderedIdIndex(ID_INDEX_DIR, wait_turn)
+    with _bronze_handoff(ds_nodash, wait_turn) as handoff:
         # clean_daily_transactions espera primero la fecha, luego los paths
         clean_daily_transactions(
-            execution_date,
+            pendulum.from_format(ds_nodash, "YYYYMMDD"),
             RAW_DIR,
             CLEAN_DIR,
+            engine=engine,
+            layout=CLEAN_LAYOUT,
+            metrics=metrics,
+            status_mapping={**STATUS_MAPPING, **STATUS_ALIASES},
+            id_index=id_index,
+            handoff=handoff,
+            compact_types=COMPACT_TYPES,
+            parquet_profile=PARQUET_PROFILE,
+            # En un backfill los días ya se reparten los procesos
+            shard_workers=(
+                BRONZE_SHARD_WORKERS
+                if wait_turn is None
+                else max(1, BRONZE_SHARD_WORKERS // BACKFILL_WORKERS)
+            ),
+            chunk_paths=chunk_paths,
         )
-    except FileNotFoundError as exc:
-        # Nice to have: si no hay archivo para ese día, saltar la task
-        logger.warning("No raw file found for %s: %s", execution_date, exc)
+    return metrics
+
+
+def _record_bronze(
+    ds_nodash: str,
+    inputs: dict,
+    raw_stats: dict | None,
+    metrics: StageMetrics,
+    wait_turn: Callable[[], None] | None = None,
+) -> None:
+    """Registra el día limpio en el manifest y sus métricas en metrics_<ds_nodash>.json."""
+    from src.manifest import (
+        fingerprint_files,
+        load_manifest,
+        record_entry,
+        save_manifest,
+    )
+    from src.metrics import record_stage_metrics
+    from src.transformations import clean_output_files
+
+    output = fingerprint_files(
+        clean_output_files(CLEAN_DIR, ds_nodash, CLEAN_LAYOUT), CLEAN_DIR
+    )
+    if wait_turn is not None:
+        # Otros días del backfill pueden haber guardado el manifest mientras limpiábamos
+        wait_turn()
+    manifest = load_manifest(MANIFEST_PATH)
+    record_entry(
+        manifest,
+        "bronze",
+        ds_nodash,
+        inputs,
+        output,
+        raw=raw_stats,
+        id_types=metrics.details.get("id_types"),
+    )
+    save_manifest(MANIFEST_PATH, manifest)
+    record_stage_metrics(QUALITY_DIR, metrics)
+    logger.info(
+        "Dropped %s cross-day duplicate transactions for %s",
+        metrics.dropped["cross_day_duplicate"],
+        ds_nodash,
+    )
+
+
+def _bronze_plan_chunks_task(
+    ds_nodash: str, params: dict | None = None, **_context
+) -> list[dict]:
+    """
+    Bronze por chunks (BRONZE_CHUNK_BYTES > 0), paso 1:
+    - Parte el CSV del día en chunks de ~BRONZE_CHUNK_BYTES cortados en fin de
+      línea (cada shard comprimido es un chunk) y devuelve los op_kwargs de una
+      task `bronze_clean_chunk` por chunk
+    - Se saltea como `bronze_clean` si no hay CSV; si el manifest no cambió
+      devuelve una lista vacía y no se mapea ninguna task
+    """
+    from src.transformations import raw_chunks
+
+    inputs, raw_stats = _bronze_inputs(ds_nodash, CHUNKED_ENGINE)
+    if raw_stats is None:
         raise AirflowSkipException(
-            f"No raw data available for {execution_date.date()}, skipping bronze step."
-        ) from exc
+            f"No raw data available for {ds_nodash}, skipping bronze step."
+        )
+    if _bronze_unchanged(ds_nodash, inputs, params):
+        logger.info("Bronze inputs for %s unchanged, skipping cleaning", ds_nodash)
+        return []
+
+    chunks = raw_chunks(RAW_DIR, ds_nodash, BRONZE_CHUNK_BYTES)
+    chunk_dir = CHUNK_DIR / ds_nodash
+    shutil.rmtree(chunk_dir, ignore_errors=True)
+    chunk_dir.mkdir(parents=True)
+    # La task de merge registra en el manifest lo que se planificó acá
+    (chunk_dir / CHUNK_PLAN_FILE).write_text(
+        json.dumps({"inputs": inputs, "raw": raw_stats, "chunks": len(chunks)}),
+        encoding="utf-8",
+    )
+    logger.info("Split the raw data of %s in %s chunks", ds_nodash, len(chunks))
+    return [
+        {"ds_nodash": ds_nodash, "index": index, "chunk": chunk.to_dict()}
+        for index, chunk in enumerate(chunks)
+    ]
+
+
+def _bronze_clean_chunk_task(
+    ds_nodash: str, index: int, chunk: dict, params: dict | None = None, **_context
+) -> str:
+    """
+    Bronze por chunks, paso 2 (una task mapeada por chunk):
+    - Lee, deduplica dentro del chunk y limpia sus filas con los kernels de arrow
+    - Guarda filas crudas, limpias y motivo de rechazo en data/chunks/<ds_nodash>/
+      y devuelve la ruta para la task de merge
+    - Con profiling, el perfil del chunk queda en bronze_chunk_<index>*
+    """
+    from src.cleaning import STATUS_MAPPING
+    from src.transformations import RawChunk, clean_raw_chunk
+
+    with _profiled(f"bronze_chunk_{index:05d}", ds_nodash, params):
+        path = clean_raw_chunk(
+            RawChunk.from_dict(chunk),
+            CHUNK_DIR / ds_nodash,
+            index,
+            {**STATUS_MAPPING, **STATUS_ALIASES},
+        )
+    return str(path)
+
+
+def _bronze_merge_chunks_task(
+    ds_nodash: str,
+    chunk_paths: list[str] | None = None,
+    params: dict | None = None,
+    **_context,
+) -> None:
+    """
+    Bronze por chunks, paso 3:
+    - Une los chunks en orden, descarta los duplicados exactos entre chunks y
+      escribe el parquet, los rechazos, el índice y el warehouse como
+      `bronze_clean`, con el mismo resultado
+    - Registra el manifest y las métricas del día y borra los chunks; con
+      profiling, el perfil queda en bronze_merge*
+    - Sin chunks (manifest sin cambios) no hace nada; sin CSV se saltea
+    - Con none_failed un chunk fallido deja esta task en upstream_failed; si
+      igual faltan chunks del plan (p. ej. uno salteado) falla sin escribir
+    """
+    from src.transformations import raw_input_files
+
+    paths = [Path(path) for path in chunk_paths or []]
+    if not paths:
+        if not raw_input_files(RAW_DIR, ds_nodash):
+            raise AirflowSkipException(
+                f"No raw data available for {ds_nodash}, skipping bronze step."
+            )
+        return
+
+    chunk_dir = CHUNK_DIR / ds_nodash
+    plan = json.loads((chunk_dir / CHUNK_PLAN_FILE).read_text(encoding="utf-8"))
+    if len(paths) != plan["chunks"]:
+        raise AirflowException(
+            f"Got {len(paths)} of the {plan['chunks']} chunks planned for {ds_nodash}"
+        )
+    with _profiled("bronze_merge", ds_nodash, params):
+        metrics = _clean_bronze_day(ds_nodash, CHUNKED_ENGINE, chunk_paths=paths)
+        _record_bronze(ds_nodash, plan["inputs"], plan["raw"], metrics)
+    shutil.rmtree(chunk_dir, ignore_errors=True)
 
 
-def _silver_dbt_run_task(ds_nodash: str, **_context) -> None:
+def _silver_dbt_run_task(
+    ds_nodash: str, params: dict | None = None, **_context
+) -> None:
     """
     Capa Silver:
     - Ejecuta `dbt run` usando el proyecto en dbt/
     - Carga la info limpia en DuckDB
+    - No invoca dbt si el parquet que leería staging y el proyecto dbt no
+      cambiaron desde la última carga exitosa de ese día y el warehouse
+      conserva la partición que esa carga dejó en int_customer_transactions_daily
+    - Registra el wall time de `dbt run` en data/quality/metrics_<ds_nodash>.json
+      y el tiempo de cada modelo en la tabla dbt_node_timings del warehouse
+    - Con profiling guarda el perfil de CPU y memoria en
+      data/quality/profiles/<ds_nodash>/silver* y las métricas de DuckDB de cada
+      consulta de dbt en duckdb_run_queries.csv
     """
-    result = _run_dbt_command("run", ds_nodash)
+    from src.manifest import is_unchanged, load_manifest, record_entry, save_manifest
+    from src.warehouse import silver_partitions
+
+    manifest = load_manifest(MANIFEST_PATH)
+    inputs, clean_files = _silver_inputs(ds_nodash)
+    output = silver_partitions(WAREHOUSE_PATH, [ds_nodash])[ds_nodash]
+    if (
+        not _force_requested(params)
+        and inputs["clean"] is not None
+        and is_unchanged(manifest, "silver", ds_nodash, inputs, output)
+    ):
+        logger.info("Silver inputs for %s unchanged, skipping dbt run", ds_nodash)
+        return
+
+    with _profiled("silver", ds_nodash, params) as profile_dir:
+        result = _run_dbt_command("run", ds_nodash, profile_dir=profile_dir)
+        _record_silver_metrics(ds_nodash, result, clean_files)
+        _record_node_timings("silver", result, (ds_nodash, ds_nodash))
     if result.returncode != 0:
         raise AirflowException(
             f"dbt run failed with code {result.returncode}: {result.stderr}"
         )
 
+    output = silver_partitions(WAREHOUSE_PATH, [ds_nodash])[ds_nodash]
+    record_entry(manifest, "silver", ds_nodash, inputs, output)
+    save_manifest(MANIFEST_PATH, manifest)
+
+
+def _silver_inputs(ds_nodash: str) -> tuple[dict, list[Path]]:
+    """Entradas de Silver registradas en el manifest y parquets que lee staging."""
+    from src.manifest import fingerprint_files, fingerprint_tree
+    from src.transformations import staging_input_files
+
+    clean_files = staging_input_files(CLEAN_DIR, ds_nodash, CLEAN_LAYOUT)
+    inputs = {
+        "clean": fingerprint_files(clean_files, CLEAN_DIR),
+        "dbt_project": fingerprint_tree(DBT_DIR, DBT_RUN_SOURCES),
+        "layout": CLEAN_LAYOUT,
+        "clean_source": CLEAN_SOURCE,
+        "compact_types": COMPACT_TYPES,
+        "staging_materialization": STAGING_MATERIALIZATION,
+    }
+    return inputs, clean_files
+
+
+def _record_silver_metrics(
+    ds_nodash: str,
+    result: DbtInvocation,
+    clean_files: list[Path],
+    batch: tuple[str, str] | None = None,
+) -> None:
+    import pyarrow.parquet as pq
+
+    from src.dbt_results import record_dbt_metrics
+
+    record_dbt_metrics(
+        QUALITY_DIR,
+        "silver",
+        ds_nodash,
+        result,
+        batch,
+        rows_read=sum(pq.ParquetFile(path).metadata.num_rows for path in clean_files),
+        bytes_in=sum(path.stat().st_size for path in clean_files),
+        bytes_out=WAREHOUSE_PATH.stat().st_size if WAREHOUSE_PATH.exists() else 0,
+    )
+
 
-def _gold_dbt_tests_task(ds_nodash: str, **_context) -> None:
+def _gold_dbt_tests_task(
+    ds_nodash: str, params: dict | None = None, **_context
+) -> None:
     """
     Capa Gold:
-    - Ejecuta `dbt test`
+    - Evalúa las reglas de column_checks con una consulta por modelo y ejecuta
+      `dbt test` para el resto (o todo con `dbt test` si DQ_ENGINE=dbt)
     - Escribe un JSON de data quality en data/quality/dq_results_<ds_nodash>.json
-      con status, stdout y stderr.
-    - Si algún test falla, marca el task en error.
+      con status, fallas y claves de ejemplo por regla, resultado por test
+      (en modo inprocess), stdout y stderr.
+    - Registra el wall time de los tests en data/quality/metrics_<ds_nodash>.json
+      y el tiempo de cada test en la tabla dbt_node_timings del warehouse
+    - Si algún test falla, marca el task en error; si no, publica el snapshot
+      de lectura de fct_customer_transactions en warehouse/serving/.
+    - Con profiling guarda el perfil de CPU y memoria en
+      data/quality/profiles/<ds_nodash>/gold* y las métricas de DuckDB de cada
+      consulta de `dbt test` en duckdb_test_queries.csv
     """
-    result = _run_dbt_command("test", ds_nodash)
+    from src.dbt_results import quality_returncode, record_dbt_metrics, write_dq_results
+
+    with _profiled("gold", ds_nodash, params) as profile_dir:
+        result, checks = _run_quality_checks(ds_nodash, profile_dir=profile_dir)
+        record_dbt_metrics(QUALITY_DIR, "gold", ds_nodash, result, checks=checks)
+        _record_node_timings("gold", result, (ds_nodash, ds_nodash), checks)
+        write_dq_results(QUALITY_DIR, ds_nodash, result, checks=checks)
+
+    if quality_returncode(result, checks) != 0:
+        # Dejamos el archivo igual pero marcamos el task como fallido
+        raise AirflowException("dbt tests failed, see dq_results json and logs")
+    _publish_serving_snapshot(ds_nodash)
+
+
+def _publish_serving_snapshot(ds_nodash: str) -> None:
+    """Publica el snapshot de lectura del mart, que invalida la caché de los lectores."""
+    import duckdb
+
+    from src.serving import publish_snapshot
+
+    with duckdb.connect(str(WAREHOUSE_PATH)) as con:
+        path = publish_snapshot(con, SERVING_DIR, ds_nodash)
+    logger.info("Published serving snapshot %s for %s", path.name, ds_nodash)
+
+
+# =========================
+#  Backfill en paralelo
+# =========================
+
+
+def _backfill_days(params: dict | None) -> list[str]:
+    """Días (ds_nodash) entre los params start_ds_nodash y end_ds_nodash, inclusive."""
+    params = params or {}
+    if not params.get("start_ds_nodash"):
+        raise AirflowException(
+            "medallion_backfill needs the start_ds_nodash param (YYYYMMDD)"
+        )
+    start = datetime.strptime(params["start_ds_nodash"], "%Y%m%d")
+    end = datetime.strptime(
+        params.get("end_ds_nodash") or params["start_ds_nodash"], "%Y%m%d"
+    )
+    if end < start:
+        raise AirflowException(f"end_ds_nodash {end:%Y%m%d} is before start_ds_nodash")
+    return [
+        (start + timedelta(days=offset)).strftime("%Y%m%d")
+        for offset in range((end - start).days + 1)
+    ]
+
 
-    status = "passed" if result.returncode == 0 else "failed"
-    QUALITY_DIR.mkdir(parents=True, exist_ok=True)
-    dq_path = QUALITY_DIR / f"dq_results_{ds_nodash}.json"
+def _loaded_days(days: list[str]) -> list[str]:
+    """Días del rango con parquet limpio para staging."""
+    from src.transformations import staging_input_files
 
-    payload = {
-        "ds_nodash": ds_nodash,
-        "status": status,
-        "stdout": result.stdout,
-        "stderr": result.stderr,
+    return [ds for ds in days if staging_input_files(CLEAN_DIR, ds, CLEAN_LAYOUT)]
+
+
+def _bronze_backfill_day(
+    ds_nodash: str, wait_turn: Callable[[], None], engine: str, params: dict | None
+) -> str:
+    """Bronze de un día dentro del pool del backfill; devuelve cleaned o skipped."""
+    try:
+        _bronze_clean_task(ds_nodash, engine=engine, params=params, wait_turn=wait_turn)
+    except AirflowSkipException as exc:
+        logger.warning("Backfill: %s", exc)
+        return "skipped"
+    return "cleaned"
+
+
+def _bronze_backfill_task(params: dict | None = None, **_context) -> None:
+    """
+    Bronze del backfill:
+    - Limpia todos los días del rango en un pool de BACKFILL_WORKERS procesos
+    - Cada día conserva la semántica de `bronze_clean`: se saltea si no hay CSV
+      o si nada cambió según el manifest, y escribe su metrics_<ds_nodash>.json
+    - El chequeo de reenvíos, el warehouse y el manifest se aplican en orden de
+      día, así el resultado es el mismo que con la corrida día por día
+    """
+    from src.backfill import run_days
+
+    days = _backfill_days(params)
+    engine = (params or {}).get("bronze_engine", BRONZE_ENGINE)
+    outcomes = run_days(
+        days,
+        functools.partial(
+            _bronze_backfill_day, engine=engine, params=dict(params or {})
+        ),
+        BACKFILL_WORKERS,
+    )
+    failed = {
+        ds: error for ds, error in outcomes.items() if isinstance(error, BaseException)
     }
-    dq_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    if failed:
+        raise AirflowException(f"Bronze backfill failed for {sorted(failed)}: {failed}")
+    if not _loaded_days(days):
+        raise AirflowSkipException(
+            f"No raw data available between {days[0]} and {days[-1]}"
+        )
+
 
+def _silver_backfill_task(params: dict | None = None, **_context) -> None:
+    """
+    Silver del backfill:
+    - Una sola invocación de `dbt run` carga todos los días del rango que
+      cambiaron (DS_NODASH..END_DS_NODASH), en lugar de una por día
+    - Registra el manifest y metrics_<ds_nodash>.json de cada día cargado
+    """
+    from src.manifest import is_unchanged, load_manifest, record_entry, save_manifest
+    from src.warehouse import silver_partitions
+
+    days = _loaded_days(_backfill_days(params))
+    manifest = load_manifest(MANIFEST_PATH)
+    outputs = silver_partitions(WAREHOUSE_PATH, days)
+    inputs = {ds: _silver_inputs(ds) for ds in days}
+    pending = [
+        ds
+        for ds in days
+        if _force_requested(params)
+        or not is_unchanged(manifest, "silver", ds, inputs[ds][0], outputs[ds])
+    ]
+    if not pending:
+        logger.info("Silver inputs for every backfill day unchanged, skipping dbt run")
+        return
+
+    batch = (pending[0], pending[-1])
+    result = _run_dbt_command("run", *batch)
+    # Los días sin cambios dentro del rango se recargan igual: el modelo es idempotente
+    loaded = [ds for ds in days if batch[0] <= ds <= batch[1]]
+    for ds in loaded:
+        _record_silver_metrics(ds, result, inputs[ds][1], batch)
+    _record_node_timings("silver", result, batch)
     if result.returncode != 0:
-        # Dejamos el archivo igual pero marcamos el task como fallido
+        raise AirflowException(
+            f"dbt run failed with code {result.returncode}: {result.stderr}"
+        )
+
+    outputs = silver_partitions(WAREHOUSE_PATH, loaded)
+    for ds in loaded:
+        record_entry(manifest, "silver", ds, inputs[ds][0], outputs[ds])
+    save_manifest(MANIFEST_PATH, manifest)
+
+
+def _gold_backfill_task(params: dict | None = None, **_context) -> None:
+    """
+    Gold del backfill:
+    - Una sola pasada de los tests (ver _run_quality_checks) sobre todos los días
+      cargados del rango
+    - Escribe data/quality/dq_results_<ds_nodash>.json para cada día, con el
+      resultado de la corrida compartida y el rango que cubrió
+    """
+    from src.dbt_results import quality_returncode, record_dbt_metrics, write_dq_results
+
+    days = _loaded_days(_backfill_days(params))
+    if not days:
+        raise AirflowSkipException("No backfill day has clean data to test")
+    batch = (days[0], days[-1])
+    result, checks = _run_quality_checks(*batch)
+    for ds in days:
+        record_dbt_metrics(QUALITY_DIR, "gold", ds, result, batch, checks=checks)
+        write_dq_results(QUALITY_DIR, ds, result, batch, checks)
+    _record_node_timings("gold", result, batch, checks)
+
+    if quality_returncode(result, checks) != 0:
         raise AirflowException("dbt tests failed, see dq_results json and logs")
+    _publish_serving_snapshot(batch[1])
 
 
 def build_dag() -> DAG:
@@ -146,13 +892,39 @@ def build_dag() -> DAG:
         start_date=pendulum.datetime(2025, 11, 30, tz="UTC"),
         catchup=True,
         max_active_runs=1,
+        params={"bronze_engine": BRONZE_ENGINE, "force": False, "profile": False},
     ) as medallion_dag:
 
-        bronze_clean = PythonOperator(
-            task_id="bronze_clean",
-            python_callable=_bronze_clean_task,
-            op_kwargs={"ds_nodash": "{{ ds_nodash }}"},
-        )
+        if BRONZE_CHUNK_BYTES > 0:
+            bronze_plan_chunks = PythonOperator(
+                task_id="bronze_plan_chunks",
+                python_callable=_bronze_plan_chunks_task,
+                op_kwargs={"ds_nodash": "{{ ds_nodash }}"},
+            )
+            bronze_clean_chunk = PythonOperator.partial(
+                task_id="bronze_clean_chunk",
+                python_callable=_bronze_clean_chunk_task,
+            ).expand(op_kwargs=bronze_plan_chunks.output)
+            # none_failed: sin chunks (manifest sin cambios) el merge igual corre
+            bronze_clean = PythonOperator(
+                task_id="bronze_merge_chunks",
+                python_callable=_bronze_merge_chunks_task,
+                op_kwargs={
+                    "ds_nodash": "{{ ds_nodash }}",
+                    "chunk_paths": bronze_clean_chunk.output,
+                },
+                trigger_rule="none_failed",
+            )
+            bronze_plan_chunks >> bronze_clean_chunk >> bronze_clean
+        else:
+            bronze_clean = PythonOperator(
+                task_id="bronze_clean",
+                python_callable=_bronze_clean_task,
+                op_kwargs={
+                    "ds_nodash": "{{ ds_nodash }}",
+                    "engine": "{{ params.bronze_engine }}",
+                },
+            )
 
         silver_dbt_run = PythonOperator(
             task_id="silver_dbt_run",
@@ -171,4 +943,42 @@ def build_dag() -> DAG:
     return medallion_dag
 
 
+def build_backfill_dag() -> DAG:
+    """Manually triggered DAG that backfills a date range in three batched tasks."""
+    with DAG(
+        description="Parallel bronze and one dbt run/test over a range of days",
+        dag_id="medallion_backfill",
+        schedule=None,
+        start_date=pendulum.datetime(2025, 11, 30, tz="UTC"),
+        catchup=False,
+        max_active_runs=1,
+        params={
+            "start_ds_nodash": "",
+            "end_ds_nodash": "",
+            "bronze_engine": BRONZE_ENGINE,
+            "force": False,
+        },
+    ) as medallion_backfill:
+
+        bronze_backfill = PythonOperator(
+            task_id="bronze_backfill",
+            python_callable=_bronze_backfill_task,
+        )
+
+        silver_backfill_run = PythonOperator(
+            task_id="silver_backfill_run",
+            python_callable=_silver_backfill_task,
+        )
+
+        gold_backfill_tests = PythonOperator(
+            task_id="gold_backfill_tests",
+            python_callable=_gold_backfill_task,
+        )
+
+        bronze_backfill >> silver_backfill_run >> gold_backfill_tests
+
+    return medallion_backfill
+
+
 dag = build_dag()
+backfill_dag = build_backfill_dag()
@@ -0,0 +1,25 @@
+{#- DS_NODASH, read only when executing: parsing renders the SQL with a fixed day,
+    so a new day keeps the partial parse of target/partial_parse.msgpack -#}
+{% macro load_day() %}
+    {%- do return(var('ds_nodash') if execute else '19700101') -%}
+{% endmacro %}
+
+{#- First and last day (YYYY-MM-DD) this run loads: DS_NODASH, or DS_NODASH..END_DS_NODASH
+    in a backfill; the start_date / end_date vars override them -#}
+{% macro load_range() %}
+    {%- set ds_nodash = load_day() -%}
+    {%- set backfill_end = var('end_ds_nodash') if execute else '' -%}
+    {%- set end_ds_nodash = backfill_end or ds_nodash -%}
+    {%- set ds = ds_nodash[0:4] ~ '-' ~ ds_nodash[4:6] ~ '-' ~ ds_nodash[6:8] -%}
+    {%- set end_ds = end_ds_nodash[0:4] ~ '-' ~ end_ds_nodash[4:6] ~ '-' ~ end_ds_nodash[6:8] -%}
+    {%- set start_date = var('start_date', ds) -%}
+    {%- set end_date = var('end_date', end_ds if backfill_end else start_date) -%}
+    {%- do return((start_date, end_date)) -%}
+{% endmacro %}
+
+{#- Filter on a ds_nodash column keeping only the days of this run, so models and
+    tests reading a persisted stg_transactions don't scan the earlier days -#}
+{% macro in_load_range(column='ds_nodash') -%}
+    {%- set start_date, end_date = load_range() -%}
+    {{ column }} between '{{ start_date | replace('-', '') }}' and '{{ end_date | replace('-', '') }}'
+{%- endmacro %}
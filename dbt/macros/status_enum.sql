@@ -0,0 +1,4 @@
+{#- ENUM type over the valid statuses, same order as STATUS_VALUES in src/cleaning.py -#}
+{% macro status_enum() -%}
+    enum({% for status in var('status_values') %}'{{ status }}'{% if not loop.last %}, {% endif %}{% endfor %})
+{%- endmacro %}
@@ -0,0 +1,13 @@
+{#- Pre-hook of the incremental models: a table created while every ID fitted
+    in int32 keeps INTEGER ID columns, widen them to bigint once the run casts
+    the IDs to bigint (transaction_id_type / customer_id_type vars) -#}
+{% macro widen_id_columns() %}
+    {%- if execute and is_incremental() -%}
+        {%- for column in adapter.get_columns_in_relation(this) -%}
+            {%- if column.dtype | upper == 'INTEGER'
+                and var(column.name ~ '_type', none) == 'bigint' %}
+    alter table {{ this }} alter {{ column.name }} type bigint;
+            {%- endif -%}
+        {%- endfor -%}
+    {%- endif -%}
+{% endmacro %}
@@ -0,0 +1,55 @@
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key='ds_nodash',
+    pre_hook="{{ widen_id_columns() }}"
+) }}
+
+-- Partial aggregate per customer for each day being loaded. Re-running a day
+-- deletes that day's rows and inserts the new ones, so its contribution is
+-- replaced instead of added twice.
+
+with day_aggregates as (
+    select
+        ds_nodash,
+        customer_id,
+        count(*) as transaction_count,
+        sum(case when status = 'completed' then amount else 0 end)
+            as total_amount_completed,
+        sum(amount) as total_amount_all
+    from {{ ref('stg_transactions') }}
+    where {{ in_load_range() }}
+    group by ds_nodash, customer_id
+)
+
+select
+    ds_nodash,
+    customer_id,
+    transaction_count,
+    total_amount_completed,
+    total_amount_all
+from day_aggregates
+
+{% if is_incremental() %}
+
+-- Customers that were in a previous load of these days but not in the
+-- current one get a zero row, so the mart knows to recompute them
+union all
+
+select
+    previous.ds_nodash,
+    previous.customer_id,
+    0 as transaction_count,
+    0 as total_amount_completed,
+    0 as total_amount_all
+from {{ this }} as previous
+where previous.transaction_count > 0
+    and previous.ds_nodash in (select ds_nodash from day_aggregates)
+    and not exists (
+        select 1
+        from day_aggregates
+        where day_aggregates.ds_nodash = previous.ds_nodash
+            and day_aggregates.customer_id = previous.customer_id
+    )
+
+{% endif %}
@@ -0,0 +1,82 @@
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['customer_id', 'transaction_date'],
+    post_hook="delete from {{ this }} where transaction_count = 0"
+) }}
+
+-- depends_on: {{ ref('stg_transactions') }}
+
+{% set windows = var('rolling_window_days') %}
+{% set reach = windows | max - 1 %}
+{% set measures = ['transaction_count', 'total_amount_completed', 'total_amount_all'] %}
+
+with
+{% if is_incremental() %}
+-- Dates each customer got rows for in the days being loaded. Only the rows
+-- whose rolling windows include one of those dates change, and computing them
+-- needs the partials up to the longest window before the first of them.
+loaded as (
+    select
+        customer_id,
+        min(transaction_date) as first_date,
+        max(transaction_date) as last_date
+    from {{ ref('int_customer_daily_partials') }}
+    where {{ in_load_range() }}
+    group by customer_id
+),
+{% endif %}
+
+daily as (
+    select
+        partials.customer_id,
+        partials.transaction_date,
+        cast(sum(partials.transaction_count) as bigint) as transaction_count,
+        sum(partials.total_amount_completed) as total_amount_completed,
+        sum(partials.total_amount_all) as total_amount_all
+    from {{ ref('int_customer_daily_partials') }} as partials
+    {% if is_incremental() %}
+    inner join loaded
+        on partials.customer_id = loaded.customer_id
+        and partials.transaction_date
+            between loaded.first_date - interval {{ reach }} day
+            and loaded.last_date + interval {{ reach }} day
+    {% endif %}
+    group by partials.customer_id, partials.transaction_date
+),
+
+rolling as (
+    select
+        customer_id,
+        transaction_date,
+        transaction_count,
+        total_amount_completed,
+        total_amount_all
+        {%- for days in windows %}
+        {%- for measure in measures %},
+        {%- if measure == 'transaction_count' %}
+        cast(sum({{ measure }}) over last_{{ days }}d as bigint) as {{ measure }}_{{ days }}d
+        {%- else %}
+        sum({{ measure }}) over last_{{ days }}d as {{ measure }}_{{ days }}d
+        {%- endif %}
+        {%- endfor %}
+        {%- endfor %}
+    from daily
+    window
+    {%- for days in windows %}
+        last_{{ days }}d as (
+            partition by customer_id
+            order by transaction_date
+            range between interval {{ days - 1 }} day preceding and current row
+        ){% if not loop.last %},{% endif %}
+    {%- endfor %}
+)
+
+select rolling.*
+from rolling
+{% if is_incremental() %}
+inner join loaded
+    on rolling.customer_id = loaded.customer_id
+    and rolling.transaction_date
+        between loaded.first_date and loaded.last_date + interval {{ reach }} day
+{% endif %}
@@ -1,18 +1,32 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key='customer_id',
+    post_hook="delete from {{ this }} where transaction_count = 0"
+) }}
 
-with base as (
+-- depends_on: {{ ref('stg_transactions') }}
+
+with partials as (
     select *
-    from {{ ref('stg_transactions') }}
+    from {{ ref('int_customer_transactions_daily') }}
+    {% if is_incremental() %}
+    -- Only customers touched by the days being loaded are recomputed
+    where customer_id in (
+        select customer_id
+        from {{ ref('int_customer_transactions_daily') }}
+        where {{ in_load_range() }}
+    )
+    {% endif %}
 ),
 
 per_customer as (
     select
         customer_id,
-        count(*) as transaction_count,
-        sum(case when status = 'completed' then amount else 0 end)
-            as total_amount_completed,
-        sum(amount) as total_amount_all
-    from base
+        cast(sum(transaction_count) as bigint) as transaction_count,
+        sum(total_amount_completed) as total_amount_completed,
+        sum(total_amount_all) as total_amount_all
+    from partials
     group by customer_id
 )
 
@@ -22,4 +36,3 @@ select
     total_amount_completed,
     total_amount_all
 from per_customer
-
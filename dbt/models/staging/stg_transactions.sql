@@ -1,20 +1,113 @@
-{{ config(materialized='view') }}
+{#- view: every read re-scans the parquet; incremental: the days of each run are
+    written once to a DuckDB table (delete+insert by ds_nodash) that the tests
+    and the intermediate model read instead -#}
+{{ config(
+    materialized=var('staging_materialized'),
+    incremental_strategy='delete+insert',
+    unique_key='ds_nodash',
+    pre_hook="{{ widen_id_columns() }}"
+) }}
 
 {% set clean_dir = var('clean_dir') %}
-{% set ds_nodash = var('ds_nodash') %}
+{% set ds_nodash = load_day() %}
+{% set start_date, end_date = load_range() %}
 
+{% if var('clean_source') == 'warehouse' %}
+
+-- Bronze loaded the day from Arrow into the warehouse, no parquet to read
 with source as (
+    select
+        transaction_id,
+        customer_id,
+        amount,
+        status,
+        transaction_ts,
+        transaction_date,
+        ds_nodash
+    from {{ source('bronze', 'bronze_transactions') }}
+    where {{ in_load_range() }}
+)
+
+{% elif var('clean_layout') == 'partitioned' %}
+
+-- Hive-partitioned layout: a day's file lands in the partition of each
+-- transaction_date it holds, named part-<ds_nodash>-*, so the day loaded is
+-- taken from the file name (a late row of an earlier date stays with the file
+-- that brought it). The filter on filename prunes the dataset to the files
+-- of the requested range, so only those are opened
+with files as (
+    select
+        transaction_id,
+        customer_id,
+        amount,
+        status,
+        transaction_ts,
+        transaction_date,
+        regexp_extract(filename, 'part-([0-9]{8})-[^/]*$', 1) as ds_nodash
+    from read_parquet(
+        '{{ clean_dir }}/transaction_date=*/part-*.parquet',
+        hive_partitioning = true,
+        hive_types = {'transaction_date': date},
+        filename = true,
+        union_by_name = {{ var('union_by_name') }}
+    )
+),
+
+source as (
     select *
+    from files
+    where {{ in_load_range() }}
+)
+
+{% elif start_date != end_date %}
+
+-- Range of days (backfill): every daily file, filtered by the date in its name
+with files as (
+    select
+        transaction_id,
+        customer_id,
+        amount,
+        status,
+        transaction_ts,
+        transaction_date,
+        regexp_extract(filename, 'transactions_([0-9]{8})_clean[.]parquet$', 1) as ds_nodash
+    from read_parquet(
+        '{{ clean_dir }}/transactions_*_clean.parquet',
+        filename = true,
+        union_by_name = {{ var('union_by_name') }}
+    )
+),
+
+source as (
+    select *
+    from files
+    where {{ in_load_range() }}
+)
+
+{% else %}
+
+with source as (
+    select
+        transaction_id,
+        customer_id,
+        amount,
+        status,
+        transaction_ts,
+        transaction_date,
+        '{{ ds_nodash }}' as ds_nodash
     from read_parquet(
         '{{ clean_dir }}/transactions_{{ ds_nodash }}_clean.parquet'
     )
 )
 
+{% endif %}
+
 select
-    cast(transaction_id   as bigint)    as transaction_id,
-    cast(customer_id      as bigint)    as customer_id,
-    cast(amount           as double)    as amount,
-    cast(status           as varchar)   as status,
+    cast(transaction_id   as {{ var('transaction_id_type') }}) as transaction_id,
+    cast(customer_id      as {{ var('customer_id_type') }}) as customer_id,
+    cast(amount           as {{ var('amount_type') }}) as amount,
+    cast(status           as {{ status_enum() }}) as status,
     cast(transaction_ts   as timestamp) as transaction_ts,
-    cast(transaction_date as date)      as transaction_date
+    cast(transaction_date as date)      as transaction_date,
+    cast(ds_nodash        as varchar)   as ds_nodash
 from source
@@ -0,0 +1,35 @@
+{#- Every row-level rule of a model in one scan instead of one query per test.
+    checks maps a rule name to the condition each row must meet (NULL fails),
+    unique lists columns whose non-null values must not repeat. Returns one
+    row per broken rule and the number of rows breaking it. -#}
+{% test column_checks(model, checks, unique=[], loaded_days_only=false) %}
+{{ config(fail_calc='coalesce(sum(failures), 0)') }}
+
+with counts as (
+    select
+    {%- for name, condition in checks.items() %}
+        count(*) filter (where not coalesce({{ condition }}, false)) as {{ name }},
+    {%- endfor %}
+    {%- for column in unique %}
+        count({{ column }}) - count(distinct {{ column }}) as {{ column }}_unique,
+    {%- endfor %}
+        count(*) as rows_checked
+    from {{ model }}
+    {%- if loaded_days_only %}
+    where {{ in_load_range() }}
+    {%- endif %}
+)
+
+{%- set names = checks.keys() | list %}
+{%- for column in unique %}
+    {%- do names.append(column ~ '_unique') %}
+{%- endfor %}
+
+{% for name in names %}
+select '{{ name }}' as check_name, {{ name }} as failures
+from counts
+where {{ name }} > 0
+{% if not loop.last %}union all{% endif %}
+{% endfor %}
+
+{% endtest %}
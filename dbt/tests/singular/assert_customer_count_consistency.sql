@@ -1,15 +1,22 @@
--- Test: El número de clientes únicos en staging debe coincidir con mart
+-- Test: El número de clientes únicos en staging debe coincidir con los del día en el mart
 -- Justificación: Cada cliente con transacciones en staging debe aparecer exactamente
--- una vez en la tabla agregada del mart.
+-- una vez en los agregados parciales del día que alimentan el mart incremental.
+-- Se cuenta por día, porque un backfill carga varios días en una misma corrida.
 
 with clientes_staging as (
-    select count(distinct customer_id) as cantidad_clientes
-    from {{ ref('stg_transactions') }}
+    select count(*) as cantidad_clientes
+    from (
+        select distinct ds_nodash, customer_id
+        from {{ ref('stg_transactions') }}
+        where {{ in_load_range() }}
+    )
 ),
 
 clientes_mart as (
     select count(*) as cantidad_clientes
-    from {{ ref('fct_customer_transactions') }}
+    from {{ ref('int_customer_transactions_daily') }}
+    where {{ in_load_range() }}
+        and transaction_count > 0
 )
 
 select
@@ -0,0 +1,78 @@
+-- Test: Las ventanas móviles del mart diario deben coincidir con recalcularlas
+-- desde los agregados diarios
+-- Justificación: El mart diario se actualiza solo para las fechas cuyas
+-- ventanas incluyen un día cargado. Cargar días fuera de orden o re-ejecutar
+-- un día no debe dejar ventanas desactualizadas ni filas de más.
+-- Solo se revisan las fechas que la corrida pudo cambiar, desde la primera
+-- fecha cargada hasta la ventana más larga después de la última, recalculadas
+-- con los parciales desde la ventana más larga antes, no toda la historia.
+
+{% set windows = var('rolling_window_days') %}
+{% set reach = windows | max - 1 %}
+
+with cargadas as (
+    select
+        min(transaction_date) as desde,
+        max(transaction_date) + interval {{ reach }} day as hasta
+    from {{ ref('int_customer_daily_partials') }}
+    where {{ in_load_range() }}
+),
+
+diario as (
+    select
+        parciales.customer_id,
+        parciales.transaction_date,
+        sum(parciales.transaction_count) as transaction_count,
+        sum(parciales.total_amount_all) as total_amount_all
+    from {{ ref('int_customer_daily_partials') }} as parciales, cargadas
+    where parciales.transaction_date
+        between cargadas.desde - interval {{ reach }} day and cargadas.hasta
+    group by parciales.customer_id, parciales.transaction_date
+),
+
+recalculado as (
+    select
+        customer_id,
+        transaction_date,
+        transaction_count
+        {%- for days in windows %},
+        sum(transaction_count) over (
+            partition by customer_id
+            order by transaction_date
+            range between interval {{ days - 1 }} day preceding and current row
+        ) as transaction_count_{{ days }}d,
+        sum(total_amount_all) over (
+            partition by customer_id
+            order by transaction_date
+            range between interval {{ days - 1 }} day preceding and current row
+        ) as total_amount_all_{{ days }}d
+        {%- endfor %}
+    from diario
+),
+
+esperado as (
+    select recalculado.*
+    from recalculado, cargadas
+    where recalculado.transaction_count > 0
+        and recalculado.transaction_date >= cargadas.desde
+),
+
+mart as (
+    select diario.*
+    from {{ ref('fct_customer_daily') }} as diario, cargadas
+    where diario.transaction_date between cargadas.desde and cargadas.hasta
+)
+
+select
+    coalesce(esperado.customer_id, mart.customer_id) as customer_id,
+    coalesce(esperado.transaction_date, mart.transaction_date) as transaction_date
+from esperado
+full outer join mart
+    on esperado.customer_id = mart.customer_id
+    and esperado.transaction_date = mart.transaction_date
+where esperado.customer_id is null
+    or mart.customer_id is null
+    {%- for days in windows %}
+    or esperado.transaction_count_{{ days }}d != mart.transaction_count_{{ days }}d
+    or abs(esperado.total_amount_all_{{ days }}d - mart.total_amount_all_{{ days }}d) > 0.01
+    {%- endfor %}
@@ -0,0 +1,44 @@
+-- Test: Cada cliente del mart debe coincidir con la suma de sus agregados diarios
+-- Justificación: El mart se actualiza de forma incremental sólo para los clientes
+-- del día cargado. Re-ejecutar un día no debe duplicar su aporte ni dejar
+-- clientes desactualizados.
+-- Solo se revisan los clientes de los días cargados en esta corrida, los únicos
+-- que el mart pudo cambiar, en lugar de reagregar toda la historia.
+
+with cargados as (
+    select distinct customer_id
+    from {{ ref('int_customer_transactions_daily') }}
+    where {{ in_load_range() }}
+),
+
+historico as (
+    select
+        customer_id,
+        sum(transaction_count) as transaction_count,
+        sum(total_amount_all) as total_amount_all
+    from {{ ref('int_customer_transactions_daily') }}
+    where customer_id in (select customer_id from cargados)
+    group by customer_id
+    having sum(transaction_count) > 0
+),
+
+mart as (
+    select
+        customer_id,
+        transaction_count,
+        total_amount_all
+    from {{ ref('fct_customer_transactions') }}
+    where customer_id in (select customer_id from cargados)
+)
+
+select
+    coalesce(historico.customer_id, mart.customer_id) as customer_id,
+    historico.transaction_count as transacciones_historico,
+    mart.transaction_count as transacciones_mart
+from historico
+full outer join mart
+    on historico.customer_id = mart.customer_id
+where historico.customer_id is null
+    or mart.customer_id is null
+    or historico.transaction_count != mart.transaction_count
+    or abs(historico.total_amount_all - mart.total_amount_all) > 0.01
@@ -1,17 +1,20 @@
--- Test: La suma de montos en staging debe ser igual a la suma de total_amount_all en mart
+-- Test: La suma de montos en staging debe ser igual al aporte del día al mart
 -- Justificación: Valida la integridad de datos entre capas - no debe perderse ni
--- duplicarse información durante la agregación.
+-- duplicarse información durante la agregación. El mart es incremental, así que
+-- se compara contra los agregados parciales del día que se está cargando.
 
 with totales_staging as (
     select
         sum(amount) as total_staging
     from {{ ref('stg_transactions') }}
+    where {{ in_load_range() }}
 ),
 
 totales_mart as (
     select
         sum(total_amount_all) as total_mart
-    from {{ ref('fct_customer_transactions') }}
+    from {{ ref('int_customer_transactions_daily') }}
+    where {{ in_load_range() }}
 )
 
 select
@@ -20,4 +23,9 @@ select
     abs(totales_staging.total_staging - totales_mart.total_mart) as diferencia
 from totales_staging
 cross join totales_mart
+{% if var('amount_type') == 'double' %}
 where abs(totales_staging.total_staging - totales_mart.total_mart) > 0.01
+{% else %}
+-- Con montos DECIMAL las sumas son exactas: no hay tolerancia
+where totales_staging.total_staging != totales_mart.total_mart
+{% endif %}
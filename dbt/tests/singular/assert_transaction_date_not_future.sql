@@ -7,4 +7,5 @@ select
     transaction_date,
     current_date as fecha_actual
 from {{ ref('stg_transactions') }}
-where transaction_date > current_date
+where {{ in_load_range() }}
+    and transaction_date > current_date
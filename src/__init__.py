@@ -1,2 +1 @@
 # Paquete de transformaciones del pipeline medallion
-
@@ -0,0 +1,406 @@
+"""Bronze cleaning with pyarrow.csv and Arrow compute kernels, no pandas."""
+
+from __future__ import annotations
+
+import functools
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from src.cleaning import (
+    DEFAULT_PROFILE,
+    ID_COLUMNS,
+    ID_PATTERN,
+    NA_VALUES,
+    NUMERIC_PATTERN,
+    REQUIRED_CHECKS,
+    STATUS_ARROW_TYPE,
+    STATUS_MAPPING,
+    STATUS_VALUES,
+    TIMESTAMP_FORMAT,
+    ArrowHandoff,
+    ReplayCheck,
+    _cast_extras,
+    _cluster_table,
+    _compact_id_types,
+    _compact_table,
+    _count_rejects,
+    _extra_columns,
+    _extra_types,
+    _id_bounds,
+    _read_header,
+    _reject_codes,
+    _reject_reasons,
+    _rejected_schema,
+    _write_and_hand_off,
+)
+from src.metrics import StageMetrics
+from src.writer_profiles import WriterProfile
+
+# pyarrow.compute generates its kernel functions at import time
+# pylint: disable=no-member
+
+
+def _coerce_amount_arrow(value: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Arrow counterpart of _coerce_amount: non-numeric text becomes null."""
+    is_numeric = pc.match_substring_regex(value, NUMERIC_PATTERN)
+    numeric = pc.if_else(is_numeric, pc.utf8_trim_whitespace(value), None)
+    amount = pc.cast(numeric, pa.float64())
+    # Exponents past the float64 range cast to +-inf
+    return pc.if_else(pc.is_finite(amount), amount, None)
+
+
+def _coerce_id_arrow(value: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Arrow counterpart of _coerce_id."""
+    is_id = pc.match_substring_regex(value, ID_PATTERN)
+    return pc.cast(pc.if_else(is_id, pc.utf8_trim_whitespace(value), None), pa.int64())
+
+
+def _normalize_status_arrow(
+    value: pa.Array | pa.ChunkedArray, mapping: dict[str, str] | None = None
+) -> pa.Array | pa.ChunkedArray:
+    """Arrow counterpart of _normalize_status: unknown statuses become null."""
+    if mapping is None:
+        mapping = STATUS_MAPPING
+    uniques = pc.unique(value)
+    normalized = pc.utf8_lower(pc.utf8_trim_whitespace(uniques))
+    keys = pa.array(list(mapping.keys()), pa.string())
+    key_codes = pa.array(
+        [STATUS_VALUES.index(status) for status in mapping.values()], pa.int8()
+    )
+    unique_codes = pc.take(key_codes, pc.index_in(normalized, value_set=keys))
+    codes = pc.take(unique_codes, pc.index_in(value, value_set=uniques))
+
+    dictionary = pa.array(STATUS_VALUES, pa.string())
+    if isinstance(codes, pa.ChunkedArray):
+        return pa.chunked_array(
+            [
+                pa.DictionaryArray.from_arrays(chunk, dictionary)
+                for chunk in codes.chunks
+            ],
+            STATUS_ARROW_TYPE,
+        )
+    return pa.DictionaryArray.from_arrays(codes, dictionary)
+
+
+def _parse_timestamp_arrow(value: pa.ChunkedArray) -> pa.ChunkedArray:
+    parsed = pc.strptime(value, format=TIMESTAMP_FORMAT, unit="ns", error_is_null=True)
+    # strptime rolls impossible dates over (Feb 30 -> Mar 2); null them like pandas
+    round_trip = pc.equal(
+        pc.strftime(pc.cast(parsed, pa.timestamp("s")), format=TIMESTAMP_FORMAT),
+        pc.utf8_trim_whitespace(value),
+    )
+    return pc.if_else(round_trip, parsed, pa.scalar(None, parsed.type))
+
+
+def _first_rows_arrow(table: pa.Table) -> pa.ChunkedArray:
+    """Positions of the first occurrence of every distinct row, in row order."""
+    row_number = "__row_number"
+    indexed = table.append_column(row_number, pa.array(np.arange(table.num_rows)))
+    first = indexed.group_by(table.column_names, use_threads=False).aggregate(
+        [(row_number, "min")]
+    )
+    first_rows = first[f"{row_number}_min"]
+    return pc.take(first_rows, pc.sort_indices(first_rows))
+
+
+def _drop_duplicates_arrow(table: pa.Table) -> pa.Table:
+    """Exact row de-duplication keeping the first occurrence, like pandas."""
+    return table.take(_first_rows_arrow(table))
+
+
+def _is_null_arrow(table: pa.Table, columns: list[str]) -> np.ndarray:
+    return functools.reduce(
+        pc.or_, [pc.is_null(table[name]) for name in columns]
+    ).to_numpy()
+
+
+def _read_raw_arrow(
+    source: Path | pa.NativeFile, columns: list[str], skip_rows: int = 1
+) -> pa.Table:
+    """Read a raw CSV, or a .gz/.zst one decompressed as a stream, as text."""
+    return pa_csv.read_csv(
+        source,
+        read_options=pa_csv.ReadOptions(column_names=columns, skip_rows=skip_rows),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in columns},
+            null_values=list(NA_VALUES),
+            strings_can_be_null=True,
+        ),
+    )
+
+
+def _clean_columns_arrow(
+    raw: pa.Table, status_mapping: dict[str, str]
+) -> tuple[pa.Table, np.ndarray]:
+    """Cleaned copy of every raw row, and its reject code (0 for clean rows)."""
+    # Cleaned columns replace the raw ones; raw stays intact for the rejects
+    columns = raw.column_names
+    table = raw
+    for name in ID_COLUMNS:
+        if name in columns:
+            table = table.set_column(
+                columns.index(name), name, _coerce_id_arrow(raw[name])
+            )
+
+    if "amount" in columns:
+        table = table.set_column(
+            columns.index("amount"), "amount", _coerce_amount_arrow(raw["amount"])
+        )
+
+    if "status" in columns:
+        table = table.set_column(
+            columns.index("status"),
+            "status",
+            _normalize_status_arrow(raw["status"], status_mapping),
+        )
+
+    if "transaction_ts" in columns:
+        table = table.set_column(
+            columns.index("transaction_ts"),
+            "transaction_ts",
+            _parse_timestamp_arrow(raw["transaction_ts"]),
+        )
+
+    invalid = [_is_null_arrow(table, names) for names in REQUIRED_CHECKS.values()]
+    if "transaction_ts" in columns:
+        invalid.append(_is_null_arrow(table, ["transaction_ts"]))
+    return table, _reject_codes(invalid)
+
+
+def _split_arrow(
+    raw: pa.Table,
+    table: pa.Table,
+    codes: np.ndarray,
+    metrics: StageMetrics,
+    is_replay: ReplayCheck | None,
+) -> tuple[pa.Table, pa.Table]:
+    """Split cleaned rows into the clean table and the rejected raw rows."""
+    columns = raw.column_names
+    _count_rejects(codes, metrics)
+    keep = codes == 0
+
+    # Rejected rows keep their raw values, except for the coerced IDs
+    rejected = raw
+    for name in ID_COLUMNS:
+        if name in columns:
+            rejected = rejected.set_column(columns.index(name), name, table[name])
+    rejected = (
+        rejected.filter(pa.array(~keep))
+        .cast(pa.schema(list(_rejected_schema(columns))[:-1]))
+        .append_column(
+            "reject_reason", pa.array(_reject_reasons(codes[~keep]), pa.string())
+        )
+    )
+
+    # Extras get their type from every distinct raw row, not just the clean ones
+    extras = _extra_types([raw.select(_extra_columns(columns))])
+    table = _cast_extras(table.filter(pa.array(keep)), extras)
+    if "transaction_ts" in columns:
+        table = table.append_column(
+            "transaction_date", pc.cast(table["transaction_ts"], pa.date32())
+        )
+
+    if is_replay is not None and table.num_rows:
+        replayed = is_replay(table["transaction_id"].to_numpy())
+        metrics.drop("cross_day_duplicate", replayed.sum())
+        table = table.filter(pa.array(~replayed))
+    return table, rejected
+
+
+def _write_arrow(
+    table: pa.Table,
+    rejected: pa.Table,
+    output_path: Path,
+    rejected_path: Path,
+    metrics: StageMetrics,
+    partition_prefix: str | None,
+    handoff: ArrowHandoff | None,
+    id_types: dict[str, pa.DataType] | None,
+    profile: WriterProfile,
+) -> None:
+    """Write the clean and rejected tables; ``id_types`` when compact_types."""
+    metrics.rows_written = table.num_rows
+    if id_types is not None:
+        table = _compact_table(table, id_types)
+    with metrics.timed("cluster"):
+        table = _cluster_table(table, profile)
+
+    with metrics.timed("write"):
+        pq.write_table(rejected, rejected_path)
+    _write_and_hand_off(table, output_path, partition_prefix, metrics, handoff, profile)
+
+
+def _clean_arrow(
+    input_path: Path,
+    output_path: Path,
+    rejected_path: Path,
+    metrics: StageMetrics,
+    status_mapping: dict[str, str],
+    is_replay: ReplayCheck | None = None,
+    partition_prefix: str | None = None,
+    handoff: ArrowHandoff | None = None,
+    compact: bool = False,
+    profile: WriterProfile = DEFAULT_PROFILE,
+) -> None:
+    """Clean the raw CSV with pyarrow.csv and compute kernels, no pandas."""
+    with metrics.timed("read"):
+        raw = _read_raw_arrow(input_path, _read_header(input_path))
+    metrics.rows_read = raw.num_rows
+
+    with metrics.timed("deduplicate"):
+        raw = _drop_duplicates_arrow(raw)
+    metrics.drop("duplicate", metrics.rows_read - raw.num_rows)
+
+    with metrics.timed("clean"):
+        table, codes = _clean_columns_arrow(raw, status_mapping)
+        # Compact IDs fit every valid ID read, as the streaming mode decides
+        id_types = _compact_id_types(_id_bounds([table])) if compact else None
+        table, rejected = _split_arrow(raw, table, codes, metrics, is_replay)
+    _write_arrow(
+        table,
+        rejected,
+        output_path,
+        rejected_path,
+        metrics,
+        partition_prefix,
+        handoff,
+        id_types,
+        profile,
+    )
+
+
+@dataclass(frozen=True)
+class RawChunk:
+    """Rows of a raw CSV: the byte range [start, end) after its header, or all of them."""
+
+    path: Path
+    start: int | None = None
+    end: int | None = None
+
+    def to_dict(self) -> dict:
+        """JSON-able form, e.g. to pass the chunk to an Airflow task."""
+        return {"path": str(self.path), "start": self.start, "end": self.end}
+
+    @classmethod
+    def from_dict(cls, values: dict) -> RawChunk:
+        """Inverse of to_dict."""
+        return cls(Path(values["path"]), values.get("start"), values.get("end"))
+
+
+def _read_chunk_arrow(chunk: RawChunk) -> pa.Table:
+    """Read the rows of a chunk as text, the schema every chunk of the file shares."""
+    columns = _read_header(chunk.path)
+    if chunk.start is None:
+        return _read_raw_arrow(chunk.path, columns)
+    with chunk.path.open("rb") as raw:
+        raw.seek(chunk.start)
+        data = raw.read(chunk.end - chunk.start)
+    if not data:
+        return pa.schema(
+            [pa.field(name, pa.string()) for name in columns]
+        ).empty_table()
+    return _read_raw_arrow(pa.BufferReader(data), columns, skip_rows=0)
+
+
+def _clean_shard(
+    chunk: RawChunk, status_mapping: dict[str, str]
+) -> tuple[pa.Table, pa.Table, np.ndarray, int]:
+    """Read, de-duplicate and clean one raw shard or chunk; runs in a pool worker.
+
+    Returns the distinct raw rows, their cleaned copies, reject codes and the
+    number of rows read. Nothing else is dropped, so duplicates across shards
+    can still be found on the raw values.
+    """
+    raw = _read_chunk_arrow(chunk)
+    rows_read = raw.num_rows
+    raw = _drop_duplicates_arrow(raw)
+    table, codes = _clean_columns_arrow(raw, status_mapping)
+    return raw, table, codes, rows_read
+
+
+def _clean_shards(
+    chunks: list[RawChunk], status_mapping: dict[str, str], workers: int
+) -> list[tuple[pa.Table, pa.Table, np.ndarray, int]]:
+    """_clean_shard of every chunk, ``workers`` at a time in a process pool."""
+    if workers <= 1 or len(chunks) <= 1:
+        return [_clean_shard(chunk, status_mapping) for chunk in chunks]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=multiprocessing.get_context("fork"),
+    ) as pool:
+        return list(pool.map(_clean_shard, chunks, itertools.repeat(status_mapping)))
+
+
+def _load_chunk(path: Path) -> tuple[pa.Table, pa.Table, np.ndarray, int]:
+    """Read back what clean_raw_chunk saved, as _clean_shard returns it."""
+    with pa.memory_map(str(path)) as source:
+        combined = pa.ipc.open_file(source).read_all()
+    columns = [name for name in combined.column_names if not name.startswith("__")]
+    cleaned = combined.select([f"__clean_{name}" for name in columns]).rename_columns(
+        columns
+    )
+    return (
+        combined.select(columns),
+        cleaned,
+        combined["__reject_code"].to_numpy(),
+        int(combined.schema.metadata[b"rows_read"]),
+    )
+
+
+def _merge_shards(
+    shards: list[tuple[pa.Table, pa.Table, np.ndarray, int]],
+    names: list[str],
+    output_path: Path,
+    rejected_path: Path,
+    metrics: StageMetrics,
+    is_replay: ReplayCheck | None = None,
+    partition_prefix: str | None = None,
+    handoff: ArrowHandoff | None = None,
+    compact: bool = False,
+    profile: WriterProfile = DEFAULT_PROFILE,
+) -> None:
+    """Merge cleaned shards, in file order, into the day's clean and rejected files.
+
+    Cleaning a row doesn't depend on the other rows, so identical raw rows
+    clean identically: the merge keeps the first occurrence of every distinct
+    raw row across shards, with its cleaned copy and code.
+    """
+    columns = shards[0][0].column_names
+    for name, (raw, *_) in zip(names, shards):
+        if raw.column_names != columns:
+            raise ValueError(
+                f"Raw shard {name} has columns {raw.column_names}, expected {columns}"
+            )
+    metrics.rows_read = sum(rows_read for *_, rows_read in shards)
+
+    with metrics.timed("deduplicate"):
+        raw = pa.concat_tables([shard[0] for shard in shards])
+        first = _first_rows_arrow(raw)
+        raw = raw.take(first)
+        table = pa.concat_tables([shard[1] for shard in shards]).take(first)
+        codes = np.concatenate([shard[2] for shard in shards])[first.to_numpy()]
+    metrics.drop("duplicate", metrics.rows_read - raw.num_rows)
+
+    with metrics.timed("clean"):
+        id_types = _compact_id_types(_id_bounds([table])) if compact else None
+        table, rejected = _split_arrow(raw, table, codes, metrics, is_replay)
+    _write_arrow(
+        table,
+        rejected,
+        output_path,
+        rejected_path,
+        metrics,
+        partition_prefix,
+        handoff,
+        id_types,
+        profile,
+    )
@@ -0,0 +1,114 @@
+"""Run a per-day step for many days in a process pool, keeping day-order side effects.
+
+Cleaning a day is independent of the other days except for its last part:
+the cross-day replay check has to see every earlier day in the index, and
+the index, the manifest and the warehouse take one writer at a time. Each
+worker gets a ``wait_turn`` callable that blocks until the earlier days of
+the batch have finished, so the expensive read/clean part of the days runs
+concurrently and only that ordered tail is serialized.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from src.id_index import TransactionIdIndex
+
+logger = logging.getLogger(__name__)
+
+DayStep = Callable[[str, Callable[[], None]], str]
+
+# Set in each worker process: one event per day of the batch, in day order
+_DONE_EVENTS: list | None = None
+
+
+def _init_worker(done_events: list) -> None:
+    global _DONE_EVENTS  # pylint: disable=global-statement
+    _DONE_EVENTS = done_events
+
+
+def _wait_turn(position: int) -> None:
+    """Block until every day before ``position`` in the batch has finished."""
+    for event in _DONE_EVENTS[:position]:
+        event.wait()
+
+
+def _run_in_turn(step: DayStep, position: int, ds_nodash: str) -> str:
+    try:
+        return step(ds_nodash, functools.partial(_wait_turn, position))
+    finally:
+        # Also on failure or skip, so the later days don't wait forever
+        _DONE_EVENTS[position].set()
+
+
+def run_days(
+    days: list[str], step: DayStep, workers: int
+) -> dict[str, str | BaseException]:
+    """Run ``step(ds_nodash, wait_turn)`` for every day, ``workers`` at a time.
+
+    Days start in ascending order and a day's ``wait_turn`` only waits for
+    days that started before it, so the pool can't deadlock. Returns the
+    outcome string ``step`` returned for each day, or the exception it raised.
+    The pool forks, so ``step`` and the configuration it reads are inherited
+    by the workers as they are in the caller.
+    """
+    days = sorted(days)
+    context = multiprocessing.get_context("fork")
+    done_events = [context.Event() for _ in days]
+    outcomes: dict[str, str | BaseException] = {}
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(workers, len(days))),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(done_events,),
+    ) as pool:
+        futures = {
+            ds_nodash: pool.submit(_run_in_turn, step, position, ds_nodash)
+            for position, ds_nodash in enumerate(days)
+        }
+        for ds_nodash, future in futures.items():
+            error = future.exception()
+            outcomes[ds_nodash] = future.result() if error is None else error
+            if error is not None:
+                logger.error("Backfill of %s failed: %s", ds_nodash, error)
+    return outcomes
+
+
+class OrderedIdIndex:
+    """TransactionIdIndex that waits for its turn before it is first used.
+
+    The index is (re)loaded from disk after the wait, so it contains the IDs
+    of every earlier day of the batch, and ``add`` can't race with another
+    worker writing the index.
+    """
+
+    def __init__(self, root: Path, wait_turn: Callable[[], None]):
+        self.root = root
+        self._wait_turn = wait_turn
+        self._index: TransactionIdIndex | None = None
+
+    def _loaded(self) -> TransactionIdIndex:
+        if self._index is None:
+            self._wait_turn()
+            self._index = TransactionIdIndex(self.root)
+        return self._index
+
+    @property
+    def days(self) -> dict[str, int]:
+        """See TransactionIdIndex.days."""
+        return self._loaded().days
+
+    def prior_duplicates(self, ds_nodash: str, ids: np.ndarray) -> np.ndarray:
+        """See TransactionIdIndex.prior_duplicates."""
+        return self._loaded().prior_duplicates(ds_nodash, ids)
+
+    def add(self, ds_nodash: str, ids: np.ndarray) -> None:
+        """See TransactionIdIndex.add."""
+        self._loaded().add(ds_nodash, ids)
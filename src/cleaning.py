@@ -0,0 +1,471 @@
+"""Checks, schemas and writers shared by every Bronze cleaning engine."""
+
+from __future__ import annotations
+
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.metrics import StageMetrics
+from src.writer_profiles import WRITER_PROFILES, WriterProfile
+
+# pyarrow.compute generates its kernel functions at import time
+# pylint: disable=no-member
+
+# Column the partitioned layout splits the clean rows by
+PARTITION_COLUMN = "transaction_date"
+
+REQUIRED_COLUMNS = ["transaction_id", "customer_id", "amount", "status"]
+ID_COLUMNS = ["transaction_id", "customer_id"]
+# Valid statuses, in the order of their categorical/dictionary/ENUM codes
+STATUS_VALUES = ("completed", "pending", "failed")
+STATUS_DTYPE = pd.CategoricalDtype(STATUS_VALUES)
+STATUS_ARROW_TYPE = pa.dictionary(pa.int8(), pa.string())
+# Default alias table: stripped, lower-cased raw status -> one of STATUS_VALUES
+STATUS_MAPPING = {
+    "completed": "completed",
+    "pending": "pending",
+    "failed": "failed",
+}
+# Row-level checks, in the order they apply; a row failing one of them goes
+# to the rejected sidecar with the first failing check as reject_reason
+REJECT_REASONS = ("missing_id", "invalid_amount", "invalid_status", "invalid_timestamp")
+# Why a raw row doesn't reach the clean file; each row counts once
+DROP_REASONS = ("duplicate", *REJECT_REASONS, "cross_day_duplicate")
+REQUIRED_CHECKS = {
+    "missing_id": ID_COLUMNS,
+    "invalid_amount": ["amount"],
+    "invalid_status": ["status"],
+}
+
+# Format of the raw timestamps on every engine; anything else is a bad timestamp
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Integer IDs up to 18 digits, which always fit int64; other IDs are missing
+ID_PATTERN = r"^ *-?[0-9]{1,18} *$"
+# Raw values every engine reads as missing: pandas' default NA tokens
+NA_VALUES = (
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+)
+
+# Decimal or scientific numbers, as the arrow engine accepts for amounts
+NUMERIC_PATTERN = r"^\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*$"
+
+# Declared raw columns; every engine reads them as text, so duplicates are
+# found on the raw values, and coerces them itself
+RAW_COLUMNS = ("transaction_id", "customer_id", "amount", "status", "transaction_ts")
+# Undeclared columns are read as text too and written as the first of these
+# types that every value of the day matches, or as strings
+EXTRA_PATTERNS = {pa.int64(): ID_PATTERN, pa.float64(): NUMERIC_PATTERN}
+
+# Output types of the clean parquet file, shared by every row group
+CLEAN_SCHEMA = pa.schema(
+    [
+        ("transaction_id", pa.int64()),
+        ("customer_id", pa.int64()),
+        ("amount", pa.float64()),
+        ("status", STATUS_ARROW_TYPE),
+        ("transaction_ts", pa.timestamp("ns")),
+        ("transaction_date", pa.date32()),
+    ]
+)
+# compact_types=True: amount as exact cents, and each ID column as the first of
+# COMPACT_ID_TYPES that every valid ID read that day fits in
+COMPACT_TYPES = {"amount": pa.decimal128(18, 2)}
+COMPACT_ID_TYPES = (pa.int32(), pa.int64())
+DEFAULT_PROFILE = WRITER_PROFILES["default"]
+
+
+def _coerce_amount(value: pd.Series) -> pd.Series:
+    """Normalize numeric fields and drop non-coercible or non-finite entries."""
+    coerced = pd.to_numeric(value, errors="coerce")
+    return coerced.where(np.isfinite(coerced))
+
+
+def _coerce_id(value: pd.Series) -> pd.Series:
+    """Nullable integer IDs; entries not matching ID_PATTERN become missing."""
+    text = value.astype("string")
+    is_id = text.str.match(ID_PATTERN).fillna(False).astype(bool)
+    return pd.to_numeric(text.where(is_id).str.strip(), errors="coerce").astype("Int64")
+
+
+def _status_mapping(aliases: dict[str, str] | None) -> dict[str, str]:
+    """Alias table with normalized keys, checked against STATUS_VALUES."""
+    mapping = {
+        alias.strip().lower(): status
+        for alias, status in (STATUS_MAPPING if aliases is None else aliases).items()
+    }
+    unknown = set(mapping.values()) - set(STATUS_VALUES)
+    if unknown:
+        raise ValueError(
+            f"Status aliases map to {sorted(unknown)}, expected one of {STATUS_VALUES}"
+        )
+    return mapping
+
+
+def _normalize_status(
+    value: pd.Series, mapping: dict[str, str] | None = None
+) -> pd.Series:
+    """Categorical status; only the distinct raw values are normalized."""
+    if mapping is None:
+        mapping = STATUS_MAPPING
+    codes, uniques = pd.factorize(value)
+    normalized = pd.Index(uniques).astype(str).str.strip().str.lower().map(mapping)
+    # Trailing -1 so missing raw values (code -1) stay missing
+    lookup = np.append(pd.Categorical(normalized, dtype=STATUS_DTYPE).codes, -1)
+    return pd.Series(
+        pd.Categorical.from_codes(lookup[codes], dtype=STATUS_DTYPE),
+        index=value.index,
+        name=value.name,
+    )
+
+
+def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = [col.strip().lower() for col in df.columns]
+    return df
+
+
+def _reject_codes(invalid: list[np.ndarray]) -> np.ndarray:
+    """Per row, 1 + index of the first failing REJECT_REASONS check, 0 if clean."""
+    return np.select(invalid, range(1, len(invalid) + 1), 0).astype(np.int8)
+
+
+def _count_rejects(codes: np.ndarray, metrics: StageMetrics) -> None:
+    counts = np.bincount(codes, minlength=len(REJECT_REASONS) + 1)
+    for reason, count in zip(REJECT_REASONS, counts[1:]):
+        metrics.drop(reason, count)
+
+
+def _reject_reasons(codes: np.ndarray) -> np.ndarray:
+    return np.array(REJECT_REASONS, dtype=object)[codes - 1]
+
+
+def _rejected_schema(columns: list[str]) -> pa.Schema:
+    """Raw columns of the rejected rows: coerced int64 IDs, raw text otherwise."""
+    return pa.schema(
+        [
+            pa.field(name, pa.int64() if name in ID_COLUMNS else pa.string())
+            for name in columns
+        ]
+        + [pa.field("reject_reason", pa.string())]
+    )
+
+
+def _rejected_table(rejected: pd.DataFrame) -> pa.Table:
+    columns = [name for name in rejected.columns if name != "reject_reason"]
+    converted = {
+        name: (
+            _coerce_id(rejected[name])
+            if name in ID_COLUMNS
+            else rejected[name].astype("string")
+        )
+        for name in rejected.columns
+    }
+    return pa.Table.from_pandas(
+        pd.DataFrame(converted), schema=_rejected_schema(columns), preserve_index=False
+    )
+
+
+def _clean_frame(
+    df: pd.DataFrame, metrics: StageMetrics, status_mapping: dict[str, str]
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Coerce and normalize a de-duplicated frame, split into clean and rejected rows.
+
+    ``df`` is not modified, so the rejected frame keeps its raw values, plus
+    a ``reject_reason`` column.
+    """
+    cleaned = {name: _coerce_id(df[name]) for name in ID_COLUMNS if name in df.columns}
+    if "amount" in df.columns:
+        cleaned["amount"] = _coerce_amount(df["amount"])
+
+    if "status" in df.columns:
+        cleaned["status"] = _normalize_status(df["status"], status_mapping)
+
+    missing = pd.DataFrame(
+        {name: cleaned.get(name, df[name]).isna() for name in REQUIRED_COLUMNS}
+    )
+    codes = _reject_codes(
+        [
+            missing[columns].any(axis=1).to_numpy()
+            for columns in REQUIRED_CHECKS.values()
+        ]
+    )
+
+    # Add simple derived fields for downstream dbt modeling
+    if "transaction_ts" in df.columns:
+        # A fixed format, not one inferred per frame, so every batch of a
+        # streamed file parses the same; only complete rows can be invalid_timestamp
+        complete = codes == 0
+        transaction_ts = pd.to_datetime(
+            df.loc[complete, "transaction_ts"], format=TIMESTAMP_FORMAT, errors="coerce"
+        )
+        invalid_ts = np.flatnonzero(complete)[transaction_ts.isna().to_numpy()]
+        codes[invalid_ts] = REJECT_REASONS.index("invalid_timestamp") + 1
+    _count_rejects(codes, metrics)
+
+    keep = codes == 0
+    clean = {name: cleaned.get(name, df[name])[keep] for name in df.columns}
+    for name in ID_COLUMNS:
+        if name in clean:
+            # Clean rows have every ID, so they don't need the nullable dtype
+            clean[name] = clean[name].astype(np.int64)
+    if "transaction_ts" in df.columns:
+        clean["transaction_ts"] = transaction_ts[keep[complete]]
+        clean["transaction_date"] = clean["transaction_ts"].dt.date
+
+    rejected = df.loc[~keep].assign(reject_reason=_reject_reasons(codes[~keep]))
+    return pd.DataFrame(clean), rejected
+
+
+# Mask of the clean transaction IDs already loaded on an earlier day
+ReplayCheck = Callable[[np.ndarray], np.ndarray]
+# Receives the clean day as Arrow, e.g. to load it into the warehouse
+ArrowHandoff = Callable[[pa.Table], object]
+
+
+def _drop_replays(
+    df: pd.DataFrame, is_replay: ReplayCheck | None, metrics: StageMetrics
+) -> pd.DataFrame:
+    if is_replay is None or df.empty:
+        return df
+    replayed = is_replay(df["transaction_id"].to_numpy())
+    metrics.drop("cross_day_duplicate", replayed.sum())
+    return df.loc[~replayed]
+
+
+def _extra_columns(columns: list[str]) -> list[str]:
+    return [name for name in columns if name not in RAW_COLUMNS]
+
+
+def _extra_types(tables: Iterable[pa.Table]) -> dict[str, pa.DataType]:
+    """Type of each undeclared column, from all of the day's raw text values.
+
+    ``tables`` hold the extra columns of every raw row, split in any way, so
+    shards, chunks and batches get the type the whole day would.
+    """
+    candidates: dict[str, list[pa.DataType]] = {}
+    with_values: set[str] = set()
+    for table in tables:
+        for name in table.column_names:
+            values = pc.drop_null(table[name])
+            types = candidates.setdefault(name, list(EXTRA_PATTERNS))
+            if len(values):
+                with_values.add(name)
+                candidates[name] = [
+                    type_
+                    for type_ in types
+                    if pc.all(
+                        pc.match_substring_regex(values, EXTRA_PATTERNS[type_])
+                    ).as_py()
+                ]
+    return {
+        name: types[0] if name in with_values and types else pa.string()
+        for name, types in candidates.items()
+    }
+
+
+def _cast_extras(table: pa.Table, types: dict[str, pa.DataType]) -> pa.Table:
+    """Cast the text extra columns of a clean table to their _extra_types."""
+    for name, type_ in types.items():
+        if name in table.column_names and type_ != pa.string():
+            values = pc.cast(pc.utf8_trim_whitespace(table[name]), type_)
+            table = table.set_column(table.column_names.index(name), name, values)
+    return table
+
+
+def _clean_schema(id_types: dict[str, pa.DataType] | None = None) -> pa.Schema:
+    """CLEAN_SCHEMA, or its compact_types version with ``id_types`` for the IDs."""
+    if id_types is None:
+        return CLEAN_SCHEMA
+    types = {**COMPACT_TYPES, **id_types}
+    return pa.schema(
+        [
+            pa.field(field.name, types.get(field.name, field.type))
+            for field in CLEAN_SCHEMA
+        ]
+    )
+
+
+def _batch_schema(
+    columns: list[str],
+    id_types: dict[str, pa.DataType] | None = None,
+    extras: dict[str, pa.DataType] | None = None,
+) -> pa.Schema:
+    """Fixed parquet schema for a batch: declared types, then ``extras`` or strings.
+
+    ``id_types`` selects the compact_types schema, as in _clean_schema.
+    """
+    schema = _clean_schema(id_types)
+    extras = extras or {}
+    return pa.schema(
+        [
+            (
+                schema.field(name)
+                if name in schema.names
+                else pa.field(name, extras.get(name, pa.string()))
+            )
+            for name in columns
+        ]
+    )
+
+
+def _id_bounds(
+    tables: Iterable[pa.Table],
+    bounds: dict[str, tuple[int, int] | None] | None = None,
+) -> dict[str, tuple[int, int] | None]:
+    """[min, max] of each coerced ID column over ``tables``, None without IDs.
+
+    ``bounds`` from earlier tables are widened, e.g. batch by batch.
+    """
+    bounds = dict(bounds or {})
+    for table in tables:
+        for name in ID_COLUMNS:
+            if name not in table.column_names:
+                continue
+            low, high = pc.min_max(table[name]).values()
+            seen = bounds.setdefault(name, None)
+            if low.is_valid:
+                bounds[name] = (
+                    (low.as_py(), high.as_py())
+                    if seen is None
+                    else (min(seen[0], low.as_py()), max(seen[1], high.as_py()))
+                )
+    return bounds
+
+
+def _compact_id_types(
+    bounds: dict[str, tuple[int, int] | None],
+) -> dict[str, pa.DataType]:
+    """First COMPACT_ID_TYPES type each ID column's bounds (if any) fit in."""
+    types = {}
+    for name in ID_COLUMNS:
+        bound = bounds.get(name)
+        for type_ in COMPACT_ID_TYPES:
+            info = np.iinfo(type_.to_pandas_dtype())
+            if bound is None or (info.min <= bound[0] and bound[1] <= info.max):
+                types[name] = type_
+                break
+    return types
+
+
+def _compact_table(table: pa.Table, id_types: dict[str, pa.DataType]) -> pa.Table:
+    """Cast a clean table to COMPACT_TYPES and ``id_types``.
+
+    Amounts are rounded to cents half away from zero, as DuckDB's
+    CAST(round(amount, 2) AS DECIMAL(18, 2)) does.
+    """
+    if "amount" in table.column_names:
+        amount = pc.round(table["amount"], 2, round_mode="half_towards_infinity")
+        table = table.set_column(table.column_names.index("amount"), "amount", amount)
+    types = {**COMPACT_TYPES, **id_types}
+    return table.cast(
+        pa.schema(
+            [
+                pa.field(field.name, types.get(field.name, field.type))
+                for field in table.schema
+            ]
+        )
+    )
+
+
+def _write_partitioned(
+    table: pa.Table,
+    clean_dir: Path,
+    prefix: str,
+    profile: WriterProfile = DEFAULT_PROFILE,
+) -> None:
+    """Append a table to the hive-partitioned dataset under clean_dir."""
+    pq.write_to_dataset(
+        table,
+        clean_dir,
+        partition_cols=[PARTITION_COLUMN],
+        basename_template=prefix + "{i}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        row_group_size=profile.row_group_size,
+        **profile.pyarrow_options(),
+    )
+
+
+def _write_clean(
+    table: pa.Table,
+    output_path: Path,
+    partition_prefix: str | None,
+    profile: WriterProfile,
+) -> None:
+    if partition_prefix is not None:
+        _write_partitioned(table, output_path, partition_prefix, profile)
+    else:
+        pq.write_table(
+            table,
+            output_path,
+            row_group_size=profile.row_group_size,
+            **profile.pyarrow_options(),
+        )
+
+
+def _cluster_table(table: pa.Table, profile: WriterProfile) -> pa.Table:
+    """Sort by the profile's cluster_by columns; the sort is stable, ties keep file order."""
+    keys = [
+        (name, "ascending") for name in profile.cluster_by if name in table.column_names
+    ]
+    return table.sort_by(keys) if keys else table
+
+
+def _write_and_hand_off(
+    table: pa.Table,
+    output_path: Path,
+    partition_prefix: str | None,
+    metrics: StageMetrics,
+    handoff: ArrowHandoff | None,
+    profile: WriterProfile,
+) -> None:
+    """Write the clean parquet, in the background while ``handoff`` consumes the table.
+
+    Both pyarrow and DuckDB release the GIL, so the parquet encoding and the
+    warehouse load overlap; the parquet is complete when this returns.
+    """
+    if handoff is None:
+        with metrics.timed("write"):
+            _write_clean(table, output_path, partition_prefix, profile)
+        return
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        written = pool.submit(
+            _write_clean, table, output_path, partition_prefix, profile
+        )
+        with metrics.timed("handoff"):
+            handoff(table)
+        with metrics.timed("write"):
+            written.result()
+
+
+def _read_header(input_path: Path) -> list[str]:
+    # Decompresses .gz/.zst shards by their extension, only up to the header
+    with pa.input_stream(str(input_path), compression="detect") as stream:
+        raw = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        header = next(csv.reader(raw), [])
+    return [col.strip().lower() for col in header]
@@ -0,0 +1,277 @@
+"""Single-scan data quality engine for the column rules declared in dbt.
+
+``dbt test`` runs each schema test as its own query over the model. The rules
+declared with the ``column_checks`` generic test are read here from the
+models' schema.yml and evaluated with one aggregate query per model, which
+returns the failing row count and a sample of failing keys for every rule.
+The keys sampled are the model's ``config.meta.dq_key`` columns, or its
+``unique`` columns. Exit semantics follow dbt's: a failing rule of severity
+``error`` (the default) or a query error gives returncode 1, ``warn`` rules
+only report.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import duckdb
+import yaml
+
+logger = logging.getLogger(__name__)
+
+CHECKS_TEST = "column_checks"
+SEVERITIES = ("error", "warn")
+SAMPLE_SIZE = 5
+
+
+@dataclass(frozen=True)
+class ModelChecks:
+    """The column rules of one model, as declared in its column_checks test."""
+
+    model: str
+    checks: dict[str, str]
+    unique: tuple[str, ...] = ()
+    loaded_days_only: bool = False
+    key: tuple[str, ...] = ()
+    severity: str = "error"
+
+    def __post_init__(self) -> None:
+        if self.severity not in SEVERITIES:
+            raise ValueError(
+                f"Unknown severity {self.severity!r}, expected one of {SEVERITIES}"
+            )
+
+    def rules(self) -> dict[str, str]:
+        """Condition each row must meet per rule name, ``unique`` ones included."""
+        rules = {
+            name: f"coalesce({condition}, false)"
+            for name, condition in self.checks.items()
+        }
+        for column in self.unique:
+            rules[f"{column}_unique"] = f"({column} is null or __{column}_seen = 1)"
+        return rules
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one rule, with dbt's status names (pass, fail, warn, error)."""
+
+    model: str
+    check: str
+    status: str
+    failures: int
+    rows_checked: int
+    severity: str = "error"
+    sample_keys: list[dict] = field(default_factory=list)
+    message: str | None = None
+
+
+@dataclass
+class QualityReport:
+    """Every rule evaluated by run_model_checks and how long the scans took."""
+
+    results: list[CheckResult]
+    elapsed_seconds: float
+    scans: int = 0
+    model_seconds: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def returncode(self) -> int:
+        """1 if a rule of severity error failed or errored, as `dbt test` exits."""
+        return int(any(result.status in ("fail", "error") for result in self.results))
+
+    @property
+    def success(self) -> bool:
+        """True when returncode is 0."""
+        return self.returncode == 0
+
+    def as_nodes(self) -> list[dict]:
+        """One entry per model scan, shaped like ``DbtInvocation.nodes``."""
+        nodes = []
+        for model, seconds in self.model_seconds.items():
+            results = [result for result in self.results if result.model == model]
+            statuses = {result.status for result in results}
+            nodes.append(
+                {
+                    "unique_id": f"{CHECKS_TEST}.{model}",
+                    "status": next(
+                        (
+                            status
+                            for status in ("error", "fail", "warn")
+                            if status in statuses
+                        ),
+                        "pass",
+                    ),
+                    "execution_time": seconds,
+                    "message": None,
+                    "failures": sum(result.failures for result in results),
+                    "rows_affected": None,
+                }
+            )
+        return nodes
+
+    def to_dict(self) -> dict:
+        """JSON-able form, as dq_results stores it under column_checks."""
+        return {
+            "returncode": self.returncode,
+            "elapsed_seconds": self.elapsed_seconds,
+            "scans": self.scans,
+            "model_seconds": self.model_seconds,
+            "results": [asdict(result) for result in self.results],
+        }
+
+
+def _checks_tests(model: dict) -> list[dict]:
+    """The column_checks entries of a schema.yml model (``tests`` or ``data_tests``)."""
+    entries = [*(model.get("tests") or []), *(model.get("data_tests") or [])]
+    return [
+        entry[CHECKS_TEST]
+        for entry in entries
+        if isinstance(entry, dict) and CHECKS_TEST in entry
+    ]
+
+
+def load_model_checks(project_dir: Path) -> list[ModelChecks]:
+    """Read the column_checks declarations of every model under ``models/``."""
+    declared = []
+    for path in sorted((project_dir / "models").rglob("*.yml")):
+        schema = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        for model in schema.get("models") or []:
+            meta = (model.get("config") or {}).get("meta") or model.get("meta") or {}
+            for test in _checks_tests(model):
+                arguments = test.get("arguments", test)
+                unique = tuple(arguments.get("unique") or ())
+                severity = (test.get("config") or {}).get("severity", "error")
+                declared.append(
+                    ModelChecks(
+                        model=model["name"],
+                        checks=dict(arguments.get("checks") or {}),
+                        unique=unique,
+                        loaded_days_only=bool(arguments.get("loaded_days_only", False)),
+                        key=tuple(meta.get("dq_key") or unique),
+                        severity=str(severity).lower(),
+                    )
+                )
+    return declared
+
+
+def build_checks_query(spec: ModelChecks, sample_size: int = SAMPLE_SIZE) -> str:
+    """One aggregate query over ``spec.model`` returning a count and key sample per rule.
+
+    With ``loaded_days_only`` the query takes the first and last ds_nodash of
+    the run as its two parameters. ``unique`` columns are numbered with a
+    window over the same scan, so every row after the first of a value fails.
+    """
+    rules = spec.rules()
+    seen = "".join(
+        f", row_number() over (partition by {column} order by {', '.join(spec.key) or column})"
+        f" as __{column}_seen"
+        for column in spec.unique
+    )
+    where = " where ds_nodash between ? and ?" if spec.loaded_days_only else ""
+    key = "{" + ", ".join(f"'{column}': {column}" for column in spec.key) + "}"
+    measures = []
+    for name, condition in rules.items():
+        measures.append(f"count(*) filter (where not {condition}) as {name}")
+        if spec.key:
+            measures.append(
+                f"min_by({key}, {key}, {int(sample_size)}) filter (where not {condition})"
+                f" as {name}__sample"
+            )
+    return (
+        f"with scanned as (select *{seen} from {spec.model}{where})\n"
+        f"select count(*) as rows_checked, {', '.join(measures)}\nfrom scanned"
+    )
+
+
+def _check_model(
+    con: duckdb.DuckDBPyConnection,
+    spec: ModelChecks,
+    start_ds_nodash: str,
+    end_ds_nodash: str,
+    sample_size: int,
+) -> list[CheckResult]:
+    rules = spec.rules()
+    parameters = [start_ds_nodash, end_ds_nodash] if spec.loaded_days_only else []
+    try:
+        cursor = con.execute(build_checks_query(spec, sample_size), parameters)
+        row = dict(zip([column[0] for column in cursor.description], cursor.fetchone()))
+    except duckdb.Error as error:
+        logger.error("Column checks of %s failed to run: %s", spec.model, error)
+        return [
+            CheckResult(
+                spec.model, name, "error", 0, 0, spec.severity, message=str(error)
+            )
+            for name in rules
+        ]
+
+    results = []
+    for name in rules:
+        failures = row[name]
+        status = (
+            "pass" if failures == 0 else ("warn" if spec.severity == "warn" else "fail")
+        )
+        results.append(
+            CheckResult(
+                model=spec.model,
+                check=name,
+                status=status,
+                failures=failures,
+                rows_checked=row["rows_checked"],
+                severity=spec.severity,
+                sample_keys=row.get(f"{name}__sample") or [],
+            )
+        )
+    return results
+
+
+def run_model_checks(
+    duckdb_path: Path,
+    specs: list[ModelChecks],
+    start_ds_nodash: str,
+    end_ds_nodash: str | None = None,
+    sample_size: int = SAMPLE_SIZE,
+) -> QualityReport:
+    """Evaluate every model's rules with one scan per model of the warehouse.
+
+    Rules with ``loaded_days_only`` only read ds_nodash from
+    ``start_ds_nodash`` to ``end_ds_nodash`` (the same day by default).
+    """
+    start = time.perf_counter()
+    results = []
+    model_seconds = {}
+    with duckdb.connect(str(duckdb_path)) as con:
+        for spec in specs:
+            model_start = time.perf_counter()
+            results.extend(
+                _check_model(
+                    con,
+                    spec,
+                    start_ds_nodash,
+                    end_ds_nodash or start_ds_nodash,
+                    sample_size,
+                )
+            )
+            model_seconds[spec.model] = time.perf_counter() - model_start
+    report = QualityReport(
+        results,
+        time.perf_counter() - start,
+        scans=len(specs),
+        model_seconds=model_seconds,
+    )
+    failed = [
+        f"{result.model}.{result.check}"
+        for result in results
+        if result.status != "pass"
+    ]
+    logger.info(
+        "Column checks: %d rules over %d models in %.2fs, not passing: %s",
+        len(results),
+        len(specs),
+        report.elapsed_seconds,
+        ", ".join(failed) or "none",
+    )
+    return report
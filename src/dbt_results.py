@@ -0,0 +1,95 @@
+"""Record the outcome of a dbt invocation: stage metrics and the dq_results file."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from src.metrics import StageMetrics, peak_rss_bytes, record_stage_metrics
+
+if TYPE_CHECKING:
+    from src.data_quality import QualityReport
+    from src.dbt_runner import DbtInvocation
+
+DQ_RESULTS_TEMPLATE = "dq_results_{ds_nodash}.json"
+
+
+def quality_returncode(result: DbtInvocation, checks: QualityReport | None) -> int:
+    """Combined exit code, with `dbt test` semantics (0 ok, 1 failures)."""
+    return max(result.returncode, checks.returncode if checks else 0)
+
+
+def record_dbt_metrics(
+    quality_dir: Path,
+    stage: str,
+    ds_nodash: str,
+    result: DbtInvocation,
+    batch: tuple[str, str] | None = None,
+    checks: QualityReport | None = None,
+    **fields,
+) -> None:
+    """Record the dbt wall time and node statuses in metrics_<ds_nodash>.json.
+
+    In a backfill ``batch`` is the range of days the same invocation covered.
+    ``checks`` adds the time and statuses of the column_checks rules.
+    """
+    statuses: dict[str, int] = {}
+    for node in result.nodes:
+        statuses[node["status"]] = statuses.get(node["status"], 0) + 1
+    timings = {f"dbt_{result.command}": result.elapsed_seconds}
+    if checks is not None:
+        timings["column_checks"] = checks.elapsed_seconds
+        for check in checks.results:
+            statuses[check.status] = statuses.get(check.status, 0) + 1
+    metrics = StageMetrics(
+        stage=stage,
+        ds_nodash=ds_nodash,
+        timings=timings,
+        wall_seconds=sum(timings.values()),
+        peak_rss_bytes=peak_rss_bytes(),
+        details={
+            "execution_mode": result.mode,
+            "returncode": result.returncode,
+            "manifest_reused": result.manifest_reused,
+            "parse_seconds": result.parse_seconds,
+            "parse_saved_seconds": result.saved_seconds,
+            "nodes": statuses,
+            "batch": list(batch) if batch else None,
+        },
+        **fields,
+    )
+    record_stage_metrics(quality_dir, metrics)
+
+
+def write_dq_results(
+    quality_dir: Path,
+    ds_nodash: str,
+    result: DbtInvocation,
+    batch: tuple[str, str] | None = None,
+    checks: QualityReport | None = None,
+) -> Path:
+    """Write quality_dir/dq_results_<ds_nodash>.json with the test results.
+
+    ``column_checks`` has one entry per rule, with its failures and sample
+    keys, when the single-scan engine evaluated them.
+    """
+    quality_dir.mkdir(parents=True, exist_ok=True)
+    dq_path = quality_dir / DQ_RESULTS_TEMPLATE.format(ds_nodash=ds_nodash)
+
+    returncode = quality_returncode(result, checks)
+    payload = {
+        "ds_nodash": ds_nodash,
+        "status": "passed" if returncode == 0 else "failed",
+        "returncode": returncode,
+        "execution_mode": result.mode,
+        "elapsed_seconds": result.elapsed_seconds,
+        "column_checks": checks.to_dict() if checks else None,
+        "results": result.nodes,
+        "stdout": result.stdout,
+        "stderr": result.stderr,
+    }
+    if batch is not None:
+        payload["batch"] = {"start_ds_nodash": batch[0], "end_ds_nodash": batch[1]}
+    dq_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return dq_path
@@ -0,0 +1,280 @@
+"""Run dbt commands in-process through dbtRunner, with the dbt CLI as fallback."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import subprocess
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from src.manifest import fingerprint_tree
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_MODES = ("inprocess", "subprocess")
+
+# Env vars read with env_var() by the project/profile that change the parse. The
+# days of a run (DS_NODASH, END_DS_NODASH) are only read when executing, so one
+# parse serves every day
+PARSE_ENV_VARS = (
+    "DBT_PROFILES_DIR",
+    "CLEAN_DIR",
+    "CLEAN_LAYOUT",
+    "CLEAN_SOURCE",
+    "COMPACT_TYPES",
+    "TRANSACTION_ID_TYPE",
+    "CUSTOMER_ID_TYPE",
+    "STAGING_MATERIALIZATION",
+    "DUCKDB_PATH",
+)
+PROJECT_SOURCES = (
+    "dbt_project.yml",
+    "models/**/*.sql",
+    "models/**/*.yml",
+    "macros/**/*.sql",
+    "tests/**/*.sql",
+)
+
+# dbt's own parse cache, reused by every process that runs the project
+PARTIAL_PARSE_FILE = Path("target") / "partial_parse.msgpack"
+# Key of the timings file holding the seconds of a parse without PARTIAL_PARSE_FILE
+COLD_PARSE_KEY = "cold_parse"
+
+# Parsed manifests kept for the life of the worker process
+_MANIFEST_CACHE: dict[tuple, object] = {}
+
+
+@dataclass
+class DbtInvocation:
+    """Outcome of one dbt command, whichever way it was executed."""
+
+    command: str
+    mode: str
+    returncode: int
+    elapsed_seconds: float
+    stdout: str = ""
+    stderr: str = ""
+    nodes: list[dict] = field(default_factory=list)
+    manifest_reused: bool = False
+    parse_seconds: float | None = None
+    cold_parse: bool = False
+    saved_seconds: float | None = None
+
+    @property
+    def success(self) -> bool:
+        """True when dbt exited with 0."""
+        return self.returncode == 0
+
+    def to_dict(self) -> dict:
+        """JSON-able form of every field."""
+        return asdict(self)
+
+
+@contextmanager
+def _project_env(project_dir: Path, env: dict[str, str]) -> Iterator[None]:
+    """Temporarily apply env and cwd the way the CLI subprocess would see them."""
+    previous_env = os.environ.copy()
+    previous_cwd = Path.cwd()
+    os.environ.update(env)
+    os.chdir(project_dir)
+    try:
+        yield
+    finally:
+        os.chdir(previous_cwd)
+        os.environ.clear()
+        os.environ.update(previous_env)
+
+
+def _manifest_key(project_dir: Path, env: dict[str, str]) -> tuple:
+    return (
+        str(project_dir),
+        tuple(env.get(name) for name in PARSE_ENV_VARS),
+        fingerprint_tree(project_dir, PROJECT_SOURCES),
+    )
+
+
+def _node_results(result: object) -> list[dict]:
+    """Flatten dbt's RunExecutionResult into plain dicts."""
+    nodes = []
+    for node_result in getattr(result, "results", None) or []:
+        adapter_response = node_result.adapter_response or {}
+        nodes.append(
+            {
+                "unique_id": node_result.node.unique_id,
+                "status": str(node_result.status),
+                "execution_time": node_result.execution_time,
+                "message": node_result.message,
+                "failures": node_result.failures,
+                "rows_affected": adapter_response.get("rows_affected"),
+            }
+        )
+    return nodes
+
+
+def _run_results_nodes(project_dir: Path, since: float) -> list[dict]:
+    """Nodes of target/run_results.json, if the invocation started at ``since`` wrote it."""
+    path = project_dir / "target" / "run_results.json"
+    if not path.exists() or path.stat().st_mtime < since:
+        return []
+    run_results = json.loads(path.read_text(encoding="utf-8"))
+    return [
+        {
+            "unique_id": node_result["unique_id"],
+            "status": node_result["status"],
+            "execution_time": node_result["execution_time"],
+            "message": node_result.get("message"),
+            "failures": node_result.get("failures"),
+            "rows_affected": (node_result.get("adapter_response") or {}).get(
+                "rows_affected"
+            ),
+        }
+        for node_result in run_results.get("results", [])
+    ]
+
+
+def _run_inprocess(
+    command: str, project_dir: Path, env: dict[str, str], args: tuple[str, ...] = ()
+) -> DbtInvocation:
+    # Imported here so the fallback works where dbt is only available as a CLI
+    from dbt.cli.main import dbtRunner  # pylint: disable=import-outside-toplevel
+
+    cli_args = [command, *args, "--project-dir", str(project_dir)]
+    start = time.perf_counter()
+    with _project_env(project_dir, env):
+        key = _manifest_key(project_dir, env)
+        manifest = _MANIFEST_CACHE.get(key)
+        reused = manifest is not None
+        parse_seconds = 0.0
+        cold_parse = False
+        if manifest is None:
+            # Without the partial parse file of an earlier process, every file is parsed
+            cold_parse = not (project_dir / PARTIAL_PARSE_FILE).exists()
+            parse_start = time.perf_counter()
+            parsed = dbtRunner().invoke(["parse", "--project-dir", str(project_dir)])
+            parse_seconds = time.perf_counter() - parse_start
+            if parsed.success:
+                manifest = parsed.result
+                _MANIFEST_CACHE[key] = manifest
+        result = dbtRunner(manifest=manifest).invoke(cli_args)
+    elapsed = time.perf_counter() - start
+
+    nodes = _node_results(result.result)
+    if result.success:
+        returncode = 0
+    elif result.exception is not None:
+        returncode = 2
+    else:
+        returncode = 1
+    return DbtInvocation(
+        command=command,
+        mode="inprocess",
+        returncode=returncode,
+        elapsed_seconds=elapsed,
+        stdout="\n".join(
+            f"{node['status']} {node['unique_id']}: {node['message']}" for node in nodes
+        ),
+        stderr="" if result.exception is None else str(result.exception),
+        nodes=nodes,
+        manifest_reused=reused,
+        parse_seconds=parse_seconds,
+        cold_parse=cold_parse,
+    )
+
+
+def _run_subprocess(
+    command: str, project_dir: Path, env: dict[str, str], args: tuple[str, ...] = ()
+) -> DbtInvocation:
+    started_at = time.time()
+    start = time.perf_counter()
+    process = subprocess.run(
+        [
+            "dbt",
+            command,
+            *args,
+            "--project-dir",
+            str(project_dir),
+        ],
+        cwd=project_dir,
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return DbtInvocation(
+        command=command,
+        mode="subprocess",
+        returncode=process.returncode,
+        elapsed_seconds=time.perf_counter() - start,
+        stdout=process.stdout,
+        stderr=process.stderr,
+        nodes=_run_results_nodes(project_dir, started_at),
+    )
+
+
+def _load_timings(timings_path: Path | None) -> dict:
+    if timings_path is None or not timings_path.exists():
+        return {}
+    return json.loads(timings_path.read_text(encoding="utf-8"))
+
+
+def run_dbt(
+    command: str,
+    project_dir: Path,
+    env: dict[str, str],
+    mode: str = "inprocess",
+    timings_path: Path | None = None,
+    args: tuple[str, ...] = (),
+) -> DbtInvocation:
+    """Execute a dbt command and return a structured DbtInvocation.
+
+    ``mode="inprocess"`` invokes dbtRunner and reuses the parsed manifest for
+    later commands with the same project and env in this process; other
+    processes partially parse from dbt's ``target/partial_parse.msgpack``.
+    If dbt can't be imported it falls back to the ``dbt`` CLI subprocess.
+    When ``timings_path`` is given, the seconds of a cold parse (one without
+    the partial parse file) are stored there and in-process runs report the
+    parse seconds they saved against it as ``saved_seconds``. ``args`` are
+    extra CLI arguments, e.g. a node selection.
+    """
+    if mode not in EXECUTION_MODES:
+        raise ValueError(
+            f"Unknown dbt execution mode {mode!r}, expected one of {EXECUTION_MODES}"
+        )
+
+    invocation = None
+    if mode == "inprocess":
+        try:
+            invocation = _run_inprocess(command, project_dir, env, args)
+        except ImportError:
+            logger.warning(
+                "dbt can't be imported in-process, falling back to the dbt CLI"
+            )
+    if invocation is None:
+        invocation = _run_subprocess(command, project_dir, env, args)
+
+    timings = _load_timings(timings_path)
+    if invocation.cold_parse and invocation.success and timings_path is not None:
+        timings[COLD_PARSE_KEY] = invocation.parse_seconds
+        timings_path.parent.mkdir(parents=True, exist_ok=True)
+        timings_path.write_text(json.dumps(timings, indent=2), encoding="utf-8")
+    if invocation.parse_seconds is not None and COLD_PARSE_KEY in timings:
+        invocation.saved_seconds = timings[COLD_PARSE_KEY] - invocation.parse_seconds
+
+    logger.info(
+        "dbt %s (%s) took %.2fs, manifest reused: %s, parse saved vs cold parse: %s",
+        command,
+        invocation.mode,
+        invocation.elapsed_seconds,
+        invocation.manifest_reused,
+        (
+            "n/a"
+            if invocation.saved_seconds is None
+            else f"{invocation.saved_seconds:.2f}s"
+        ),
+    )
+    return invocation
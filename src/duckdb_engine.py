@@ -0,0 +1,323 @@
+"""Bronze cleaning as one multi-threaded DuckDB read_csv and COPY."""
+
+from __future__ import annotations
+
+import base64
+from pathlib import Path
+
+import duckdb
+import pyarrow as pa
+
+from src.cleaning import (
+    DEFAULT_PROFILE,
+    EXTRA_PATTERNS,
+    ID_COLUMNS,
+    ID_PATTERN,
+    NA_VALUES,
+    PARTITION_COLUMN,
+    REQUIRED_CHECKS,
+    STATUS_VALUES,
+    TIMESTAMP_FORMAT,
+    ArrowHandoff,
+    ReplayCheck,
+    _batch_schema,
+    _compact_id_types,
+    _extra_columns,
+    _read_header,
+    _write_and_hand_off,
+)
+from src.metrics import StageMetrics
+from src.writer_profiles import WriterProfile
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _sql_identifier(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _duckdb_raw_columns(columns: list[str]) -> dict[str, str]:
+    """Columns the duckdb engine carries raw copies of for the rejected rows."""
+    return {
+        name: _sql_identifier(f"__raw_{name}")
+        for name in columns
+        if name not in ID_COLUMNS
+    }
+
+
+# DuckDB type of each EXTRA_PATTERNS and COMPACT_ID_TYPES type
+DUCKDB_TYPES = {pa.int32(): "INTEGER", pa.int64(): "BIGINT", pa.float64(): "DOUBLE"}
+
+
+def _duckdb_extra_types(
+    con: duckdb.DuckDBPyConnection, columns: list[str]
+) -> dict[str, pa.DataType]:
+    """_extra_types of the raw extra columns kept in the ``cleaned`` table."""
+    extras = _extra_columns(columns)
+    if not extras:
+        return {}
+    # bool_and skips NULLs, and is NULL for a column without values
+    matches = con.execute(
+        "SELECT "
+        + ", ".join(
+            f"bool_and(regexp_matches({_sql_identifier(name)}, {_sql_literal(pattern)}))"
+            for name in extras
+            for pattern in EXTRA_PATTERNS.values()
+        )
+        + " FROM cleaned"
+    ).fetchone()
+    types = {}
+    for position, name in enumerate(extras):
+        flags = matches[position * len(EXTRA_PATTERNS) :][: len(EXTRA_PATTERNS)]
+        types[name] = next(
+            (type_ for type_, flag in zip(EXTRA_PATTERNS, flags) if flag), pa.string()
+        )
+    return types
+
+
+def _duckdb_arrow_schema(schema: pa.Schema) -> str:
+    """COPY option storing ``schema`` in the parquet the way pyarrow does.
+
+    Arrow readers restore the types parquet can't express from ARROW:schema,
+    so a DuckDB ENUM column reads back as STATUS_ARROW_TYPE, not plain strings.
+    """
+    encoded = base64.b64encode(schema.serialize().to_pybytes()).decode()
+    return f"KV_METADATA {{'ARROW:schema': {_sql_literal(encoded)}}}"
+
+
+def _duckdb_clean_query(
+    input_path: Path, columns: list[str], status_mapping: dict[str, str]
+) -> str:
+    """Build the SELECT that reproduces the pandas cleaning in DuckDB.
+
+    Rows are not filtered: ``__drop_reason`` holds the first REJECT_REASONS
+    entry that applies (NULL for clean rows) and ``__copies`` how many
+    identical raw rows were collapsed into each one. Rejected rows keep the
+    raw text of every non-ID column in ``__raw_<column>``, NULL otherwise.
+    """
+    read_columns = ", ".join(f"{_sql_literal(name)}: 'VARCHAR'" for name in columns)
+    null_values = ", ".join(_sql_literal(value) for value in NA_VALUES)
+    status_cases = " ".join(
+        f"WHEN {_sql_literal(raw)} THEN {_sql_literal(normalized)}"
+        for raw, normalized in status_mapping.items()
+    )
+    status_enum = ", ".join(_sql_literal(status) for status in STATUS_VALUES)
+    expressions = {
+        name: (
+            f"CASE WHEN regexp_matches({name}, {_sql_literal(ID_PATTERN)})"
+            f" THEN CAST(trim({name}) AS BIGINT) END"
+        )
+        for name in ID_COLUMNS
+    }
+    expressions |= {
+        # TRY_CAST accepts inf, Infinity and NaN, which no engine keeps
+        "amount": (
+            "CASE WHEN isfinite(TRY_CAST(trim(amount) AS DOUBLE))"
+            " THEN TRY_CAST(trim(amount) AS DOUBLE) END"
+        ),
+        "status": f"CAST(CASE lower(trim(status)) {status_cases} END AS ENUM({status_enum}))",
+        "transaction_ts": (
+            f"CAST(try_strptime(transaction_ts, {_sql_literal(TIMESTAMP_FORMAT)})"
+            " AS TIMESTAMP_NS)"
+        ),
+    }
+    projection = [
+        f"{expressions.get(name, _sql_identifier(name))} AS {_sql_identifier(name)}"
+        for name in columns
+    ]
+    raw_columns = _duckdb_raw_columns(columns)
+    raw_copies = [
+        f"{_sql_identifier(name)} AS {raw}" for name, raw in raw_columns.items()
+    ]
+    rejected_raw = [
+        f"CASE WHEN __drop_reason IS NOT NULL THEN {raw} END AS {raw}"
+        for raw in raw_columns.values()
+    ]
+    checks = {
+        reason: " OR ".join(f"{name} IS NULL" for name in required)
+        for reason, required in REQUIRED_CHECKS.items()
+    }
+    derived = ""
+    if "transaction_ts" in columns:
+        checks["invalid_timestamp"] = "transaction_ts IS NULL"
+        derived = ", CAST(transaction_ts AS DATE) AS transaction_date"
+    drop_reason = " ".join(
+        f"WHEN {condition} THEN {_sql_literal(reason)}"
+        for reason, condition in checks.items()
+    )
+
+    return f"""
+        WITH source AS (
+            SELECT *, row_number() OVER () AS __row_number
+            FROM read_csv(
+                {_sql_literal(str(input_path))},
+                header = true,
+                auto_detect = false,
+                columns = {{{read_columns}}},
+                nullstr = [{null_values}]
+            )
+        ),
+        deduplicated AS (
+            SELECT
+                * EXCLUDE (__row_number),
+                min(__row_number) AS __row_number,
+                count(*) AS __copies
+            FROM source
+            GROUP BY ALL
+        ),
+        cleaned AS (
+            SELECT
+                {", ".join(projection)},
+                __row_number,
+                __copies,
+                {", ".join(raw_copies)}
+            FROM deduplicated
+        ),
+        flagged AS (
+            SELECT *{derived}, CASE {drop_reason} END AS __drop_reason
+            FROM cleaned
+        )
+        SELECT * EXCLUDE ({", ".join(raw_columns.values())}), {", ".join(rejected_raw)}
+        FROM flagged
+    """
+
+
+def _clean_duckdb(
+    input_path: Path,
+    output_path: Path,
+    rejected_path: Path,
+    metrics: StageMetrics,
+    status_mapping: dict[str, str],
+    is_replay: ReplayCheck | None = None,
+    partition_prefix: str | None = None,
+    handoff: ArrowHandoff | None = None,
+    compact: bool = False,
+    profile: WriterProfile = DEFAULT_PROFILE,
+) -> None:
+    """Clean the raw CSV with one multi-threaded DuckDB read and a COPY.
+
+    With a ``handoff`` the clean rows are fetched as one Arrow table instead,
+    handed off and written by pyarrow.
+    """
+    columns = _read_header(input_path)
+    query = _duckdb_clean_query(input_path, columns, status_mapping)
+    raw_columns = _duckdb_raw_columns(columns)
+    internal = ", ".join(
+        ["__row_number", "__copies", "__drop_reason", *raw_columns.values()]
+    )
+    rejected_columns = ", ".join(
+        (
+            f"{raw_columns[name]} AS {_sql_identifier(name)}"
+            if name in raw_columns
+            else _sql_identifier(name)
+        )
+        for name in columns
+    )
+    options = "FORMAT parquet" + profile.duckdb_options()
+    if partition_prefix is not None:
+        options += (
+            f", PARTITION_BY ({PARTITION_COLUMN}), OVERWRITE_OR_IGNORE"
+            f", FILENAME_PATTERN {_sql_literal(partition_prefix + '{i}')}"
+        )
+    with duckdb.connect() as con:
+        # Read, de-duplicate and clean once; the table spills to disk if needed
+        with metrics.timed("clean"):
+            con.execute(f"CREATE TEMP TABLE cleaned AS {query}")
+            if is_replay is not None:
+                ids = con.execute(
+                    "SELECT transaction_id FROM cleaned WHERE __drop_reason IS NULL"
+                ).fetchnumpy()["transaction_id"]
+                replayed = pa.table({"transaction_id": ids[is_replay(ids)]})
+                con.register("replayed", replayed)
+                con.execute(
+                    """
+                    UPDATE cleaned SET __drop_reason = 'cross_day_duplicate'
+                    WHERE __drop_reason IS NULL
+                      AND transaction_id IN (SELECT transaction_id FROM replayed)
+                    """
+                )
+            counts = con.execute(
+                "SELECT __drop_reason, count(*), sum(__copies) FROM cleaned GROUP BY ALL"
+            ).fetchall()
+        for reason, rows, copies in counts:
+            metrics.rows_read += int(copies)
+            metrics.drop("duplicate", copies - rows)
+            if reason is None:
+                metrics.rows_written = rows
+            else:
+                metrics.drop(reason, rows)
+
+        with metrics.timed("write"):
+            con.execute(
+                f"""
+                COPY (
+                    SELECT {rejected_columns}, __drop_reason AS reject_reason
+                    FROM cleaned
+                    WHERE __drop_reason IS NOT NULL AND __drop_reason != 'cross_day_duplicate'
+                    ORDER BY __row_number
+                ) TO {_sql_literal(str(rejected_path))} (FORMAT parquet)
+                """
+            )
+        extras = _duckdb_extra_types(con, columns)
+        id_types = None
+        casts = [
+            f"CAST(trim({_sql_identifier(name)}) AS {DUCKDB_TYPES[type_]})"
+            f" AS {_sql_identifier(name)}"
+            for name, type_ in extras.items()
+            if type_ in DUCKDB_TYPES
+        ]
+        if compact:
+            # Every valid ID read, rejected rows included, as the other engines
+            bounds = con.execute(
+                f"""
+                SELECT {", ".join(f"min({name}), max({name})" for name in ID_COLUMNS)}
+                FROM cleaned
+                """
+            ).fetchone()
+            id_types = _compact_id_types(
+                {
+                    name: None if low is None else (low, high)
+                    for name, low, high in zip(ID_COLUMNS, bounds[::2], bounds[1::2])
+                }
+            )
+            casts += [
+                f"CAST({name} AS {DUCKDB_TYPES[type_]}) AS {name}"
+                for name, type_ in id_types.items()
+            ]
+            casts.append("CAST(round(amount, 2) AS DECIMAL(18, 2)) AS amount")
+        replace = f"REPLACE ({', '.join(casts)})" if casts else ""
+        cluster_by = [
+            _sql_identifier(name) for name in profile.cluster_by if name in columns
+        ]
+        clean_rows = f"""
+            SELECT * EXCLUDE ({internal}) {replace}
+            FROM cleaned
+            WHERE __drop_reason IS NULL
+            ORDER BY {", ".join([*cluster_by, "__row_number"])}
+        """
+        if handoff is not None:
+            with metrics.timed("fetch"):
+                table = con.execute(clean_rows).fetch_arrow_table()
+                table = table.cast(_batch_schema(table.column_names, id_types, extras))
+            _write_and_hand_off(
+                table, output_path, partition_prefix, metrics, handoff, profile
+            )
+        else:
+            names = [
+                column[0]
+                for column in con.execute(
+                    f"SELECT * FROM ({clean_rows}) LIMIT 0"
+                ).description
+            ]
+            if partition_prefix is not None:
+                # PARTITION_BY leaves the partition column out of the files
+                names.remove(PARTITION_COLUMN)
+            options += ", " + _duckdb_arrow_schema(
+                _batch_schema(names, id_types, extras)
+            )
+            with metrics.timed("write"):
+                con.execute(
+                    f"COPY ({clean_rows}) TO {_sql_literal(str(output_path))} ({options})"
+                )
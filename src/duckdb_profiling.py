@@ -0,0 +1,38 @@
+"""dbt-duckdb plugin that logs the profiling metrics of every query of a dbt run.
+
+Only the ``profile`` target of profiles/profiles.yml loads it. Each DuckDB
+instance dbt opens writes its query log and per-query metrics (latency, CPU
+time, rows scanned, bytes, peak memory) as CSV files under ``log_dir``;
+``src.profiling.summarize_query_log`` turns them into one row per query.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from dbt.adapters.duckdb.plugins import BasePlugin
+
+if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection
+
+LOG_TYPES = ("QueryLog", "Metrics")
+
+
+# load and store only serve plugin sources and external tables, which it has none of
+class Plugin(BasePlugin):  # pylint: disable=abstract-method
+    """Enable DuckDB's file log and query profiling on dbt's connections."""
+
+    def initialize(self, plugin_config: dict[str, Any]) -> None:
+        self.log_dir = plugin_config["log_dir"]
+
+    def configure_connection(self, conn: DuckDBPyConnection) -> None:
+        # The log is per database instance; dbt opens one per invocation
+        log_types = ", ".join(f"'{log_type}'" for log_type in LOG_TYPES)
+        log_dir = "'" + str(self.log_dir).replace("'", "''") + "'"
+        conn.execute(
+            f"CALL enable_logging([{log_types}], storage='file', storage_path={log_dir})"
+        )
+
+    def configure_cursor(self, cursor) -> None:
+        # Profiling is per connection and its metrics are only logged when enabled
+        cursor.execute("SET enable_profiling = 'no_output'")
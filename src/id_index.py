@@ -0,0 +1,210 @@
+"""Persistent transaction_id index used to drop replays of earlier days."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+INDEX_VERSION = 2
+# ~1% false positives with 7 hash functions
+BITS_PER_ID = 10
+NUM_HASHES = 7
+MIN_BLOOM_BITS = 1 << 20
+# IDs hashed at once when the Bloom filter is rebuilt
+REBUILD_BATCH = 1 << 22
+
+
+def _mix(ids: np.ndarray, seed: int) -> np.ndarray:
+    """splitmix64 finalizer, vectorized over int64 IDs."""
+    with np.errstate(over="ignore"):
+        x = ids.astype(np.uint64) + np.uint64(seed * 0x9E3779B97F4A7C15)
+        x ^= x >> np.uint64(30)
+        x *= np.uint64(0xBF58476D1CE4E5B9)
+        x ^= x >> np.uint64(27)
+        x *= np.uint64(0x94D049BB133111EB)
+        x ^= x >> np.uint64(31)
+    return x
+
+
+def _save_atomic(path: Path, array: np.ndarray) -> None:
+    tmp_path = path.with_suffix(".tmp.npy")
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+class TransactionIdIndex:
+    """Every recorded ID in one sorted file plus a Bloom filter over them.
+
+    ``ids_<generation>.npy`` holds the IDs of every day, sorted by ID and then
+    day, and ``days_<generation>.npy`` the day (YYYYMMDD) of each, so the
+    first entry of an ID is its earliest day. A lookup hashes the batch
+    against the Bloom filter and binary-searches the memory-mapped file once
+    for the few IDs that may be present, whatever the number of days. A day
+    that is cleaned again replaces its own entries; IDs dropped from it stay
+    in the Bloom filter until the next rebuild, which only costs exact lookups.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        meta_path = root / "index.json"
+        self._meta = {"version": INDEX_VERSION, "num_bits": 0, "days": {}}
+        legacy_days: dict[str, int] = {}
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("version") == INDEX_VERSION:
+                self._meta = meta
+            elif meta.get("version") == 1:
+                legacy_days = meta["days"]
+        bloom_path = root / "bloom.npy"
+        self._bloom = (
+            np.load(bloom_path) if self._meta["days"] and bloom_path.exists() else None
+        )
+        if legacy_days:
+            self._consolidate(legacy_days)
+
+    @property
+    def days(self) -> dict[str, int]:
+        """Number of distinct IDs recorded per ds_nodash."""
+        return dict(self._meta["days"])
+
+    def _entries_paths(self, generation: int) -> tuple[Path, Path]:
+        return (
+            self.root / f"ids_{generation}.npy",
+            self.root / f"days_{generation}.npy",
+        )
+
+    def _entries(self, mmap_mode: str | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Sorted IDs and their days, empty if nothing was recorded."""
+        if not self._meta["days"]:
+            return np.empty(0, np.int64), np.empty(0, np.int32)
+        ids_path, days_path = self._entries_paths(self._meta["generation"])
+        return np.load(ids_path, mmap_mode=mmap_mode), np.load(
+            days_path, mmap_mode=mmap_mode
+        )
+
+    def _bit_positions(self, ids: np.ndarray, num_bits: int) -> list[np.ndarray]:
+        # Double hashing: position_i = h1 + i * h2
+        first = _mix(ids, 0)
+        step = _mix(ids, 1) | np.uint64(1)
+        with np.errstate(over="ignore"):
+            return [
+                (first + np.uint64(i) * step) % np.uint64(num_bits)
+                for i in range(NUM_HASHES)
+            ]
+
+    def _might_contain(self, ids: np.ndarray) -> np.ndarray:
+        if self._bloom is None:
+            return np.zeros(len(ids), dtype=bool)
+        present = np.ones(len(ids), dtype=bool)
+        for position in self._bit_positions(ids, self._meta["num_bits"]):
+            words = self._bloom[(position >> np.uint64(6)).astype(np.int64)]
+            present &= ((words >> (position & np.uint64(63))) & np.uint64(1)).astype(
+                bool
+            )
+        return present
+
+    def _set_bits(self, ids: np.ndarray) -> None:
+        for position in self._bit_positions(ids, self._meta["num_bits"]):
+            np.bitwise_or.at(
+                self._bloom,
+                (position >> np.uint64(6)).astype(np.int64),
+                np.uint64(1) << (position & np.uint64(63)),
+            )
+
+    def prior_duplicates(self, ds_nodash: str, ids: np.ndarray) -> np.ndarray:
+        """Mask of the IDs already recorded for a day before ``ds_nodash``."""
+        ids = np.asarray(ids, dtype=np.int64)
+        duplicated = np.zeros(len(ids), dtype=bool)
+        if not any(ds < ds_nodash for ds in self._meta["days"]) or not ids.size:
+            return duplicated
+
+        candidates = np.flatnonzero(self._might_contain(ids))
+        recorded_ids, recorded_days = self._entries(mmap_mode="r")
+        if not candidates.size or not recorded_ids.size:
+            return duplicated
+        # Leftmost match: the earliest day that recorded the ID
+        position = np.minimum(
+            np.searchsorted(recorded_ids, ids[candidates]), len(recorded_ids) - 1
+        )
+        found = (recorded_ids[position] == ids[candidates]) & (
+            recorded_days[position] < int(ds_nodash)
+        )
+        duplicated[candidates[found]] = True
+        return duplicated
+
+    def add(self, ds_nodash: str, ids: np.ndarray) -> None:
+        """Record (or replace) the IDs written for ``ds_nodash``."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        block = np.unique(np.asarray(ids, dtype=np.int64))
+        day = int(ds_nodash)
+
+        recorded_ids, recorded_days = self._entries()
+        kept = recorded_days != day
+        recorded_ids, recorded_days = recorded_ids[kept], recorded_days[kept]
+        # Each new ID goes after the entries of the same ID from earlier days
+        position = np.searchsorted(recorded_ids, block, "left")
+        end = np.searchsorted(recorded_ids, block, "right")
+        for i in np.flatnonzero(end > position):
+            position[i] += np.count_nonzero(recorded_days[position[i] : end[i]] < day)
+        self._meta["days"][ds_nodash] = len(block)
+        self._write_entries(
+            np.insert(recorded_ids, position, block),
+            np.insert(recorded_days, position, np.full(len(block), day, np.int32)),
+        )
+
+        total = sum(self._meta["days"].values())
+        if self._bloom is None or total * BITS_PER_ID > self._meta["num_bits"]:
+            self._rebuild(total)
+        else:
+            self._set_bits(block)
+        self._save()
+
+    def _write_entries(self, ids: np.ndarray, days: np.ndarray) -> None:
+        """Write the entries as a new generation, in use once index.json is saved."""
+        generation = self._meta.get("generation", 0) + 1
+        ids_path, days_path = self._entries_paths(generation)
+        np.save(ids_path, ids)
+        np.save(days_path, days)
+        self._meta["generation"] = generation
+
+    def _save(self) -> None:
+        _save_atomic(self.root / "bloom.npy", self._bloom)
+        tmp_path = self.root / "index.json.tmp"
+        tmp_path.write_text(
+            json.dumps(self._meta, indent=2, sort_keys=True), encoding="utf-8"
+        )
+        os.replace(tmp_path, self.root / "index.json")
+        for stale in self.root.glob("*.npy"):
+            if stale.stem.split("_")[-1] not in (
+                str(self._meta["generation"]),
+                "bloom",
+            ):
+                stale.unlink()
+
+    def _consolidate(self, days: dict[str, int]) -> None:
+        """Merge the per-day ids_<ds_nodash>.npy blocks of an INDEX_VERSION 1 index."""
+        blocks = {ds: np.load(self.root / f"ids_{ds}.npy") for ds in days}
+        ids = np.concatenate([np.empty(0, np.int64), *blocks.values()])
+        day_of = np.concatenate(
+            [np.empty(0, np.int32)]
+            + [np.full(len(block), int(ds), np.int32) for ds, block in blocks.items()]
+        )
+        order = np.lexsort((day_of, ids))
+        self._meta["days"] = {ds: len(block) for ds, block in blocks.items()}
+        self._write_entries(ids[order], day_of[order])
+        self._rebuild(len(ids))
+        self._save()
+
+    def _rebuild(self, total: int) -> None:
+        """Resize the Bloom filter to twice the needed bits and re-add every ID."""
+        num_bits = MIN_BLOOM_BITS
+        while num_bits < 2 * total * BITS_PER_ID:
+            num_bits <<= 1
+        self._meta["num_bits"] = num_bits
+        self._bloom = np.zeros(num_bits // 64, dtype=np.uint64)
+        recorded_ids, _ = self._entries(mmap_mode="r")
+        for start in range(0, len(recorded_ids), REBUILD_BATCH):
+            self._set_bits(np.asarray(recorded_ids[start : start + REBUILD_BATCH]))
@@ -0,0 +1,144 @@
+"""Content-addressed manifest used to skip pipeline steps whose inputs are unchanged."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Bump to invalidate every recorded entry after a change the hashes can't see
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 1 << 20
+
+
+def file_sha256(path: Path) -> str:
+    """Stream the file through sha256 without loading it in memory."""
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_file(path: Path, previous: dict | None = None) -> dict:
+    """Size, mtime and sha256 of a file.
+
+    The hash of ``previous`` is reused when size and mtime are unchanged, so
+    an untouched raw file is not re-read on every run.
+    """
+    stat = path.stat()
+    if (
+        previous
+        and previous.get("size") == stat.st_size
+        and previous.get("mtime_ns") == stat.st_mtime_ns
+    ):
+        return dict(previous)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(path),
+    }
+
+
+def fingerprint_shards(paths: list[Path], previous: dict | None = None) -> dict:
+    """fingerprint_file of every shard by name, plus their total size and one sha256.
+
+    Renaming, adding or dropping a shard changes the sha256 too.
+    """
+    previous_files = (previous or {}).get("files", {})
+    files = {
+        path.name: fingerprint_file(path, previous_files.get(path.name))
+        for path in paths
+    }
+    digest = hashlib.sha256()
+    for name, stats in sorted(files.items()):
+        digest.update(name.encode())
+        digest.update(stats["sha256"].encode())
+    return {
+        "size": sum(stats["size"] for stats in files.values()),
+        "sha256": digest.hexdigest(),
+        "files": files,
+    }
+
+
+def fingerprint_files(paths: list[Path], root: Path) -> str | None:
+    """Single digest over a set of files, their names relative to root included."""
+    if not paths:
+        return None
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(str(path.relative_to(root)).encode())
+        digest.update(file_sha256(path).encode())
+    return digest.hexdigest()
+
+
+def fingerprint_tree(root: Path, patterns: tuple[str, ...]) -> str | None:
+    """Digest of every file under root matching any of the glob patterns."""
+    paths = {
+        path for pattern in patterns for path in root.glob(pattern) if path.is_file()
+    }
+    return fingerprint_files(list(paths), root)
+
+
+def code_version(*modules: Path) -> str:
+    """Digest of the source files whose logic determines a step's output."""
+    digest = hashlib.sha256(str(MANIFEST_VERSION).encode())
+    for module in modules:
+        digest.update(module.read_bytes())
+    return digest.hexdigest()
+
+
+def load_manifest(path: Path) -> dict:
+    """Read the manifest, empty if it was never written."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_manifest(path: Path, manifest: dict) -> None:
+    """Write the manifest atomically so a killed task can't leave it truncated."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(
+        json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8"
+    )
+    os.replace(tmp_path, path)
+
+
+def get_entry(manifest: dict, stage: str, ds_nodash: str) -> dict:
+    """Entry of a stage and day, empty if it wasn't recorded."""
+    return manifest.get(stage, {}).get(ds_nodash, {})
+
+
+def is_unchanged(
+    manifest: dict, stage: str, ds_nodash: str, inputs: dict, output: str | None
+) -> bool:
+    """True when the recorded inputs and output of a step match the current ones.
+
+    A missing or modified output (e.g. a deleted parquet file) never matches,
+    so the step runs again even if its inputs are the same.
+    """
+    entry = get_entry(manifest, stage, ds_nodash)
+    return (
+        bool(entry)
+        and output is not None
+        and entry.get("inputs") == inputs
+        and entry.get("output") == output
+    )
+
+
+def record_entry(
+    manifest: dict,
+    stage: str,
+    ds_nodash: str,
+    inputs: dict,
+    output: str | None,
+    **details,
+) -> None:
+    """Store a step's inputs and output, plus extra details such as file stats."""
+    manifest.setdefault(stage, {})[ds_nodash] = {
+        "inputs": inputs,
+        "output": output,
+        **details,
+    }
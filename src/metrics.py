@@ -0,0 +1,101 @@
+"""Per-stage pipeline metrics: row counts, drop reasons, bytes, timings and memory."""
+
+from __future__ import annotations
+
+import json
+import os
+import resource
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+METRICS_FILE_TEMPLATE = "metrics_{ds_nodash}.json"
+# One line per recorded stage and run, for charting throughput over time
+METRICS_HISTORY_FILE = "metrics_history.jsonl"
+
+
+def peak_rss_bytes() -> int:
+    """High-water mark of the resident memory of this process.
+
+    VmHWM is preferred because ru_maxrss keeps the parent's peak across
+    fork/exec, e.g. for a worker spawned by a process that used more memory.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is reported in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@dataclass
+class StageMetrics:
+    """What one pipeline stage read, dropped, wrote and spent for a day."""
+
+    stage: str
+    ds_nodash: str | None = None
+    rows_read: int = 0
+    rows_written: int = 0
+    dropped: dict[str, int] = field(default_factory=dict)
+    bytes_in: int = 0
+    bytes_out: int = 0
+    timings: dict[str, float] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+    peak_rss_bytes: int | None = None
+    details: dict = field(default_factory=dict)
+
+    @contextmanager
+    def timed(self, step: str) -> Iterator[None]:
+        """Add the time spent in the block to ``timings[step]``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[step] = (
+                self.timings.get(step, 0.0) + time.perf_counter() - start
+            )
+
+    def drop(self, reason: str, count: int) -> None:
+        """Add ``count`` rows to the ones dropped for ``reason``."""
+        self.dropped[reason] = self.dropped.get(reason, 0) + int(count)
+
+    @property
+    def rows_per_second(self) -> float | None:
+        """Rows read per second of wall time, None before it is measured."""
+        if not self.wall_seconds:
+            return None
+        return self.rows_read / self.wall_seconds
+
+    def to_dict(self) -> dict:
+        """JSON-able form, with the derived rows_per_second."""
+        return {**asdict(self), "rows_per_second": self.rows_per_second}
+
+
+def record_stage_metrics(quality_dir: Path, metrics: StageMetrics) -> Path:
+    """Store a stage in ``metrics_<ds_nodash>.json`` and append it to the history.
+
+    Each stage replaces its own key in the day file, so bronze, silver and
+    gold can be recorded by separate tasks.
+    """
+    quality_dir.mkdir(parents=True, exist_ok=True)
+    path = quality_dir / METRICS_FILE_TEMPLATE.format(ds_nodash=metrics.ds_nodash)
+    record = {
+        **metrics.to_dict(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+    stages = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    stages[metrics.stage] = record
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(stages, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+    with (quality_dir / METRICS_HISTORY_FILE).open("a", encoding="utf-8") as history:
+        history.write(json.dumps(record, sort_keys=True) + "\n")
+    return path
@@ -0,0 +1,282 @@
+"""Bronze cleaning with pandas, in memory or streamed in batches."""
+
+from __future__ import annotations
+
+import itertools
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.cleaning import (
+    DEFAULT_PROFILE,
+    ID_COLUMNS,
+    NA_VALUES,
+    ArrowHandoff,
+    ReplayCheck,
+    _batch_schema,
+    _cast_extras,
+    _clean_frame,
+    _clean_schema,
+    _cluster_table,
+    _coerce_id,
+    _compact_id_types,
+    _compact_table,
+    _drop_replays,
+    _extra_columns,
+    _extra_types,
+    _id_bounds,
+    _normalize_columns,
+    _read_header,
+    _rejected_schema,
+    _rejected_table,
+    _write_and_hand_off,
+    _write_partitioned,
+)
+from src.metrics import StageMetrics
+from src.writer_profiles import WriterProfile
+
+
+def _frame_to_arrow(df: pd.DataFrame, extras: dict[str, pa.DataType]) -> pa.Table:
+    """Clean rows as Arrow: CLEAN_SCHEMA types, extras cast from text to ``extras``."""
+    table = pa.Table.from_pandas(
+        df, schema=_batch_schema(list(df.columns)), preserve_index=False
+    )
+    return _cast_extras(table, extras)
+
+
+def _scan_frames(
+    frames: Iterable[pd.DataFrame], compact: bool
+) -> tuple[dict[str, pa.DataType], dict[str, pa.DataType] | None]:
+    """_extra_types of raw text frames and, when ``compact``, their ID types.
+
+    Frames are consumed one at a time, so they can be the batches of a file.
+    """
+    bounds: dict[str, tuple[int, int] | None] = {}
+
+    def extra_tables() -> Iterator[pa.Table]:
+        nonlocal bounds
+        for frame in frames:
+            if compact:
+                ids = {
+                    name: pa.array(_coerce_id(frame[name]))
+                    for name in ID_COLUMNS
+                    if name in frame.columns
+                }
+                bounds = _id_bounds([pa.table(ids)], bounds)
+            yield pa.Table.from_pandas(
+                frame[_extra_columns(list(frame.columns))], preserve_index=False
+            )
+
+    extras = _extra_types(extra_tables())
+    return extras, _compact_id_types(bounds) if compact else None
+
+
+class _FingerprintSet:
+    """Set of uint64 row fingerprints kept as sorted runs, 8 bytes per entry.
+
+    Runs merge like a binary counter, so there are O(log n) of them to search
+    and each fingerprint is copied O(log n) times as the set grows.
+    """
+
+    def __init__(self) -> None:
+        self._runs: list[np.ndarray] = []
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the fingerprints."""
+        return sum(run.nbytes for run in self._runs)
+
+    def contains(self, values: np.ndarray) -> np.ndarray:
+        """Mask of the ``values`` already in the set."""
+        found = np.zeros(len(values), dtype=bool)
+        for run in self._runs:
+            position = np.minimum(np.searchsorted(run, values), len(run) - 1)
+            found |= run[position] == values
+        return found
+
+    def add(self, values: np.ndarray) -> None:
+        """Add ``values``, which must not be in the set yet."""
+        run = np.sort(values)
+        while self._runs and len(self._runs[-1]) <= len(run):
+            run = np.sort(np.concatenate([self._runs.pop(), run]))
+        if len(run):
+            self._runs.append(run)
+
+
+def _clean_streaming(
+    input_path: Path,
+    output_path: Path,
+    rejected_path: Path,
+    batch_size: int,
+    metrics: StageMetrics,
+    status_mapping: dict[str, str],
+    is_replay: ReplayCheck | None = None,
+    partition_prefix: str | None = None,
+    compact: bool = False,
+    profile: WriterProfile = DEFAULT_PROFILE,
+) -> None:
+    """Clean the raw CSV in fixed-size batches, appending parquet row groups.
+
+    Batches are read as text so that row fingerprints are stable across
+    batches; duplicates are removed exactly against every row seen so far,
+    whose fingerprints take 8 bytes per distinct row (recorded in
+    ``metrics.details["fingerprint_bytes"]``).
+    Extra columns are typed, and with ``compact`` the ID width chosen, by a
+    first pass over just those columns, so every batch writes the same schema.
+    With a ``partition_prefix`` each batch is appended to the partitioned
+    dataset rooted at ``output_path`` instead. Clustering sorts each batch,
+    not the whole file.
+    """
+    seen = _FingerprintSet()
+    writer: pq.ParquetWriter | None = None
+    rejected_writer: pq.ParquetWriter | None = None
+
+    columns = _read_header(input_path)
+    scanned = _extra_columns(columns)
+    if compact:
+        scanned += [name for name in ID_COLUMNS if name in columns]
+    extras: dict[str, pa.DataType] = {}
+    id_types = _compact_id_types({}) if compact else None
+    if scanned:
+        with metrics.timed("read"):
+            extras, id_types = _scan_frames(
+                pd.read_csv(
+                    input_path,
+                    header=0,
+                    names=columns,
+                    usecols=scanned,
+                    dtype=str,
+                    chunksize=batch_size,
+                    keep_default_na=False,
+                    na_values=NA_VALUES,
+                ),
+                compact,
+            )
+
+    try:
+        reader = iter(
+            pd.read_csv(
+                input_path,
+                dtype=str,
+                chunksize=batch_size,
+                keep_default_na=False,
+                na_values=NA_VALUES,
+            )
+        )
+        for batch_number in itertools.count():
+            with metrics.timed("read"):
+                chunk = next(reader, None)
+            if chunk is None:
+                break
+            chunk = _normalize_columns(chunk)
+            metrics.rows_read += len(chunk)
+
+            with metrics.timed("deduplicate"):
+                fingerprints = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+                is_new = np.zeros(len(chunk), dtype=bool)
+                is_new[np.unique(fingerprints, return_index=True)[1]] = True
+                is_new &= ~seen.contains(fingerprints)
+                seen.add(fingerprints[is_new])
+                chunk = chunk.loc[is_new].copy()
+            metrics.drop("duplicate", len(is_new) - len(chunk))
+
+            with metrics.timed("clean"):
+                chunk, rejected = _clean_frame(chunk, metrics, status_mapping)
+                chunk = _drop_replays(chunk, is_replay, metrics)
+            metrics.rows_written += len(chunk)
+
+            with metrics.timed("write"):
+                rejected_table = _rejected_table(rejected)
+                if rejected_writer is None:
+                    rejected_writer = pq.ParquetWriter(
+                        rejected_path, rejected_table.schema
+                    )
+                if rejected_table.num_rows:
+                    rejected_writer.write_table(rejected_table)
+
+                table = _frame_to_arrow(chunk, extras)
+                if id_types is not None:
+                    table = _compact_table(table, id_types)
+                table = _cluster_table(table, profile)
+
+                if partition_prefix is not None:
+                    if table.num_rows:
+                        _write_partitioned(
+                            table,
+                            output_path,
+                            f"{partition_prefix}{batch_number}-",
+                            profile,
+                        )
+                    continue
+
+                if writer is None:
+                    writer = pq.ParquetWriter(
+                        output_path, table.schema, **profile.pyarrow_options()
+                    )
+                if table.num_rows:
+                    writer.write_table(table, row_group_size=profile.row_group_size)
+    finally:
+        if writer is not None:
+            writer.close()
+        if rejected_writer is not None:
+            rejected_writer.close()
+    metrics.details["fingerprint_bytes"] = seen.nbytes
+
+    if writer is None and partition_prefix is None:
+        pq.write_table(
+            _clean_schema(id_types).empty_table(),
+            output_path,
+            **profile.pyarrow_options(),
+        )
+    if rejected_writer is None:
+        pq.write_table(_rejected_schema([]).empty_table(), rejected_path)
+
+
+def _clean_pandas(
+    input_path: Path,
+    output_path: Path,
+    rejected_path: Path,
+    metrics: StageMetrics,
+    status_mapping: dict[str, str],
+    is_replay: ReplayCheck | None = None,
+    partition_prefix: str | None = None,
+    handoff: ArrowHandoff | None = None,
+    compact: bool = False,
+    profile: WriterProfile = DEFAULT_PROFILE,
+) -> None:
+    """Clean the whole raw CSV in memory with pandas."""
+    with metrics.timed("read"):
+        # Text columns stay as read so the rejected rows keep their raw values
+        columns = _read_header(input_path)
+        df = pd.read_csv(
+            input_path,
+            header=0,
+            names=columns,
+            dtype=str,
+            keep_default_na=False,
+            na_values=NA_VALUES,
+        )
+    metrics.rows_read = len(df)
+
+    with metrics.timed("deduplicate"):
+        df = df.drop_duplicates()
+    metrics.drop("duplicate", metrics.rows_read - len(df))
+
+    with metrics.timed("clean"):
+        extras, id_types = _scan_frames([df], compact)
+        df, rejected = _clean_frame(df, metrics, status_mapping)
+        df = _drop_replays(df, is_replay, metrics)
+    metrics.rows_written = len(df)
+
+    with metrics.timed("write"):
+        pq.write_table(_rejected_table(rejected), rejected_path)
+        table = _frame_to_arrow(df, extras)
+    if id_types is not None:
+        table = _compact_table(table, id_types)
+    with metrics.timed("cluster"):
+        table = _cluster_table(table, profile)
+    _write_and_hand_off(table, output_path, partition_prefix, metrics, handoff, profile)
@@ -0,0 +1,139 @@
+"""On-demand CPU, allocation and DuckDB query profiling of a pipeline task.
+
+Nothing here is imported unless profiling is requested, so tasks pay no
+overhead when it's off.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import csv
+import io
+import pstats
+import re
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+# Frames kept per traced allocation: the reports group by line, and each extra frame
+# made the pandas cleaning of 1e6 rows ~2x slower under tracing
+TRACEMALLOC_FRAMES = 1
+# Functions and allocation sites listed in the text reports
+REPORT_TOP = 30
+# File of the DuckDB file log with one row per log entry
+QUERY_LOG_ENTRIES = "duckdb_log_entries.csv"
+# DuckDB metrics kept per query by summarize_query_log, and their column names
+QUERY_METRICS = {
+    "LATENCY": "latency_seconds",
+    "CPU_TIME": "cpu_seconds",
+    "CUMULATIVE_ROWS_SCANNED": "rows_scanned",
+    "ROWS_RETURNED": "rows_returned",
+    "TOTAL_BYTES_READ": "bytes_read",
+    "TOTAL_BYTES_WRITTEN": "bytes_written",
+    "SYSTEM_PEAK_BUFFER_MEMORY": "peak_buffer_bytes",
+}
+_METRIC_PATTERN = re.compile(r"\{'metric': (\w+), 'value': (.*)\}", re.DOTALL)
+
+
+def _write_cpu_report(profiler: cProfile.Profile, path: Path, top: int) -> None:
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    path.write_text(report.getvalue(), encoding="utf-8")
+
+
+def _write_alloc_report(
+    start: tracemalloc.Snapshot,
+    end: tracemalloc.Snapshot,
+    peak: int,
+    path: Path,
+    top: int,
+) -> None:
+    lines = [
+        f"Peak traced memory: {peak / 2**20:.1f} MiB",
+        f"Top {top} growths by line:",
+    ]
+    lines.extend(str(stat) for stat in end.compare_to(start, "lineno")[:top])
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@contextmanager
+def profile_run(
+    profile_dir: Path,
+    name: str,
+    frames: int = TRACEMALLOC_FRAMES,
+    top: int = REPORT_TOP,
+) -> Iterator[Path]:
+    """Profile the block with cProfile and tracemalloc and save the artifacts.
+
+    Writes to ``profile_dir``:
+
+    - ``<name>.prof``: the cProfile stats, for ``python -m pstats`` or snakeviz
+    - ``<name>_cpu.txt``: the ``top`` functions by cumulative time
+    - ``<name>.tracemalloc``: the allocations live at the end of the block,
+      for ``tracemalloc.Snapshot.load``
+    - ``<name>_alloc.txt``: peak traced memory and the ``top`` lines whose
+      allocations grew the most during the block
+
+    The artifacts are written even if the block raises. Yields ``profile_dir``.
+    """
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(frames)
+    tracemalloc.reset_peak()
+    start = tracemalloc.take_snapshot()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profile_dir
+    finally:
+        profiler.disable()
+        end = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+
+        profiler.dump_stats(profile_dir / f"{name}.prof")
+        _write_cpu_report(profiler, profile_dir / f"{name}_cpu.txt", top)
+        end.dump(str(profile_dir / f"{name}.tracemalloc"))
+        _write_alloc_report(start, end, peak, profile_dir / f"{name}_alloc.txt", top)
+
+
+def summarize_query_log(log_dir: Path, output_path: Path) -> Path:
+    """Write one row per profiled query of a DuckDB file log to a CSV, slowest first.
+
+    ``log_dir`` is a ``storage='file'`` log of the QueryLog and Metrics types,
+    as written by ``src.duckdb_profiling``. A query's metrics follow its
+    QueryLog entry with the same context_id; queries without metrics (run
+    before profiling was enabled on their connection) are left out.
+    """
+    queries: list[dict] = []
+    last_query: dict[str, dict] = {}
+    with (log_dir / QUERY_LOG_ENTRIES).open(encoding="utf-8", newline="") as entries:
+        for entry in csv.DictReader(entries):
+            if entry["type"] == "QueryLog":
+                query = {"logged_at": entry["timestamp"], "query": entry["message"]}
+                last_query[entry["context_id"]] = query
+                queries.append(query)
+                continue
+            match = _METRIC_PATTERN.match(entry["message"])
+            query = last_query.get(entry["context_id"])
+            if entry["type"] == "Metrics" and match and query is not None:
+                metric, value = match.groups()
+                if metric in QUERY_METRICS:
+                    column = QUERY_METRICS[metric]
+                    query[column] = (
+                        float(value) if column.endswith("_seconds") else int(value)
+                    )
+
+    profiled = [query for query in queries if "latency_seconds" in query]
+    profiled.sort(key=lambda query: query["latency_seconds"], reverse=True)
+    with output_path.open("w", encoding="utf-8", newline="") as output:
+        writer = csv.DictWriter(
+            output, fieldnames=["logged_at", *QUERY_METRICS.values(), "query"]
+        )
+        writer.writeheader()
+        writer.writerows(profiled)
+    return output_path
@@ -0,0 +1,256 @@
+"""Cached read API over the customer metrics of the warehouse.
+
+Readers never open the warehouse the DAG writes to: DuckDB locks the file,
+so a reader holding it would make the next bronze or silver task fail. After
+each successful gold run, ``publish_snapshot`` copies the serving tables to
+a new read-only snapshot file, sorted by customer_id, and points
+``CURRENT.json`` at it. ``CustomerMetricsReader`` serves lookups from a pool
+of cursors over the current snapshot and an LRU cache of rows per customer.
+When CURRENT.json points to a new snapshot, the reader switches to it and
+clears the cache.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import duckdb
+
+SERVING_TABLE = "fct_customer_transactions"
+POINTER_FILE = "CURRENT.json"
+SNAPSHOT_TEMPLATE = "customer_metrics_{ds_nodash}_{stamp}.duckdb"
+# Snapshots kept on disk; older ones may still be open by a slow reader
+KEEP_SNAPSHOTS = 2
+# Cached for customers without metrics, so they aren't queried again
+_MISSING = object()
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def publish_snapshot(
+    con: duckdb.DuckDBPyConnection, serving_dir: Path, ds_nodash: str
+) -> Path:
+    """Copy SERVING_TABLE from the warehouse open in ``con`` to a new snapshot.
+
+    The snapshot is written under a temporary name and renamed, then
+    CURRENT.json is replaced atomically, so a reader either sees the previous
+    snapshot or the complete new one. Returns the snapshot path.
+    """
+    serving_dir.mkdir(parents=True, exist_ok=True)
+    path = serving_dir / SNAPSHOT_TEMPLATE.format(
+        ds_nodash=ds_nodash, stamp=time.time_ns()
+    )
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.unlink(missing_ok=True)
+    con.execute(f"ATTACH {_sql_literal(str(tmp_path))} AS __serving")
+    try:
+        # Sorted by customer_id so batched lookups skip row groups by their
+        # min/max statistics; the ART index serves point lookups
+        con.execute(
+            f"CREATE TABLE __serving.{SERVING_TABLE} AS "
+            f"SELECT * FROM {SERVING_TABLE} ORDER BY customer_id"
+        )
+        con.execute(
+            f"CREATE INDEX {SERVING_TABLE}_customer_id "
+            f"ON __serving.{SERVING_TABLE} (customer_id)"
+        )
+    finally:
+        con.execute("DETACH __serving")
+    os.replace(tmp_path, path)
+
+    pointer = serving_dir / POINTER_FILE
+    tmp_pointer = pointer.with_suffix(".tmp")
+    tmp_pointer.write_text(
+        json.dumps({"ds_nodash": ds_nodash, "snapshot": path.name}), encoding="utf-8"
+    )
+    os.replace(tmp_pointer, pointer)
+
+    # Oldest first, by the publish stamp at the end of the name
+    snapshots = sorted(
+        serving_dir.glob("customer_metrics_*.duckdb"),
+        key=lambda snapshot: int(snapshot.stem.rsplit("_", 1)[1]),
+    )
+    for old in snapshots[:-KEEP_SNAPSHOTS]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+class LRUCache:
+    """Thread-safe least-recently-used mapping with hit/miss counters."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Cached value of ``key``, marked as recently used, or ``default``."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value) -> None:
+        """Cache ``value``, evicting the least recently used beyond maxsize."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Snapshot:
+    """A read-only snapshot and a pool of cursors over it."""
+
+    def __init__(self, path: Path, ds_nodash: str, pool_size: int):
+        self.path = path
+        self.ds_nodash = ds_nodash
+        self.con = duckdb.connect(str(path), read_only=True)
+        self.cursors: queue.Queue = queue.Queue()
+        for _ in range(pool_size):
+            self.cursors.put(self.con.cursor())
+        self.columns = [
+            row[0] for row in self.con.execute(f"DESCRIBE {SERVING_TABLE}").fetchall()
+        ]
+        self.key_position = self.columns.index("customer_id")
+
+    @contextmanager
+    def cursor(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Borrow a cursor; blocks while every cursor of the pool is in use."""
+        cursor = self.cursors.get()
+        try:
+            yield cursor
+        finally:
+            self.cursors.put(cursor)
+
+
+class CustomerMetricsReader:
+    """Point and batched lookups of customer metrics from the current snapshot.
+
+    ``pool_size`` cursors share one read-only connection, so up to that many
+    threads query at once. ``refresh_seconds`` is how often CURRENT.json is
+    checked for a new snapshot; 0 checks on every lookup.
+    """
+
+    def __init__(
+        self,
+        serving_dir: Path,
+        pool_size: int = 4,
+        cache_size: int = 100_000,
+        refresh_seconds: float = 1.0,
+    ):
+        self.serving_dir = serving_dir
+        self.pool_size = pool_size
+        self.refresh_seconds = refresh_seconds
+        self.cache = LRUCache(cache_size)
+        self._snapshot: _Snapshot | None = None
+        self._pointer_mtime: int | None = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def ds_nodash(self) -> str | None:
+        """Day of the gold run that published the snapshot being served."""
+        return self._current().ds_nodash
+
+    def _current(self) -> _Snapshot:
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < self.refresh_seconds:
+            return self._snapshot
+        with self._lock:
+            self._checked_at = now
+            pointer = self.serving_dir / POINTER_FILE
+            try:
+                mtime = pointer.stat().st_mtime_ns
+            except FileNotFoundError as error:
+                raise FileNotFoundError(
+                    f"No serving snapshot published in {self.serving_dir}"
+                ) from error
+            if mtime != self._pointer_mtime:
+                published = json.loads(pointer.read_text(encoding="utf-8"))
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.path.name != published["snapshot"]:
+                    # Cursors in use keep the previous snapshot open until returned
+                    self._snapshot = _Snapshot(
+                        self.serving_dir / published["snapshot"],
+                        published["ds_nodash"],
+                        self.pool_size,
+                    )
+                    self.cache.clear()
+                self._pointer_mtime = mtime
+            return self._snapshot
+
+    def get(self, customer_id: int) -> dict | None:
+        """Metrics of one customer, or None if it has none."""
+        return self.get_many([customer_id]).get(customer_id)
+
+    def get_many(self, customer_ids: Iterable[int]) -> dict[int, dict]:
+        """Metrics of every customer in ``customer_ids`` that has them.
+
+        Cached customers are answered from the LRU cache and the rest with a
+        single query; customers without metrics are cached too.
+        """
+        snapshot = self._current()
+        found: dict[int, dict] = {}
+        pending = []
+        for customer_id in dict.fromkeys(customer_ids):
+            row = self.cache.get(customer_id, None)
+            if row is None:
+                pending.append(customer_id)
+            elif row is not _MISSING:
+                found[customer_id] = row
+        if not pending:
+            return found
+
+        with snapshot.cursor() as cursor:
+            if len(pending) == 1:
+                rows = cursor.execute(
+                    f"SELECT * FROM {SERVING_TABLE} WHERE customer_id = ?", pending
+                ).fetchall()
+            else:
+                # A join against the ids probes the index; IN (...) scans the table
+                rows = cursor.execute(
+                    f"SELECT metrics.* FROM (SELECT unnest(?) AS customer_id) AS ids "
+                    f"JOIN {SERVING_TABLE} AS metrics USING (customer_id)",
+                    [pending],
+                ).fetchall()
+        for row in rows:
+            found[row[snapshot.key_position]] = dict(zip(snapshot.columns, row))
+        if snapshot is self._snapshot:
+            for customer_id in pending:
+                self.cache.put(customer_id, found.get(customer_id, _MISSING))
+        return found
+
+    def close(self) -> None:
+        """Close the connection to the current snapshot, if one is open."""
+        with self._lock:
+            if self._snapshot is not None:
+                self._snapshot.con.close()
+            self._snapshot = None
+            self._pointer_mtime = None
+            self.cache.clear()
@@ -0,0 +1,179 @@
+"""Synthetic dirty transaction files for tests and benchmarks of the bronze step."""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.transformations import RAW_FILE_TEMPLATE
+
+HEADER = ["transaction_id", "customer_id", "amount", "status", "transaction_ts"]
+CHUNK_ROWS = 1_000_000
+
+# Spellings of valid statuses seen in production files
+STATUS_VARIANTS = [
+    "completed",
+    "Completed",
+    "COMPLETED",
+    " completed ",
+    "pending",
+    "Pending",
+    "PENDING",
+    "pending ",
+    "failed",
+    "Failed",
+    "FAILED",
+    " failed",
+]
+BAD_AMOUNTS = ["", "N/A", "abc", "$10.00"]
+BAD_STATUSES = ["unknown", "cancelled", "", "OK"]
+BAD_TIMESTAMPS = ["not_a_timestamp", "2025-13-45 99:99:99", "", "2025-02-30 10:00:00"]
+
+
+@dataclass
+class DirtyRates:
+    """Fraction of generated rows affected by each production defect."""
+
+    bad_amount: float = 0.02
+    bad_status: float = 0.01
+    bad_timestamp: float = 0.01
+    duplicate: float = 0.02
+
+
+@dataclass
+class GenerationStats:
+    """What a generated file contains, so cleaning results can be checked."""
+
+    rows: int = 0
+    duplicates: int = 0
+    defects: dict[str, int] = field(default_factory=dict)
+    expected_clean_rows: int = 0
+
+    def to_dict(self) -> dict:
+        """JSON-able form of every count."""
+        return asdict(self)
+
+
+def _chunk(
+    rng: np.random.Generator,
+    first_id: int,
+    n_rows: int,
+    day: date,
+    n_customers: int,
+    rates: DirtyRates,
+    stats: GenerationStats,
+) -> pd.DataFrame:
+    ids = np.arange(first_id, first_id + n_rows)
+    amounts = pd.Series(np.round(rng.gamma(2.0, 50.0, n_rows), 2)).map(
+        lambda amount: f"{amount:.2f}"
+    )
+    statuses = pd.Series(rng.choice(STATUS_VARIANTS, n_rows))
+    seconds = rng.integers(0, 24 * 3600, n_rows)
+    timestamps = pd.Series(
+        (pd.Timestamp(day) + pd.to_timedelta(seconds, unit="s")).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+    )
+
+    # At most one defect per row so the expected clean count is exact
+    kinds = ["bad_amount", "bad_status", "bad_timestamp"]
+    probabilities = [getattr(rates, kind) for kind in kinds]
+    draw = rng.choice(
+        len(kinds) + 1, n_rows, p=[*probabilities, 1 - sum(probabilities)]
+    )
+    for index, (kind, column, values) in enumerate(
+        [
+            ("bad_amount", amounts, BAD_AMOUNTS),
+            ("bad_status", statuses, BAD_STATUSES),
+            ("bad_timestamp", timestamps, BAD_TIMESTAMPS),
+        ]
+    ):
+        mask = draw == index
+        column[mask] = rng.choice(values, int(mask.sum()))
+        stats.defects[kind] = stats.defects.get(kind, 0) + int(mask.sum())
+
+    frame = pd.DataFrame(
+        {
+            "transaction_id": ids,
+            "customer_id": rng.integers(1, n_customers + 1, n_rows),
+            "amount": amounts,
+            "status": statuses,
+            "transaction_ts": timestamps,
+        }
+    )
+
+    # Exact re-sends of rows already in the chunk, interleaved at random
+    n_duplicates = int(n_rows * rates.duplicate)
+    if n_duplicates:
+        copies = frame.iloc[rng.integers(0, n_rows, n_duplicates)]
+        frame = pd.concat([frame, copies], ignore_index=True)
+        frame = frame.iloc[rng.permutation(len(frame))]
+
+    stats.rows += len(frame)
+    stats.duplicates += n_duplicates
+    stats.expected_clean_rows += int((draw == len(kinds)).sum())
+    return frame
+
+
+def generate_transactions(
+    output_path: Path,
+    n_rows: int,
+    day: date = date(2025, 12, 1),
+    seed: int = 0,
+    n_customers: int | None = None,
+    rates: DirtyRates | None = None,
+    chunk_rows: int = CHUNK_ROWS,
+    first_id: int = 1,
+) -> GenerationStats:
+    """Write a raw CSV with ``n_rows`` unique transactions plus injected defects.
+
+    The file starts with a UTF-8 BOM and is written in chunks, so memory use
+    doesn't depend on ``n_rows``. Duplicates are added on top of ``n_rows``.
+    transaction_ids run from ``first_id``; overlapping ranges across days
+    simulate replays.
+    """
+    rng = np.random.default_rng(seed)
+    rates = rates or DirtyRates()
+    n_customers = n_customers or max(n_rows // 20, 1)
+    stats = GenerationStats()
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("w", encoding="utf-8-sig", newline="") as handle:
+        handle.write(",".join(HEADER) + "\n")
+        for offset in range(0, n_rows, chunk_rows):
+            size = min(chunk_rows, n_rows - offset)
+            frame = _chunk(rng, first_id + offset, size, day, n_customers, rates, stats)
+            frame.to_csv(handle, header=False, index=False)
+
+    return stats
+
+
+def main() -> None:
+    """Command line entry point, see --help."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=float, required=True, help="unique rows, e.g. 1e6"
+    )
+    parser.add_argument("--date", default="2025-12-01", help="YYYY-MM-DD of the file")
+    parser.add_argument("--raw-dir", type=Path, default=Path("data/raw"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--first-id", type=int, default=1)
+    args = parser.parse_args()
+
+    day = datetime.strptime(args.date, "%Y-%m-%d").date()
+    output_path = args.raw_dir / RAW_FILE_TEMPLATE.format(
+        ds_nodash=day.strftime("%Y%m%d")
+    )
+    stats = generate_transactions(
+        output_path, int(args.rows), day=day, seed=args.seed, first_id=args.first_id
+    )
+    print(f"{output_path}: {stats.to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Per-node timing history of dbt invocations, kept in the DuckDB warehouse.
+
+Every silver and gold invocation appends one row per dbt node (model or
+test) with its execution time, rows affected and status, so the nodes that
+get slower as the volume grows can be found with SQL or with
+``timing_regressions``.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import duckdb
+
+from src.dbt_runner import DbtInvocation
+
+TIMINGS_TABLE = "dbt_node_timings"
+TIMINGS_COLUMNS = {
+    "recorded_at": "TIMESTAMP",
+    "stage": "VARCHAR",
+    "command": "VARCHAR",
+    "ds_nodash": "VARCHAR",
+    "end_ds_nodash": "VARCHAR",
+    "unique_id": "VARCHAR",
+    "status": "VARCHAR",
+    "execution_time": "DOUBLE",
+    "rows_affected": "BIGINT",
+    "failures": "BIGINT",
+}
+
+
+def record_node_timings(
+    con: duckdb.DuckDBPyConnection,
+    stage: str,
+    invocation: DbtInvocation,
+    ds_nodash: str,
+    end_ds_nodash: str | None = None,
+    extra_nodes: list[dict] | None = None,
+) -> int:
+    """Append the nodes of ``invocation`` to TIMINGS_TABLE and return how many.
+
+    ``extra_nodes`` are timed steps that ran outside dbt for the same
+    invocation, with the same keys as ``DbtInvocation.nodes``.
+    """
+    columns = ", ".join(f"{name} {kind}" for name, kind in TIMINGS_COLUMNS.items())
+    con.execute(f"CREATE TABLE IF NOT EXISTS {TIMINGS_TABLE} ({columns})")
+    recorded_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = [
+        (
+            recorded_at,
+            stage,
+            invocation.command,
+            ds_nodash,
+            end_ds_nodash or ds_nodash,
+            node["unique_id"],
+            node["status"],
+            node["execution_time"],
+            node.get("rows_affected"),
+            node.get("failures"),
+        )
+        for node in [*invocation.nodes, *(extra_nodes or [])]
+    ]
+    if rows:
+        con.executemany(
+            f"INSERT INTO {TIMINGS_TABLE} ({', '.join(TIMINGS_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in TIMINGS_COLUMNS)})",
+            rows,
+        )
+    return len(rows)
+
+
+def timing_regressions(
+    con: duckdb.DuckDBPyConnection,
+    window: int = 7,
+    factor: float = 1.5,
+    min_seconds: float = 0.1,
+) -> list[dict]:
+    """Nodes whose latest execution time regressed against their rolling baseline.
+
+    The baseline of a node is the median time of its previous ``window``
+    successful runs; the latest run regresses when it took more than
+    ``factor`` times the baseline and at least ``min_seconds`` longer, which
+    keeps sub-second noise out. Nodes need one earlier run to have a baseline.
+    Returns ``unique_id``, ``ds_nodash``, ``execution_time``, ``baseline``
+    and ``ratio`` per regressed node, slowest ratio first.
+    """
+    exists = con.execute(
+        "SELECT count(*) FROM information_schema.tables WHERE table_name = ?",
+        [TIMINGS_TABLE],
+    ).fetchone()[0]
+    if not exists:
+        return []
+    cursor = con.execute(
+        f"""
+        WITH runs AS (
+            SELECT
+                unique_id,
+                ds_nodash,
+                execution_time,
+                median(execution_time) OVER (
+                    PARTITION BY unique_id ORDER BY recorded_at, rowid
+                    ROWS BETWEEN {int(window)} PRECEDING AND 1 PRECEDING
+                ) AS baseline,
+                row_number() OVER (
+                    PARTITION BY unique_id ORDER BY recorded_at DESC, rowid DESC
+                ) AS newest
+            FROM {TIMINGS_TABLE}
+            WHERE status IN ('success', 'pass')
+        )
+        SELECT unique_id, ds_nodash, execution_time, baseline, execution_time / baseline AS ratio
+        FROM runs
+        WHERE newest = 1
+          AND baseline > 0
+          AND execution_time > ? * baseline
+          AND execution_time - baseline >= ?
+        ORDER BY ratio DESC, unique_id
+        """,
+        [factor, min_seconds],
+    )
+    names = [column[0] for column in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
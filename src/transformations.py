@@ -1,30 +1,186 @@
-"""Utilities to clean daily transaction files for the medallion pipeline."""
+"""Utilities to clean daily transaction files for the medallion pipeline.
+
+The cleaning itself runs in pandas_engine, arrow_engine or duckdb_engine,
+which share the checks and output schemas of src.cleaning.
+"""
 
 from __future__ import annotations
 
+import functools
+import os
+import re
+import time
 from datetime import date
 from pathlib import Path
 
-import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.arrow_engine import (
+    RawChunk,
+    _clean_arrow,
+    _clean_shard,
+    _clean_shards,
+    _load_chunk,
+    _merge_shards,
+)
+from src.cleaning import (
+    DROP_REASONS,
+    ID_COLUMNS,
+    PARTITION_COLUMN,
+    ArrowHandoff,
+    _status_mapping,
+)
+from src.duckdb_engine import _clean_duckdb
+from src.id_index import TransactionIdIndex
+from src.metrics import StageMetrics, peak_rss_bytes
+from src.pandas_engine import _clean_pandas, _clean_streaming
+from src.writer_profiles import WriterProfile, writer_profile
 
 RAW_FILE_TEMPLATE = "transactions_{ds_nodash}.csv"
+# Upstream may split a day in shards instead, optionally gzip or zstd compressed
+RAW_SHARD_TEMPLATE = "transactions_{ds_nodash}_*"
+RAW_SHARD_SUFFIXES = (".csv", ".csv.gz", ".csv.zst")
+# Cleaned chunk of a raw file, written by clean_raw_chunk for the merge step
+CHUNK_FILE_TEMPLATE = "chunk-{index:05d}.arrow"
 CLEAN_FILE_TEMPLATE = "transactions_{ds_nodash}_clean.parquet"
+# Quarantine sidecar: raw values of the rejected rows plus reject_reason
+REJECTED_FILE_TEMPLATE = "transactions_{ds_nodash}_rejected.parquet"
+# Holds the sidecars of a partitioned layout; "_" keeps dataset readers out of it
+REJECTED_DIR = "_rejected"
+# Hive layout: data/clean/transaction_date=YYYY-MM-DD/part-<ds_nodash>-<i>.parquet
+PARTITION_FILE_PREFIX = "part-{ds_nodash}-"
+
+ENGINES = ("pandas", "arrow", "duckdb")
+LAYOUTS = ("file", "partitioned")
+
+
+def clean_raw_chunk(
+    chunk: RawChunk,
+    chunk_dir: Path,
+    index: int,
+    status_mapping: dict[str, str] | None = None,
+) -> Path:
+    """Clean one chunk of a raw day and save it for clean_daily_transactions to merge.
+
+    The Arrow IPC file holds the chunk's distinct raw rows, their cleaned
+    copies as ``__clean_<column>`` and ``__reject_code``, with the rows read
+    in the schema metadata. Returns its path under ``chunk_dir``.
+    """
+    raw, table, codes, rows_read = _clean_shard(chunk, _status_mapping(status_mapping))
+    combined = pa.Table.from_arrays(
+        [*raw.columns, *table.columns, pa.array(codes)],
+        names=[
+            *raw.column_names,
+            *(f"__clean_{name}" for name in table.column_names),
+            "__reject_code",
+        ],
+    ).replace_schema_metadata({"rows_read": str(rows_read)})
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+    path = chunk_dir / CHUNK_FILE_TEMPLATE.format(index=index)
+    with pa.ipc.new_file(path, combined.schema) as writer:
+        writer.write_table(combined)
+    return path
+
+
+def _shard_order(path: Path) -> list:
+    """Natural sort key, so shard 10 of a day comes after shard 9."""
+    return [
+        int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path.name)
+    ]
+
+
+def raw_input_files(
+    raw_dir: Path,
+    ds_nodash: str,
+    raw_template: str = RAW_FILE_TEMPLATE,
+    shard_template: str = RAW_SHARD_TEMPLATE,
+) -> list[Path]:
+    """Raw CSV files of one day: the raw_template file or, without it, its shards.
+
+    Shards match ``shard_template`` with one of RAW_SHARD_SUFFIXES and come in
+    natural name order, the order duplicates across shards are resolved in.
+    """
+    input_path = raw_dir / raw_template.format(ds_nodash=ds_nodash)
+    if input_path.exists():
+        return [input_path]
+    shards = raw_dir.glob(shard_template.format(ds_nodash=ds_nodash))
+    return sorted(
+        (path for path in shards if path.name.endswith(RAW_SHARD_SUFFIXES)),
+        key=_shard_order,
+    )
+
+
+def _line_ranges(input_path: Path, chunk_bytes: int) -> list[tuple[int, int]]:
+    """Byte ranges of about ``chunk_bytes`` after the header, each ending at a line end.
+
+    Assumes no quoted field spans lines, as in the raw files upstream sends.
+    """
+    size = input_path.stat().st_size
+    with input_path.open("rb") as raw:
+        raw.readline()
+        bounds = [raw.tell()]
+        while bounds[-1] + chunk_bytes < size:
+            # The line chunk_bytes in belongs to the chunk it started in
+            raw.seek(bounds[-1] + chunk_bytes)
+            raw.readline()
+            if raw.tell() >= size:
+                break
+            bounds.append(raw.tell())
+    return list(zip(bounds, [*bounds[1:], size]))
 
 
-def _coerce_amount(value: pd.Series) -> pd.Series:
-    """Normalize numeric fields and drop non-coercible entries."""
-    coerced = pd.to_numeric(value, errors="coerce")
-    return coerced
+def raw_chunks(
+    raw_dir: Path,
+    ds_nodash: str,
+    chunk_bytes: int,
+    raw_template: str = RAW_FILE_TEMPLATE,
+    shard_template: str = RAW_SHARD_TEMPLATE,
+) -> list[RawChunk]:
+    """Split the raw files of one day into chunks of about ``chunk_bytes``, in row order.
+
+    Uncompressed files are split at line boundaries; compressed shards can't
+    be read from an offset, so each one is a single chunk.
+    """
+    chunks = []
+    for path in raw_input_files(raw_dir, ds_nodash, raw_template, shard_template):
+        if path.suffix == ".csv":
+            chunks.extend(
+                RawChunk(path, start, end)
+                for start, end in _line_ranges(path, chunk_bytes)
+            )
+        else:
+            chunks.append(RawChunk(path))
+    return chunks
 
 
-def _normalize_status(value: pd.Series) -> pd.Series:
-    normalized = value.fillna("").str.strip().str.lower()
-    mapping = {
-        "completed": "completed",
-        "pending": "pending",
-        "failed": "failed",
-    }
-    return normalized.map(mapping)
+def clean_output_files(
+    clean_dir: Path,
+    ds_nodash: str,
+    layout: str = "file",
+    clean_template: str = CLEAN_FILE_TEMPLATE,
+) -> list[Path]:
+    """Parquet files clean_daily_transactions wrote for one day."""
+    if layout == "partitioned":
+        prefix = PARTITION_FILE_PREFIX.format(ds_nodash=ds_nodash)
+        return sorted(clean_dir.glob(f"{PARTITION_COLUMN}=*/{prefix}*.parquet"))
+    output_path = clean_dir / clean_template.format(ds_nodash=ds_nodash)
+    return [output_path] if output_path.exists() else []
+
+
+def staging_input_files(
+    clean_dir: Path,
+    ds_nodash: str,
+    layout: str = "file",
+    clean_template: str = CLEAN_FILE_TEMPLATE,
+) -> list[Path]:
+    """Parquet files stg_transactions reads when loading one day.
+
+    These are the files written for the day, also in the partitioned layout,
+    where staging takes the day from the file name, not from the partition.
+    """
+    return clean_output_files(clean_dir, ds_nodash, layout, clean_template)
 
 
 def clean_daily_transactions(
@@ -33,40 +189,202 @@ def clean_daily_transactions(
     clean_dir: Path,
     raw_template: str = RAW_FILE_TEMPLATE,
     clean_template: str = CLEAN_FILE_TEMPLATE,
+    batch_size: int | None = None,
+    engine: str = "pandas",
+    layout: str = "file",
+    rejected_template: str = REJECTED_FILE_TEMPLATE,
+    metrics: StageMetrics | None = None,
+    status_mapping: dict[str, str] | None = None,
+    id_index: TransactionIdIndex | None = None,
+    handoff: ArrowHandoff | None = None,
+    compact_types: bool = False,
+    parquet_profile: str | WriterProfile = "default",
+    shard_template: str = RAW_SHARD_TEMPLATE,
+    shard_workers: int | None = None,
+    chunk_paths: list[Path] | None = None,
 ) -> Path:
-    """Read the raw CSV for the DAG date, clean it, and save a parquet file."""
+    """Read the raw CSV for the DAG date, clean it, and save a parquet file.
+
+    When ``batch_size`` is given the file is streamed in batches of that many
+    records and written as one parquet row group per batch, keeping memory
+    usage bounded regardless of the file size.
+
+    ``engine="arrow"`` reads the file with pyarrow.csv using declared column
+    types and cleans it with Arrow compute kernels instead of pandas.
+    ``engine="duckdb"`` runs the whole cleaning as a single multi-threaded
+    DuckDB ``read_csv`` plus ``COPY ... TO`` parquet statement.
+
+    ``layout="partitioned"`` writes a hive-partitioned dataset under
+    ``clean_dir`` (``transaction_date=YYYY-MM-DD/part-<ds_nodash>-*.parquet``)
+    instead of a single file, and returns ``clean_dir``. Files previously
+    written for the same day are replaced.
+
+    ``status`` is written as a dictionary-encoded column over STATUS_VALUES
+    (an ENUM in the duckdb engine); ``status_mapping`` replaces the default
+    STATUS_MAPPING alias table, its keys matched after strip and lower.
+
+    With an ``id_index``, clean rows whose transaction_id was already loaded
+    on an earlier day are dropped as ``cross_day_duplicate`` and the IDs
+    written for this day are recorded in the index.
+
+    Rows dropped for a REJECT_REASONS check are written, with their raw
+    values and a ``reject_reason`` column, to ``rejected_template`` under
+    ``clean_dir`` (``clean_dir/_rejected`` for the partitioned layout) in the
+    same pass, as an empty file when nothing is rejected.
+
+    A ``handoff`` callable receives the clean rows as one Arrow table (e.g.
+    warehouse.load_clean_table, to skip the parquet round-trip into DuckDB)
+    while the parquet file is written in a background thread.
+
+    ``compact_types=True`` writes COMPACT_TYPES: amount as DECIMAL(18, 2),
+    rounded to cents, and each of transaction_id / customer_id as int32 when
+    every valid ID read that day fits, int64 otherwise. The types picked are
+    recorded in ``metrics.details["id_types"]``.
+
+    ``parquet_profile`` picks how the clean parquet is written: a
+    WRITER_PROFILES name or a WriterProfile with the codec and level, row
+    group size, dictionary encoding, statistics and the columns to cluster
+    the rows by (e.g. ``"clustered"``: by customer_id, transaction_ts).
+
+    Without a ``raw_template`` file, the day is read from the shards that
+    raw_input_files finds (``transactions_<ds_nodash>_*.csv``, plain, ``.gz``
+    or ``.zst``), decompressed as they are parsed. Shards are cleaned with
+    the arrow kernels whatever the ``engine``, ``shard_workers`` of them at
+    once in a process pool (default: one per CPU), and merged into the same
+    output; duplicates are removed exactly across shards.
+
+    With ``chunk_paths`` the raw files are not read: the chunks of the day
+    that clean_raw_chunk saved (e.g. in parallel Airflow tasks over
+    raw_chunks) are merged instead, in the order given, which must be the
+    raw_chunks order. The output is the same as cleaning the day in one call.
+
+    When a ``metrics`` record is given it is filled with rows read, written
+    and dropped per DROP_REASONS, bytes in/out, time per sub-step and the
+    process peak RSS.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout {layout!r}, expected one of {LAYOUTS}")
+    if batch_size is not None and engine != "pandas":
+        raise ValueError("batch_size is only supported by the pandas engine")
+    if batch_size is not None and handoff is not None:
+        raise ValueError(
+            "handoff needs the whole clean table, it can't be used with batch_size"
+        )
+    status_mapping = _status_mapping(status_mapping)
+    profile = writer_profile(parquet_profile)
 
     ds_nodash = execution_date.strftime("%Y%m%d")
     input_path = raw_dir / raw_template.format(ds_nodash=ds_nodash)
     output_path = clean_dir / clean_template.format(ds_nodash=ds_nodash)
+    rejected_path = clean_dir / rejected_template.format(ds_nodash=ds_nodash)
 
-    if not input_path.exists():
+    input_paths = raw_input_files(raw_dir, ds_nodash, raw_template, shard_template)
+    if not input_paths:
         raise FileNotFoundError(
             f"Raw data not found for {execution_date}: {input_path}"
         )
+    sharded = input_paths != [input_path] or chunk_paths is not None
+    if sharded and batch_size is not None:
+        raise ValueError("batch_size is not supported for sharded or chunked raw input")
 
     clean_dir.mkdir(parents=True, exist_ok=True)
 
-    df = pd.read_csv(input_path)
+    partition_prefix = None
+    if layout == "partitioned":
+        output_path = clean_dir
+        rejected_path = clean_dir / REJECTED_DIR / rejected_path.name
+        rejected_path.parent.mkdir(exist_ok=True)
+        partition_prefix = PARTITION_FILE_PREFIX.format(ds_nodash=ds_nodash)
+        for stale in clean_output_files(clean_dir, ds_nodash, layout):
+            stale.unlink()
 
-    # Basic cleanup
-    df.columns = [col.strip().lower() for col in df.columns]
-    df = df.drop_duplicates()
+    if metrics is None:
+        metrics = StageMetrics(stage="bronze")
+    metrics.ds_nodash = ds_nodash
+    metrics.details.update(
+        engine="arrow" if sharded else engine,
+        raw_files=len(input_paths),
+        chunks=None if chunk_paths is None else len(chunk_paths),
+        layout=layout,
+        batch_size=batch_size,
+        handoff=handoff is not None,
+        compact_types=compact_types,
+        id_types=None,
+        parquet_profile=(
+            parquet_profile if isinstance(parquet_profile, str) else "custom"
+        ),
+    )
+    for reason in DROP_REASONS:
+        metrics.dropped.setdefault(reason, 0)
+    metrics.bytes_in = sum(path.stat().st_size for path in input_paths)
+    start = time.perf_counter()
 
-    if "amount" in df.columns:
-        df["amount"] = _coerce_amount(df["amount"])
-
-    if "status" in df.columns:
-        df["status"] = _normalize_status(df["status"])
-
-    df = df.dropna(subset=["transaction_id", "customer_id", "amount", "status"])
-
-    # Add simple derived fields for downstream dbt modeling
-    if "transaction_ts" in df.columns:
-        df["transaction_ts"] = pd.to_datetime(df["transaction_ts"], errors="coerce")
-        df = df.dropna(subset=["transaction_ts"])
-        df["transaction_date"] = df["transaction_ts"].dt.date
+    is_replay = None
+    if id_index is not None:
+        is_replay = functools.partial(id_index.prior_duplicates, ds_nodash)
+    options = (metrics, status_mapping, is_replay, partition_prefix)
+    output_options = (handoff, compact_types, profile)
+    if sharded:
+        if chunk_paths is None:
+            with metrics.timed("clean_shards"):
+                shards = _clean_shards(
+                    [RawChunk(path) for path in input_paths],
+                    status_mapping,
+                    shard_workers or os.cpu_count() or 1,
+                )
+            names = [path.name for path in input_paths]
+        else:
+            with metrics.timed("load_chunks"):
+                shards = [_load_chunk(path) for path in chunk_paths]
+            names = [path.name for path in chunk_paths]
+        _merge_shards(
+            shards,
+            names,
+            output_path,
+            rejected_path,
+            metrics,
+            is_replay,
+            partition_prefix,
+            *output_options,
+        )
+    elif batch_size is not None:
+        _clean_streaming(
+            input_path,
+            output_path,
+            rejected_path,
+            batch_size,
+            *options,
+            compact=compact_types,
+            profile=profile,
+        )
+    elif engine == "arrow":
+        _clean_arrow(input_path, output_path, rejected_path, *options, *output_options)
+    elif engine == "duckdb":
+        _clean_duckdb(input_path, output_path, rejected_path, *options, *output_options)
+    else:
+        _clean_pandas(input_path, output_path, rejected_path, *options, *output_options)
 
-    df.to_parquet(output_path, index=False)
+    written_files = clean_output_files(clean_dir, ds_nodash, layout, clean_template)
+    if compact_types and written_files:
+        schema = pq.read_schema(written_files[0])
+        metrics.details["id_types"] = {
+            name: str(schema.field(name).type) for name in ID_COLUMNS
+        }
+    if id_index is not None:
+        with metrics.timed("index"):
+            written_ids = [
+                pq.read_table(path, columns=["transaction_id"])[
+                    "transaction_id"
+                ].to_numpy()
+                for path in written_files
+            ]
+            id_index.add(
+                ds_nodash, np.concatenate([np.empty(0, np.int64), *written_ids])
+            )
 
+    metrics.wall_seconds = time.perf_counter() - start
+    metrics.bytes_out = sum(path.stat().st_size for path in written_files)
+    metrics.peak_rss_bytes = peak_rss_bytes()
     return output_path
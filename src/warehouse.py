@@ -0,0 +1,120 @@
+"""Load cleaned Arrow tables straight into the DuckDB warehouse."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+import pyarrow as pa
+
+from src.cleaning import ID_COLUMNS, STATUS_VALUES
+
+# Table stg_transactions reads when dbt runs with clean_source=warehouse
+BRONZE_TABLE = "bronze_transactions"
+# Incremental model whose rows of a day identify what Silver loaded for it
+SILVER_TABLE = "int_customer_transactions_daily"
+# Same type as the status_enum() dbt macro
+STATUS_ENUM = "ENUM(" + ", ".join(f"'{status}'" for status in STATUS_VALUES) + ")"
+BRONZE_COLUMNS = {
+    "transaction_id": "BIGINT",
+    "customer_id": "BIGINT",
+    "amount": "DOUBLE",
+    "status": STATUS_ENUM,
+    "transaction_ts": "TIMESTAMP",
+    "transaction_date": "DATE",
+}
+# Column types when bronze runs with compact_types; each ID column takes the
+# width the day was written with (ID_TYPES)
+BRONZE_COMPACT_COLUMNS = {
+    **BRONZE_COLUMNS,
+    "transaction_id": "INTEGER",
+    "customer_id": "INTEGER",
+    "amount": "DECIMAL(18,2)",
+}
+ID_TYPES = {pa.int32(): "INTEGER", pa.int64(): "BIGINT"}
+
+
+def load_clean_table(
+    con: duckdb.DuckDBPyConnection, ds_nodash: str, table: pa.Table
+) -> int:
+    """Replace the rows of ``ds_nodash`` in BRONZE_TABLE with ``table``.
+
+    The Arrow table is registered as a view over its own buffers, so DuckDB
+    scans it in place and the rows are copied once, into the warehouse,
+    instead of going through a parquet file. The table is created with the
+    compact types when ``table`` has a decimal column, and an INTEGER ID column
+    of an earlier day is widened to BIGINT when ``table`` has it as int64.
+    Returns the rows loaded.
+    """
+    compact = any(pa.types.is_decimal(field.type) for field in table.schema)
+    types = dict(BRONZE_COMPACT_COLUMNS if compact else BRONZE_COLUMNS)
+    if compact:
+        types.update(
+            {name: ID_TYPES[table.schema.field(name).type] for name in ID_COLUMNS}
+        )
+    columns = ", ".join(f"{name} {kind}" for name, kind in types.items())
+    con.execute(
+        f"CREATE TABLE IF NOT EXISTS {BRONZE_TABLE} ({columns}, ds_nodash VARCHAR)"
+    )
+    existing = dict(
+        con.execute(
+            """
+            SELECT column_name, data_type
+            FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = ?
+            """,
+            [BRONZE_TABLE],
+        ).fetchall()
+    )
+    for name in ID_COLUMNS:
+        if types[name] == "BIGINT" and existing[name] == "INTEGER":
+            con.execute(f"ALTER TABLE {BRONZE_TABLE} ALTER {name} TYPE BIGINT")
+    con.register("__clean_handoff", table)
+    try:
+        con.execute("BEGIN TRANSACTION")
+        con.execute(f"DELETE FROM {BRONZE_TABLE} WHERE ds_nodash = ?", [ds_nodash])
+        con.execute(
+            f"""
+            INSERT INTO {BRONZE_TABLE}
+            SELECT {", ".join(BRONZE_COLUMNS)}, ? AS ds_nodash
+            FROM __clean_handoff
+            """,
+            [ds_nodash],
+        )
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        con.unregister("__clean_handoff")
+    return table.num_rows
+
+
+def silver_partitions(path: Path, days: list[str]) -> dict[str, str | None]:
+    """Row count and xor of row hashes of each day's rows in SILVER_TABLE.
+
+    A day is None when the warehouse doesn't have it, or can't be read (no
+    file or table, or locked by a writer), so the caller loads it again.
+    """
+    partitions: dict[str, str | None] = dict.fromkeys(days)
+    if not path.exists():
+        return partitions
+    try:
+        with duckdb.connect(str(path), read_only=True) as con:
+            rows = con.execute(
+                f"""
+                SELECT
+                    ds_nodash,
+                    count(*),
+                    bit_xor(hash(customer_id, transaction_count, total_amount_all))
+                FROM {SILVER_TABLE}
+                WHERE list_contains(?, ds_nodash)
+                GROUP BY ds_nodash
+                """,
+                [days],
+            ).fetchall()
+    except duckdb.Error:
+        return partitions
+    for ds_nodash, count, digest in rows:
+        partitions[ds_nodash] = f"{SILVER_TABLE}:{count}:{digest}"
+    return partitions
@@ -0,0 +1,97 @@
+"""Parquet writer profiles for the clean bronze output."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# Codecs both pyarrow and DuckDB COPY can write (DuckDB calls "none" uncompressed)
+COMPRESSIONS = ("none", "snappy", "gzip", "zstd", "lz4")
+
+
+@dataclass(frozen=True)
+class WriterProfile:
+    """How the clean parquet is encoded and in which order its rows are written.
+
+    ``None`` keeps the writer's own default (pyarrow or DuckDB COPY), so the
+    default profile writes exactly what bronze wrote before profiles existed.
+    ``cluster_by`` sorts the clean rows by those columns, which gives each row
+    group narrow min/max statistics on them for DuckDB to skip row groups.
+    ``page_index`` adds per-page min/max (the parquet column index). DuckDB
+    always writes row group statistics and no page index, so
+    ``write_statistics`` and ``page_index`` only apply to the pyarrow writers.
+    """
+
+    compression: str | None = None
+    compression_level: int | None = None
+    row_group_size: int | None = None
+    use_dictionary: bool = True
+    write_statistics: bool = True
+    page_index: bool = False
+    cluster_by: tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        if self.compression is not None and self.compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown compression {self.compression!r}, expected one of {COMPRESSIONS}"
+            )
+        if self.row_group_size is not None and self.row_group_size < 1:
+            raise ValueError("row_group_size must be a positive number of rows")
+
+    def pyarrow_options(self) -> dict:
+        """Keyword arguments for pq.write_table / pq.ParquetWriter, row group size aside."""
+        options: dict = {}
+        if self.compression is not None:
+            options["compression"] = self.compression
+        if self.compression_level is not None:
+            options["compression_level"] = self.compression_level
+        if not self.use_dictionary:
+            options["use_dictionary"] = False
+        if not self.write_statistics:
+            options["write_statistics"] = False
+        if self.page_index:
+            options["write_page_index"] = True
+        return options
+
+    def duckdb_options(self) -> str:
+        """Options appended to ``COPY ... TO (FORMAT parquet, ...)``."""
+        options = []
+        if self.compression is not None:
+            codec = "uncompressed" if self.compression == "none" else self.compression
+            options.append(f"COMPRESSION {codec}")
+        if self.compression_level is not None:
+            options.append(f"COMPRESSION_LEVEL {int(self.compression_level)}")
+        if self.row_group_size is not None:
+            options.append(f"ROW_GROUP_SIZE {int(self.row_group_size)}")
+        if not self.use_dictionary:
+            options.append("DICTIONARY_SIZE_LIMIT 0")
+        return "".join(f", {option}" for option in options)
+
+
+WRITER_PROFILES = {
+    # Writer defaults: snappy, pyarrow row groups of up to 1Mi rows, file order
+    "default": WriterProfile(),
+    # Smaller files for the same layout
+    "zstd": WriterProfile(compression="zstd", compression_level=3),
+    # Rows sorted per customer in ~122k-row groups (DuckDB's own row group
+    # size), so staging filters and group-bys on customer_id touch fewer of them
+    "clustered": WriterProfile(
+        compression="zstd",
+        compression_level=3,
+        row_group_size=122_880,
+        page_index=True,
+        cluster_by=("customer_id", "transaction_ts"),
+    ),
+    # Cold storage: slowest to write, smallest on disk
+    "archive": WriterProfile(compression="zstd", compression_level=19),
+}
+
+
+def writer_profile(profile: str | WriterProfile) -> WriterProfile:
+    """Resolve a WRITER_PROFILES name; WriterProfile instances pass through."""
+    if isinstance(profile, WriterProfile):
+        return profile
+    if profile not in WRITER_PROFILES:
+        raise ValueError(
+            f"Unknown writer profile {profile!r}, expected one of {tuple(WRITER_PROFILES)}"
+        )
+    return WRITER_PROFILES[profile]
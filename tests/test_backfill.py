@@ -0,0 +1,111 @@
+"""Tests para la ejecución en paralelo de días de un backfill."""
+
+from __future__ import annotations
+
+import functools
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow.parquet as pq
+import pytest
+
+from src.backfill import OrderedIdIndex, run_days
+from src.transformations import clean_daily_transactions
+
+DIAS = ["20251201", "20251202", "20251203", "20251204"]
+
+
+@pytest.fixture
+def directorio_temporal():
+    """Crea un directorio temporal para los datos del backfill."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def _registrar_en_turno(registro: Path, ds_nodash: str, wait_turn) -> str:
+    # Los días más tempranos tardan más, así terminarían desordenados sin el turno
+    time.sleep(0.05 * (len(DIAS) - DIAS.index(ds_nodash)))
+    wait_turn()
+    with registro.open("a", encoding="utf-8") as archivo:
+        archivo.write(ds_nodash + "\n")
+    return "ok"
+
+
+def _fallar_un_dia(ds_nodash: str, wait_turn) -> str:
+    wait_turn()
+    if ds_nodash == "20251202":
+        raise ValueError("día roto")
+    return "ok"
+
+
+def _limpiar_dia(dir_raw: Path, dir_clean: Path, dir_indice: Path, ds_nodash: str, wait_turn) -> str:
+    clean_daily_transactions(
+        datetime.strptime(ds_nodash, "%Y%m%d").date(),
+        dir_raw,
+        dir_clean,
+        id_index=OrderedIdIndex(dir_indice, wait_turn),
+    )
+    return "cleaned"
+
+
+class TestRunDays:
+    """Tests para run_days y OrderedIdIndex."""
+
+    def test_la_parte_ordenada_respeta_el_orden_de_los_dias(self, directorio_temporal):
+        """Verifica que lo que corre después de wait_turn se ejecuta en orden de día."""
+        registro = directorio_temporal / "registro.txt"
+
+        resultados = run_days(
+            list(reversed(DIAS)), functools.partial(_registrar_en_turno, registro), workers=4
+        )
+
+        assert resultados == {ds: "ok" for ds in DIAS}
+        assert registro.read_text(encoding="utf-8").split() == DIAS
+
+    def test_un_dia_fallido_no_bloquea_a_los_siguientes(self):
+        """Verifica que la excepción de un día se devuelve y los días posteriores terminan."""
+        resultados = run_days(DIAS, _fallar_un_dia, workers=2)
+
+        assert isinstance(resultados["20251202"], ValueError)
+        assert [resultados[ds] for ds in DIAS if ds != "20251202"] == ["ok", "ok", "ok"]
+
+    def test_reenvios_entre_dias_igual_que_en_serie(self, directorio_temporal):
+        """Verifica que en paralelo se descartan los mismos reenvíos que día por día."""
+        dir_raw = directorio_temporal / "raw"
+        dir_raw.mkdir()
+        encabezado = "transaction_id,customer_id,amount,status,transaction_ts\n"
+        ids_por_dia = {
+            "20251201": [1, 2],
+            "20251202": [2, 3],
+            "20251203": [1, 3, 4],
+            "20251204": [5],
+        }
+        for ds, ids in ids_por_dia.items():
+            fecha = f"{ds[:4]}-{ds[4:6]}-{ds[6:]}"
+            (dir_raw / f"transactions_{ds}.csv").write_text(
+                encabezado
+                + "".join(f"{i},100{i},10.00,completed,{fecha} 08:00:00\n" for i in ids)
+            )
+        dir_clean = directorio_temporal / "clean"
+
+        resultados = run_days(
+            DIAS,
+            functools.partial(_limpiar_dia, dir_raw, dir_clean, directorio_temporal / "indice"),
+            workers=4,
+        )
+
+        assert set(resultados.values()) == {"cleaned"}
+        escritos = {
+            ds: pq.read_table(dir_clean / f"transactions_{ds}_clean.parquet")
+            .column("transaction_id")
+            .to_pylist()
+            for ds in DIAS
+        }
+        assert escritos == {
+            "20251201": [1, 2],
+            "20251202": [3],
+            "20251203": [4],
+            "20251204": [5],
+        }
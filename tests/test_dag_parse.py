@@ -0,0 +1,34 @@
+"""Tests del costo de parseo de los DAGs por el DAG processor de Airflow."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("airflow")
+
+# pylint: disable=wrong-import-position
+from benchmarks.bench_dag_parse import PARSE_BUDGET_RATIO, run_benchmark
+
+
+@pytest.fixture(scope="module")
+def parseo():
+    """Parsea dags/ tres veces, cada una en un intérprete nuevo."""
+    return run_benchmark(repeat=3)
+
+
+class TestDagParse:
+    """Tests para el parseo de dags/medallion_medallion_dag.py."""
+
+    def test_parsea_solo_con_airflow_y_stdlib(self, parseo):
+        """Verifica que el parseo no importa pandas, pyarrow, DuckDB, dbt ni src/."""
+        assert parseo["import_errors"] == {}
+        assert parseo["dag_ids"] == ["medallion_backfill", "medallion_pipeline"]
+        assert parseo["heavy_modules"] == []
+
+    def test_parseo_dentro_del_presupuesto(self, parseo):
+        """Verifica que la mediana del parseo no supera PARSE_BUDGET_RATIO del import de Airflow.
+
+        La referencia es el import de Airflow en el mismo intérprete, así el límite
+        escala con la máquina en lugar de ser un tiempo fijo.
+        """
+        assert parseo["median_ratio"] <= PARSE_BUDGET_RATIO
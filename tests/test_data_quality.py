@@ -0,0 +1,99 @@
+"""Tests unitarios para el motor de data quality de un solo scan."""
+
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from src.data_quality import ModelChecks, load_model_checks, run_model_checks
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+STG_CHECKS = ModelChecks(
+    model="stg",
+    checks={"amount_non_negative": "amount >= 0", "status_accepted": "status in ('ok')"},
+    unique=("transaction_id",),
+    loaded_days_only=True,
+    key=("transaction_id",),
+)
+
+
+@pytest.fixture
+def warehouse():
+    """Crea un warehouse DuckDB con una tabla stg de dos días con reglas rotas."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "warehouse.duckdb"
+        with duckdb.connect(str(path)) as con:
+            con.execute(
+                """
+                CREATE TABLE stg AS SELECT * FROM (VALUES
+                    (1, 10.0, 'ok', '20251201'),
+                    (2, -1.0, 'ok', '20251201'),
+                    (2, 5.0, NULL, '20251201'),
+                    (3, -7.0, 'ok', '20251201'),
+                    (4, -2.0, 'ok', '20251202')
+                ) AS t(transaction_id, amount, status, ds_nodash)
+                """
+            )
+        yield path
+
+
+class TestModelChecks:
+    """Tests para load_model_checks y run_model_checks."""
+
+    def test_lee_las_reglas_declaradas_en_dbt(self):
+        """Verifica que se leen los column_checks de los schema.yml del proyecto dbt."""
+        specs = {spec.model: spec for spec in load_model_checks(PROJECT_ROOT / "dbt")}
+
+        assert set(specs) == {
+            "stg_transactions",
+            "int_customer_transactions_daily",
+            "int_customer_daily_partials",
+            "fct_customer_transactions",
+            "fct_customer_daily",
+        }
+        assert specs["stg_transactions"].loaded_days_only
+        assert specs["stg_transactions"].key == ("transaction_id",)
+        assert "transaction_id_unique" in specs["stg_transactions"].rules()
+        assert specs["int_customer_transactions_daily"].key == ("ds_nodash", "customer_id")
+
+    def test_cuenta_fallas_y_claves_de_ejemplo_por_regla(self, warehouse):
+        """Verifica fallas y claves de ejemplo de cada regla, solo sobre los días cargados."""
+        reporte = run_model_checks(warehouse, [STG_CHECKS], "20251201")
+
+        resultados = {resultado.check: resultado for resultado in reporte.results}
+        assert reporte.scans == 1
+        assert reporte.returncode == 1
+        assert {nombre: r.failures for nombre, r in resultados.items()} == {
+            "amount_non_negative": 2,
+            "status_accepted": 1,
+            "transaction_id_unique": 1,
+        }
+        assert resultados["amount_non_negative"].sample_keys == [
+            {"transaction_id": 2},
+            {"transaction_id": 3},
+        ]
+        assert resultados["transaction_id_unique"].sample_keys == [{"transaction_id": 2}]
+        assert {r.rows_checked for r in reporte.results} == {4}
+
+    def test_severidad_warn_no_falla(self, warehouse):
+        """Verifica que una regla con severity warn reporta sin cambiar el código de salida."""
+        spec = ModelChecks(model="stg", checks={"positivo": "amount > 0"}, severity="warn")
+
+        reporte = run_model_checks(warehouse, [spec], "20251201")
+
+        assert [r.status for r in reporte.results] == ["warn"]
+        assert reporte.returncode == 0
+
+    def test_modelo_inexistente_es_un_error(self, warehouse):
+        """Verifica que si la consulta falla cada regla queda en error y el código es 1."""
+        spec = ModelChecks(model="no_existe", checks={"id_no_nulo": "id is not null"})
+
+        reporte = run_model_checks(warehouse, [spec], "20251201")
+
+        assert reporte.results[0].status == "error"
+        assert "no_existe" in reporte.results[0].message
+        assert reporte.returncode == 1
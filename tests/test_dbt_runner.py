@@ -0,0 +1,372 @@
+"""Tests para la ejecución de dbt en proceso (dbtRunner) y por subprocess."""
+
+from __future__ import annotations
+
+import json
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src import dbt_runner
+from src.dbt_runner import DbtInvocation, run_dbt
+from src.transformations import clean_daily_transactions
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+PROFILE = """
+medallion_duckdb:
+  target: dev
+  outputs:
+    dev:
+      type: duckdb
+      path: "{{ env_var('DUCKDB_PATH') }}"
+      threads: 1
+"""
+
+
+@pytest.fixture(autouse=True)
+def cache_vacio():
+    """Cada test arranca sin manifests parseados en memoria."""
+    dbt_runner._MANIFEST_CACHE.clear()
+    yield
+    dbt_runner._MANIFEST_CACHE.clear()
+
+
+@pytest.fixture
+def proyecto_dbt():
+    """Copia el proyecto dbt a un directorio temporal con datos limpios de un día."""
+    pytest.importorskip("dbt.cli.main")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        shutil.copytree(
+            PROJECT_ROOT / "dbt", tmp / "dbt", ignore=shutil.ignore_patterns("target", "logs")
+        )
+        (tmp / "profiles").mkdir()
+        (tmp / "profiles" / "profiles.yml").write_text(PROFILE)
+        clean_daily_transactions(date(2025, 12, 1), PROJECT_ROOT / "data" / "raw", tmp / "clean")
+        env = {
+            "DBT_PROFILES_DIR": str(tmp / "profiles"),
+            "CLEAN_DIR": str(tmp / "clean"),
+            "DS_NODASH": "20251201",
+            "DUCKDB_PATH": str(tmp / "medallion.duckdb"),
+        }
+        yield tmp, env
+
+
+class TestRunDbt:
+    """Tests para run_dbt en sus modos inprocess y subprocess."""
+
+    def test_modo_desconocido_lanza_error(self, tmp_path):
+        """Verifica que un modo de ejecución no soportado lanza ValueError."""
+        with pytest.raises(ValueError, match="Unknown dbt execution mode"):
+            run_dbt("run", tmp_path, {}, mode="docker")
+
+    def test_inprocess_reutiliza_el_manifest(self, proyecto_dbt):
+        """Verifica que run y test en el mismo proceso comparten el manifest parseado."""
+        tmp, env = proyecto_dbt
+
+        corrida = run_dbt("run", tmp / "dbt", env)
+        tests = run_dbt("test", tmp / "dbt", env)
+
+        assert corrida.success and tests.success
+        assert corrida.mode == "inprocess"
+        assert not corrida.manifest_reused
+        assert tests.manifest_reused
+        assert {nodo["unique_id"] for nodo in corrida.nodes} >= {
+            "model.medallion_dbt.stg_transactions",
+            "model.medallion_dbt.fct_customer_transactions",
+        }
+        assert all(nodo["status"] == "pass" for nodo in tests.nodes)
+
+    def test_inprocess_reporta_fallas_de_tests(self, proyecto_dbt):
+        """Verifica que un test de datos fallido da returncode 1 con el detalle por nodo."""
+        tmp, env = proyecto_dbt
+        run_dbt("run", tmp / "dbt", env)
+        (tmp / "dbt" / "tests" / "singular" / "assert_siempre_falla.sql").write_text("select 1 as fila")
+
+        tests = run_dbt("test", tmp / "dbt", env)
+
+        assert tests.returncode == 1
+        fallidos = [nodo for nodo in tests.nodes if nodo["status"] == "fail"]
+        assert [nodo["unique_id"] for nodo in fallidos] == ["test.medallion_dbt.assert_siempre_falla"]
+        assert fallidos[0]["failures"] == 1
+
+    def test_argumentos_extra_seleccionan_nodos(self, proyecto_dbt):
+        """Verifica que los argumentos extra llegan a dbt, p. ej. para excluir tests."""
+        tmp, env = proyecto_dbt
+        run_dbt("run", tmp / "dbt", env)
+
+        tests = run_dbt("test", tmp / "dbt", env, args=("--exclude", "test_name:column_checks"))
+
+        assert tests.success
+        assert tests.nodes
+        assert not [nodo for nodo in tests.nodes if "column_checks" in nodo["unique_id"]]
+
+    def test_rango_de_dias_en_una_corrida(self, proyecto_dbt):
+        """Verifica que END_DS_NODASH carga y testea varios días en una sola invocación."""
+        tmp, env = proyecto_dbt
+        clean_daily_transactions(date(2025, 12, 3), PROJECT_ROOT / "data" / "raw", tmp / "clean")
+        env = {**env, "END_DS_NODASH": "20251203"}
+
+        corrida = run_dbt("run", tmp / "dbt", env)
+        tests = run_dbt("test", tmp / "dbt", env)
+
+        assert corrida.success and tests.success
+        with duckdb.connect(env["DUCKDB_PATH"]) as con:
+            dias = con.execute(
+                "SELECT DISTINCT ds_nodash FROM int_customer_transactions_daily ORDER BY 1"
+            ).fetchall()
+        assert dias == [("20251201",), ("20251203",)]
+
+    def test_staging_incremental_acumula_los_dias(self, proyecto_dbt):
+        """Verifica que con staging incremental cada día se agrega a una tabla de DuckDB."""
+        tmp, env = proyecto_dbt
+        clean_daily_transactions(date(2025, 12, 3), PROJECT_ROOT / "data" / "raw", tmp / "clean")
+        env = {**env, "STAGING_MATERIALIZATION": "incremental"}
+
+        for ds_nodash in ("20251201", "20251203", "20251201"):
+            corrida = run_dbt("run", tmp / "dbt", {**env, "DS_NODASH": ds_nodash})
+            tests = run_dbt("test", tmp / "dbt", {**env, "DS_NODASH": ds_nodash})
+            assert corrida.success and tests.success
+
+        with duckdb.connect(env["DUCKDB_PATH"]) as con:
+            tipo = con.execute(
+                "SELECT table_type FROM information_schema.tables "
+                "WHERE table_name = 'stg_transactions'"
+            ).fetchone()
+            dias = con.execute(
+                "SELECT ds_nodash, count(*) FROM stg_transactions GROUP BY 1 ORDER BY 1"
+            ).fetchall()
+        assert tipo == ("BASE TABLE",)
+        assert [dia for dia, _ in dias] == ["20251201", "20251203"]
+
+    def test_particionado_carga_filas_tardias_con_su_archivo(self, proyecto_dbt):
+        """Verifica que una fila de una fecha anterior se carga con el día de su archivo."""
+        tmp, env = proyecto_dbt
+        (tmp / "raw").mkdir()
+        (tmp / "raw" / "transactions_20251202.csv").write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "9001,1001,50.00,completed,2025-12-01 23:59:00\n"
+            "9002,1002,70.00,completed,2025-12-02 08:00:00\n"
+        )
+        clean_daily_transactions(
+            date(2025, 12, 2), tmp / "raw", tmp / "clean", layout="partitioned"
+        )
+        env = {**env, "CLEAN_LAYOUT": "partitioned", "DS_NODASH": "20251202"}
+
+        assert run_dbt("run", tmp / "dbt", env).success
+
+        with duckdb.connect(env["DUCKDB_PATH"]) as con:
+            filas = con.execute(
+                "SELECT ds_nodash, customer_id, transaction_date::VARCHAR "
+                "FROM int_customer_daily_partials ORDER BY customer_id"
+            ).fetchall()
+        assert filas == [("20251202", 1001, "2025-12-01"), ("20251202", 1002, "2025-12-02")]
+
+    def test_ids_compactos_se_ensanchan_a_bigint(self, proyecto_dbt):
+        """Verifica que un día con IDs int64 pasa a bigint las tablas incrementales int32."""
+        tmp, env = proyecto_dbt
+        clean_daily_transactions(
+            date(2025, 12, 1), PROJECT_ROOT / "data" / "raw", tmp / "clean", compact_types=True
+        )
+        (tmp / "raw").mkdir()
+        (tmp / "raw" / "transactions_20251202.csv").write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "3000000000,1001,50.00,completed,2025-12-02 08:00:00\n"
+        )
+        clean_daily_transactions(date(2025, 12, 2), tmp / "raw", tmp / "clean", compact_types=True)
+        env = {
+            **env,
+            "COMPACT_TYPES": "1",
+            "STAGING_MATERIALIZATION": "incremental",
+            "CUSTOMER_ID_TYPE": "integer",
+        }
+
+        angosto = {**env, "TRANSACTION_ID_TYPE": "integer"}
+        assert run_dbt("run", tmp / "dbt", angosto).success
+        ancho = {**env, "DS_NODASH": "20251202", "TRANSACTION_ID_TYPE": "bigint"}
+        assert run_dbt("run", tmp / "dbt", ancho).success
+        # Un backfill lee los dos parquets, con anchos distintos, en un mismo read_parquet
+        rango = {**angosto, "END_DS_NODASH": "20251202", "TRANSACTION_ID_TYPE": "bigint"}
+        assert run_dbt("run", tmp / "dbt", rango).success
+
+        with duckdb.connect(env["DUCKDB_PATH"]) as con:
+            tipos = con.execute(
+                "SELECT table_name, column_name, data_type FROM information_schema.columns "
+                "WHERE column_name IN ('transaction_id', 'customer_id') "
+                "AND table_name IN ('stg_transactions', 'int_customer_transactions_daily') "
+                "ORDER BY ALL"
+            ).fetchall()
+            maximo = con.execute("SELECT max(transaction_id) FROM stg_transactions").fetchone()
+        assert tipos == [
+            ("int_customer_transactions_daily", "customer_id", "INTEGER"),
+            ("stg_transactions", "customer_id", "INTEGER"),
+            ("stg_transactions", "transaction_id", "BIGINT"),
+        ]
+        assert maximo == (3000000000,)
+
+    def test_mart_diario_reescribe_solo_las_fechas_afectadas(self, proyecto_dbt):
+        """Verifica que recargar un día recalcula sus ventanas y no las de fechas anteriores."""
+        tmp, env = proyecto_dbt
+        clean_daily_transactions(date(2025, 12, 3), PROJECT_ROOT / "data" / "raw", tmp / "clean")
+        for ds_nodash in ("20251201", "20251203"):
+            assert run_dbt("run", tmp / "dbt", {**env, "DS_NODASH": ds_nodash}).success
+        consulta = (
+            "SELECT transaction_date::VARCHAR, transaction_count_7d FROM fct_customer_daily "
+            "WHERE customer_id = 1001 ORDER BY 1"
+        )
+        with duckdb.connect(env["DUCKDB_PATH"]) as con:
+            assert con.execute(consulta).fetchall() == [("2025-12-01", 1), ("2025-12-03", 2)]
+            # Marca ambas filas para ver cuáles reescribe la próxima carga
+            con.execute("UPDATE fct_customer_daily SET transaction_count_7d = 99")
+
+        corrida = run_dbt("run", tmp / "dbt", {**env, "DS_NODASH": "20251203"})
+
+        assert corrida.success
+        with duckdb.connect(env["DUCKDB_PATH"]) as con:
+            assert con.execute(consulta).fetchall() == [("2025-12-01", 99), ("2025-12-03", 2)]
+
+    @pytest.mark.parametrize(
+        "test_singular, mart, columna",
+        [
+            (
+                "assert_mart_matches_daily_partials",
+                "fct_customer_transactions",
+                "transaction_count",
+            ),
+            (
+                "assert_customer_daily_matches_full_recompute",
+                "fct_customer_daily",
+                "transaction_count_7d",
+            ),
+        ],
+        ids=["mart_acumulado", "mart_diario"],
+    )
+    def test_tests_de_mart_revisan_solo_el_rango_cargado(
+        self, proyecto_dbt, test_singular, mart, columna
+    ):
+        """Verifica que el test del mart solo revisa lo que pudo cambiar la corrida."""
+        tmp, env = proyecto_dbt
+        clean_daily_transactions(date(2025, 12, 3), PROJECT_ROOT / "data" / "raw", tmp / "clean")
+        run_dbt("run", tmp / "dbt", env)
+        run_dbt("run", tmp / "dbt", {**env, "DS_NODASH": "20251203"})
+        # El cliente 1004 solo compra el 20251201
+        with duckdb.connect(env["DUCKDB_PATH"]) as con:
+            con.execute(f"UPDATE {mart} SET {columna} = 99 WHERE customer_id = 1004")
+
+        seleccion = ("--select", test_singular)
+        otro_dia = run_dbt("test", tmp / "dbt", {**env, "DS_NODASH": "20251203"}, args=seleccion)
+        su_dia = run_dbt("test", tmp / "dbt", env, args=seleccion)
+
+        assert otro_dia.success
+        assert [nodo["status"] for nodo in su_dia.nodes] == ["fail"]
+
+    def test_column_checks_cuenta_filas_por_regla(self, proyecto_dbt):
+        """Verifica que el chequeo de columnas en una consulta reporta las filas que fallan."""
+        tmp, env = proyecto_dbt
+        ruta = tmp / "clean" / "transactions_20251201_clean.parquet"
+        tabla = pq.read_table(ruta)
+        filas = tabla.to_pylist()
+        filas[1]["transaction_id"] = filas[0]["transaction_id"]
+        filas[2]["amount"] = -1.0
+        pq.write_table(pa.Table.from_pylist(filas, schema=tabla.schema), ruta)
+
+        run_dbt("run", tmp / "dbt", env)
+        tests = run_dbt("test", tmp / "dbt", env)
+
+        fallidos = {
+            nodo["unique_id"].split(".")[2]: nodo["failures"]
+            for nodo in tests.nodes
+            if nodo["status"] == "fail"
+        }
+        # Un id repetido y un monto negativo, en un único test del modelo
+        assert fallidos == {"stg_transactions_column_checks": 2}
+
+    def test_parseo_parcial_compartido_entre_procesos(self, proyecto_dbt):
+        """Verifica que otro proceso parsea otro día desde partial_parse.msgpack con ahorro."""
+        tmp, env = proyecto_dbt
+        clean_daily_transactions(date(2025, 12, 3), PROJECT_ROOT / "data" / "raw", tmp / "clean")
+        ruta_tiempos = tmp / "quality" / "dbt_parse_timings.json"
+
+        en_frio = run_dbt("run", tmp / "dbt", env, timings_path=ruta_tiempos)
+        # Un proceso nuevo arranca sin manifests en memoria
+        dbt_runner._MANIFEST_CACHE.clear()
+        otro_dia = run_dbt(
+            "run", tmp / "dbt", {**env, "DS_NODASH": "20251203"}, timings_path=ruta_tiempos
+        )
+
+        assert en_frio.success and otro_dia.success
+        assert en_frio.cold_parse and not otro_dia.cold_parse
+        assert json.loads(ruta_tiempos.read_text(encoding="utf-8")) == {
+            dbt_runner.COLD_PARSE_KEY: en_frio.parse_seconds
+        }
+        assert en_frio.saved_seconds == 0
+        assert otro_dia.saved_seconds == pytest.approx(
+            en_frio.parse_seconds - otro_dia.parse_seconds
+        )
+        # El día nuevo no invalida el parseo: ningún archivo se vuelve a parsear
+        perf_info = json.loads((tmp / "dbt" / "target" / "perf_info.json").read_text())
+        assert perf_info["parsed_path_count"] == 0
+        with duckdb.connect(env["DUCKDB_PATH"]) as con:
+            dias = con.execute("SELECT DISTINCT ds_nodash FROM stg_transactions").fetchall()
+        assert dias == [("20251203",)]
+
+    def test_subprocess_lee_los_nodos_de_run_results(self, tmp_path):
+        """Verifica que el run_results.json de la invocación se aplana como en modo inprocess."""
+        target = tmp_path / "target"
+        target.mkdir()
+        (target / "run_results.json").write_text(
+            json.dumps(
+                {
+                    "results": [
+                        {
+                            "unique_id": "model.medallion_dbt.stg_transactions",
+                            "status": "success",
+                            "execution_time": 0.5,
+                            "message": "OK",
+                            "failures": None,
+                            "adapter_response": {"rows_affected": 7},
+                        }
+                    ]
+                }
+            )
+        )
+
+        nodos = dbt_runner._run_results_nodes(tmp_path, since=0)
+
+        assert nodos == [
+            {
+                "unique_id": "model.medallion_dbt.stg_transactions",
+                "status": "success",
+                "execution_time": 0.5,
+                "message": "OK",
+                "failures": None,
+                "rows_affected": 7,
+            }
+        ]
+        # Un run_results anterior a la invocación es de otra corrida
+        assert dbt_runner._run_results_nodes(tmp_path, since=time.time() + 60) == []
+
+    def test_fallback_a_subprocess_si_dbt_no_se_puede_importar(self, monkeypatch, tmp_path):
+        """Verifica que sin dbt importable se usa el CLI como respaldo."""
+        monkeypatch.setitem(sys.modules, "dbt.cli.main", None)
+        llamadas = []
+
+        def subprocess_falso(command, project_dir, env, args=()):
+            llamadas.append(command)
+            return DbtInvocation(command=command, mode="subprocess", returncode=0, elapsed_seconds=1.0)
+
+        monkeypatch.setattr(dbt_runner, "_run_subprocess", subprocess_falso)
+
+        resultado = run_dbt("run", tmp_path, {})
+
+        assert llamadas == ["run"]
+        assert resultado.mode == "subprocess"
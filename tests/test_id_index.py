@@ -0,0 +1,125 @@
+"""Tests unitarios para el índice persistente de transaction_id."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.id_index import TransactionIdIndex
+
+
+@pytest.fixture
+def directorio_temporal():
+    """Crea un directorio temporal para el índice."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+class TestTransactionIdIndex:
+    """Tests unitarios para TransactionIdIndex."""
+
+    def test_indice_vacio_no_marca_duplicados(self, directorio_temporal):
+        """Verifica que sin días registrados ningún ID es duplicado."""
+        indice = TransactionIdIndex(directorio_temporal)
+
+        resultado = indice.prior_duplicates("20251201", np.array([1, 2, 3]))
+
+        assert not resultado.any()
+
+    def test_detecta_ids_de_dias_anteriores(self, directorio_temporal):
+        """Verifica que se marcan los IDs registrados en días anteriores."""
+        indice = TransactionIdIndex(directorio_temporal)
+        indice.add("20251201", np.array([10, 3, 7]))
+        indice.add("20251202", np.array([20, 21]))
+
+        resultado = indice.prior_duplicates("20251203", np.array([7, 8, 21, 3, 99]))
+
+        assert list(resultado) == [True, False, True, True, False]
+
+    def test_ignora_el_mismo_dia_y_posteriores(self, directorio_temporal):
+        """Verifica que re-procesar un día no lo compara contra sí mismo ni días futuros."""
+        indice = TransactionIdIndex(directorio_temporal)
+        indice.add("20251201", np.array([1, 2]))
+        indice.add("20251202", np.array([3, 4]))
+        indice.add("20251203", np.array([5, 6]))
+
+        resultado = indice.prior_duplicates("20251202", np.array([1, 3, 5]))
+
+        assert list(resultado) == [True, False, False]
+
+    def test_persistencia_y_reemplazo_de_dia(self, directorio_temporal):
+        """Verifica que el índice se recarga de disco y un día re-procesado reemplaza su bloque."""
+        indice = TransactionIdIndex(directorio_temporal)
+        indice.add("20251201", np.array([1, 2, 3]))
+        indice.add("20251201", np.array([4, 5]))
+
+        recargado = TransactionIdIndex(directorio_temporal)
+        resultado = recargado.prior_duplicates("20251202", np.array([1, 4, 5]))
+
+        assert recargado.days == {"20251201": 2}
+        assert list(resultado) == [False, True, True]
+
+    def test_sin_falsos_negativos_al_crecer(self, directorio_temporal):
+        """Verifica que el filtro de Bloom se redimensiona sin perder IDs."""
+        indice = TransactionIdIndex(directorio_temporal)
+        for dia in range(3):
+            indice.add(f"2025120{dia + 1}", np.arange(dia * 60_000, (dia + 1) * 60_000))
+
+        resultado = indice.prior_duplicates("20251209", np.arange(0, 200_000, 7))
+
+        assert list(np.flatnonzero(~resultado) * 7) == list(range(180_005, 200_000, 7))
+
+    def test_id_de_varios_dias_cuenta_desde_el_primero(self, directorio_temporal):
+        """Verifica que un ID de varios días es duplicado solo después del primero que sigue."""
+        indice = TransactionIdIndex(directorio_temporal)
+        indice.add("20251203", np.array([5, 9]))
+        indice.add("20251201", np.array([5, 7]))
+
+        assert list(indice.prior_duplicates("20251201", np.array([5, 9]))) == [False, False]
+        assert list(indice.prior_duplicates("20251202", np.array([5, 9]))) == [True, False]
+        assert list(indice.prior_duplicates("20251204", np.array([5, 9]))) == [True, True]
+
+        indice.add("20251201", np.array([7]))
+        assert list(indice.prior_duplicates("20251202", np.array([5, 7]))) == [False, True]
+
+    def test_busqueda_no_recorre_los_dias(self, directorio_temporal, monkeypatch):
+        """Verifica que la búsqueda lee el archivo consolidado, no un bloque por día."""
+        indice = TransactionIdIndex(directorio_temporal)
+        for dia in range(1, 31):
+            indice.add(f"202512{dia:02d}", np.arange(dia * 100, dia * 100 + 50))
+        lecturas = []
+        cargar = np.load
+
+        def contar(ruta, *args, **kwargs):
+            lecturas.append(Path(ruta).name)
+            return cargar(ruta, *args, **kwargs)
+
+        monkeypatch.setattr(np, "load", contar)
+        resultado = indice.prior_duplicates("20251231", np.arange(0, 4000, 25))
+
+        assert len(lecturas) == 2
+        assert list(np.flatnonzero(resultado) * 25) == [
+            n for n in range(0, 4000, 25) if 100 <= n < 3100 and n % 100 < 50
+        ]
+
+    def test_migra_el_indice_por_dia(self, directorio_temporal):
+        """Verifica que un índice de la versión 1 (un bloque por día) se consolida al abrirlo."""
+        np.save(directorio_temporal / "ids_20251201.npy", np.array([1, 2], np.int64))
+        np.save(directorio_temporal / "ids_20251202.npy", np.array([2, 3], np.int64))
+        (directorio_temporal / "index.json").write_text(
+            json.dumps({"version": 1, "num_bits": 0, "days": {"20251201": 2, "20251202": 2}})
+        )
+
+        indice = TransactionIdIndex(directorio_temporal)
+
+        assert indice.days == {"20251201": 2, "20251202": 2}
+        assert list(indice.prior_duplicates("20251202", np.array([1, 2, 3]))) == [
+            True,
+            True,
+            False,
+        ]
+        assert not (directorio_temporal / "ids_20251201.npy").exists()
@@ -0,0 +1,174 @@
+"""Tests unitarios para el manifest de cache de las capas Bronze y Silver."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.manifest import (
+    code_version,
+    fingerprint_file,
+    fingerprint_files,
+    fingerprint_shards,
+    is_unchanged,
+    load_manifest,
+    record_entry,
+    save_manifest,
+)
+
+
+@pytest.fixture
+def directorio_temporal():
+    """Crea un directorio temporal para archivos de prueba."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+class TestFingerprintFile:
+    """Tests unitarios para fingerprint_file."""
+
+    def test_registra_tamanio_mtime_y_hash(self, directorio_temporal):
+        """Verifica que el fingerprint contiene tamaño, mtime y sha256."""
+        ruta = directorio_temporal / "raw.csv"
+        ruta.write_text("a,b\n1,2\n")
+
+        resultado = fingerprint_file(ruta)
+
+        assert resultado["size"] == 8
+        assert resultado["mtime_ns"] == ruta.stat().st_mtime_ns
+        assert len(resultado["sha256"]) == 64
+
+    def test_reutiliza_hash_si_no_cambio_el_archivo(self, directorio_temporal):
+        """Verifica que no se recalcula el hash si tamaño y mtime coinciden."""
+        ruta = directorio_temporal / "raw.csv"
+        ruta.write_text("a,b\n1,2\n")
+        previo = dict(fingerprint_file(ruta), sha256="hash_registrado")
+
+        resultado = fingerprint_file(ruta, previo)
+
+        assert resultado["sha256"] == "hash_registrado"
+
+    def test_touch_sin_cambios_mantiene_el_hash(self, directorio_temporal):
+        """Verifica que cambiar sólo el mtime no cambia el hash del contenido."""
+        ruta = directorio_temporal / "raw.csv"
+        ruta.write_text("a,b\n1,2\n")
+        previo = fingerprint_file(ruta)
+
+        os.utime(ruta, ns=(previo["mtime_ns"] + 10**9, previo["mtime_ns"] + 10**9))
+        resultado = fingerprint_file(ruta, previo)
+
+        assert resultado["mtime_ns"] != previo["mtime_ns"]
+        assert resultado["sha256"] == previo["sha256"]
+
+
+class TestFingerprintShards:
+    """Tests unitarios para fingerprint_shards."""
+
+    def test_hash_cambia_con_los_shards(self, directorio_temporal):
+        """Verifica que agregar un shard cambia el hash y los shards sin cambios no se releen."""
+        shards = []
+        for numero in (1, 2):
+            shards.append(directorio_temporal / f"transactions_20251201_{numero}.csv")
+            shards[-1].write_text(f"a,b\n{numero},2\n")
+        previo = fingerprint_shards(shards[:1])
+        previo["files"][shards[0].name]["sha256"] = "hash_registrado"
+
+        resultado = fingerprint_shards(shards, previo)
+
+        assert resultado["files"][shards[0].name]["sha256"] == "hash_registrado"
+        assert resultado["sha256"] != previo["sha256"]
+        assert resultado["size"] == 16
+
+
+class TestFingerprintFiles:
+    """Tests unitarios para fingerprint_files."""
+
+    def test_sin_archivos_retorna_none(self, directorio_temporal):
+        """Verifica que un conjunto vacío de archivos no tiene fingerprint."""
+        assert fingerprint_files([], directorio_temporal) is None
+
+    def test_cambia_si_cambia_el_contenido_o_el_nombre(self, directorio_temporal):
+        """Verifica que el digest depende del contenido y de los nombres relativos."""
+        ruta = directorio_temporal / "part-0.parquet"
+        ruta.write_bytes(b"uno")
+        original = fingerprint_files([ruta], directorio_temporal)
+
+        ruta.write_bytes(b"dos")
+        otro_contenido = fingerprint_files([ruta], directorio_temporal)
+
+        renombrada = ruta.rename(directorio_temporal / "part-1.parquet")
+        otro_nombre = fingerprint_files([renombrada], directorio_temporal)
+
+        assert len({original, otro_contenido, otro_nombre}) == 3
+
+
+class TestManifest:
+    """Tests unitarios para la lectura, escritura y comparación del manifest."""
+
+    def test_manifest_inexistente_esta_vacio(self, directorio_temporal):
+        """Verifica que un manifest que no existe se lee como vacío."""
+        assert load_manifest(directorio_temporal / "manifest.json") == {}
+
+    def test_ida_y_vuelta(self, directorio_temporal):
+        """Verifica que lo registrado se puede volver a leer."""
+        ruta = directorio_temporal / "data" / "manifest.json"
+        manifest: dict = {}
+        record_entry(manifest, "bronze", "20251201", {"raw_sha256": "abc"}, "out", raw={"size": 1})
+
+        save_manifest(ruta, manifest)
+
+        assert load_manifest(ruta) == {
+            "bronze": {
+                "20251201": {
+                    "inputs": {"raw_sha256": "abc"},
+                    "output": "out",
+                    "raw": {"size": 1},
+                }
+            }
+        }
+        assert not ruta.with_suffix(".json.tmp").exists()
+
+    @pytest.mark.parametrize(
+        "entradas,salida,esperado",
+        [
+            ({"raw_sha256": "abc", "engine": "pandas"}, "out", True),
+            ({"raw_sha256": "otro", "engine": "pandas"}, "out", False),
+            ({"raw_sha256": "abc", "engine": "duckdb"}, "out", False),
+            ({"raw_sha256": "abc", "engine": "pandas"}, "otra_salida", False),
+            ({"raw_sha256": "abc", "engine": "pandas"}, None, False),
+        ],
+        ids=[
+            "sin_cambios",
+            "raw_modificado",
+            "config_modificada",
+            "salida_modificada",
+            "salida_borrada",
+        ],
+    )
+    def test_is_unchanged(self, entradas, salida, esperado):
+        """Verifica cuándo un paso puede saltearse según entradas y salida."""
+        manifest: dict = {}
+        record_entry(manifest, "bronze", "20251201", {"raw_sha256": "abc", "engine": "pandas"}, "out")
+
+        assert is_unchanged(manifest, "bronze", "20251201", entradas, salida) is esperado
+
+    def test_dia_sin_registro_no_se_saltea(self):
+        """Verifica que un día nunca procesado no se considera sin cambios."""
+        assert not is_unchanged({}, "bronze", "20251201", {}, "out")
+
+
+class TestCodeVersion:
+    """Tests unitarios para code_version."""
+
+    def test_cambia_si_cambia_el_codigo(self, directorio_temporal):
+        """Verifica que modificar la lógica de limpieza invalida el cache."""
+        modulo = directorio_temporal / "transformations.py"
+        modulo.write_text("def limpiar(): return 1\n")
+        original = code_version(modulo)
+
+        modulo.write_text("def limpiar(): return 2\n")
+
+        assert code_version(modulo) != original
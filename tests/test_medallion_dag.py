@@ -0,0 +1,307 @@
+"""Tests de las tasks del DAG medallion, con los directorios del DAG en un temporal."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import duckdb
+import pytest
+
+pytest.importorskip("airflow")
+
+# pylint: disable=wrong-import-position
+from airflow.exceptions import AirflowException, AirflowSkipException
+
+from src import timing_history
+from src.dbt_runner import DbtInvocation
+
+DAG_PATH = Path(__file__).resolve().parents[1] / "dags/medallion_medallion_dag.py"
+BACKFILL_PARAMS = {"start_ds_nodash": "20251201", "end_ds_nodash": "20251201"}
+
+
+@pytest.fixture
+def dag(monkeypatch):
+    """Carga el módulo del DAG con data/ y los módulos de Bronze en un directorio temporal."""
+    spec = importlib.util.spec_from_file_location("medallion_medallion_dag", DAG_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir)
+        fuentes = []
+        for fuente in module.BRONZE_SOURCES:
+            copia = base / "src" / fuente.name
+            copia.parent.mkdir(exist_ok=True)
+            shutil.copy(fuente, copia)
+            fuentes.append(copia)
+        monkeypatch.setattr(module, "BRONZE_SOURCES", tuple(fuentes))
+        monkeypatch.setattr(module, "RAW_DIR", base / "data/raw")
+        monkeypatch.setattr(module, "CLEAN_DIR", base / "data/clean")
+        monkeypatch.setattr(module, "QUALITY_DIR", base / "data/quality")
+        monkeypatch.setattr(module, "MANIFEST_PATH", base / "data/manifest.json")
+        monkeypatch.setattr(module, "WAREHOUSE_PATH", base / "warehouse/medallion.duckdb")
+        monkeypatch.setattr(module, "ID_INDEX_DIR", base / "data/index/transaction_ids")
+        monkeypatch.setattr(module, "CHUNK_DIR", base / "data/chunks")
+        monkeypatch.setattr(module, "CLEAN_SOURCE", "parquet")
+        monkeypatch.delenv("PIPELINE_PROFILE", raising=False)
+        module.RAW_DIR.mkdir(parents=True)
+        (module.RAW_DIR / "transactions_20251201.csv").write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "1,1001,100.0,completed,2025-12-01 08:00:00\n"
+            "2,1002,200.0,pending,2025-12-01 09:00:00\n",
+            encoding="utf-8",
+        )
+        yield module
+
+
+class TestBronzeCleanTask:
+    """Tests para el salteo de Bronze según el manifest."""
+
+    @pytest.fixture
+    def limpiezas(self, dag, monkeypatch):
+        """Cuenta los días que Bronze limpia de nuevo."""
+        dias: list[str] = []
+        limpiar = dag._clean_bronze_day
+
+        def contar(ds_nodash, *args, **kwargs):
+            dias.append(ds_nodash)
+            return limpiar(ds_nodash, *args, **kwargs)
+
+        monkeypatch.setattr(dag, "_clean_bronze_day", contar)
+        return dias
+
+    @pytest.mark.parametrize(
+        "modulo",
+        [
+            "transformations.py",
+            "cleaning.py",
+            "pandas_engine.py",
+            "arrow_engine.py",
+            "duckdb_engine.py",
+            "writer_profiles.py",
+            "id_index.py",
+            "metrics.py",
+        ],
+        ids=[
+            "limpieza",
+            "reglas_compartidas",
+            "motor_pandas",
+            "motor_arrow",
+            "motor_duckdb",
+            "perfiles_parquet",
+            "indice_ids",
+            "metricas",
+        ],
+    )
+    def test_cambio_de_codigo_vuelve_a_limpiar(self, dag, limpiezas, modulo):
+        """Verifica que cambiar cualquier módulo de Bronze invalida el día en el manifest."""
+        dag._bronze_clean_task("20251201", engine="pandas")
+        dag._bronze_clean_task("20251201", engine="pandas")
+        assert limpiezas == ["20251201"]
+
+        fuente = next(ruta for ruta in dag.BRONZE_SOURCES if ruta.name == modulo)
+        with fuente.open("a", encoding="utf-8") as archivo:
+            archivo.write("\n# cambio\n")
+        dag._bronze_clean_task("20251201", engine="pandas")
+
+        assert limpiezas == ["20251201", "20251201"]
+
+
+class TestBronzeChunkTasks:
+    """Tests para Bronze por chunks: plan, tasks mapeadas por chunk y merge."""
+
+    @pytest.fixture
+    def dag_chunks(self, dag, monkeypatch):
+        """DAG con un chunk por línea del CSV del día (dos chunks)."""
+        monkeypatch.setattr(dag, "BRONZE_CHUNK_BYTES", 1)
+        return dag
+
+    @staticmethod
+    def _limpiar_chunks(dag, kwargs_chunks: list[dict]) -> list[str]:
+        """Corre la task mapeada para cada op_kwargs del plan, como el scheduler."""
+        return [dag._bronze_clean_chunk_task(**kwargs) for kwargs in kwargs_chunks]
+
+    def test_merge_igual_a_bronze_clean(self, dag_chunks):
+        """Verifica que plan, chunks y merge escriben el parquet de bronze_clean y el manifest."""
+        dag = dag_chunks
+        kwargs_chunks = dag._bronze_plan_chunks_task("20251201")
+        assert [kwargs["index"] for kwargs in kwargs_chunks] == [0, 1]
+
+        dag._bronze_merge_chunks_task(
+            "20251201", chunk_paths=self._limpiar_chunks(dag, kwargs_chunks)
+        )
+        ruta = dag.CLEAN_DIR / "transactions_20251201_clean.parquet"
+        por_chunks = ruta.read_bytes()
+        assert not (dag.CHUNK_DIR / "20251201").exists()
+        assert "20251201" in json.loads(dag.MANIFEST_PATH.read_text())["bronze"]
+
+        dag._bronze_clean_task("20251201", engine=dag.CHUNKED_ENGINE, params={"force": True})
+        assert ruta.read_bytes() == por_chunks
+
+    def test_sin_cambios_no_mapea_chunks(self, dag_chunks):
+        """Verifica que con el manifest sin cambios el plan es vacío y el merge no hace nada."""
+        dag = dag_chunks
+        kwargs_chunks = dag._bronze_plan_chunks_task("20251201")
+        dag._bronze_merge_chunks_task(
+            "20251201", chunk_paths=self._limpiar_chunks(dag, kwargs_chunks)
+        )
+        manifest = dag.MANIFEST_PATH.read_text()
+
+        assert dag._bronze_plan_chunks_task("20251201") == []
+        # Sin tasks mapeadas, el XCom de bronze_clean_chunk llega vacío
+        dag._bronze_merge_chunks_task("20251201", chunk_paths=[])
+        assert dag.MANIFEST_PATH.read_text() == manifest
+
+    def test_sin_csv_se_saltea(self, dag_chunks):
+        """Verifica que sin CSV del día se saltean el plan y el merge."""
+        dag = dag_chunks
+        (dag.RAW_DIR / "transactions_20251201.csv").unlink()
+
+        with pytest.raises(AirflowSkipException):
+            dag._bronze_plan_chunks_task("20251201")
+        with pytest.raises(AirflowSkipException):
+            dag._bronze_merge_chunks_task("20251201", chunk_paths=None)
+
+    def test_chunk_faltante_falla_el_merge(self, dag_chunks):
+        """Verifica que el merge falla sin escribir si le llegan menos chunks que los planeados."""
+        dag = dag_chunks
+        kwargs_chunks = dag._bronze_plan_chunks_task("20251201")
+        rutas = self._limpiar_chunks(dag, kwargs_chunks[:1])
+
+        with pytest.raises(AirflowException, match="1 of the 2 chunks"):
+            dag._bronze_merge_chunks_task("20251201", chunk_paths=rutas)
+        assert not (dag.CLEAN_DIR / "transactions_20251201_clean.parquet").exists()
+        assert not dag.MANIFEST_PATH.exists()
+
+    def test_merge_no_corre_si_falla_un_chunk(self, dag_chunks):
+        """Verifica que el merge espera a todos los chunks y no corre si alguno falló."""
+        construido = dag_chunks.build_dag()
+        merge = construido.get_task("bronze_merge_chunks")
+        chunk = construido.get_task("bronze_clean_chunk")
+
+        # none_failed: corre con cero chunks mapeados, no con uno fallido o upstream_failed
+        assert merge.trigger_rule == "none_failed"
+        assert merge.upstream_task_ids == {"bronze_clean_chunk"}
+        assert chunk.upstream_task_ids == {"bronze_plan_chunks"}
+        assert construido.get_task("silver_dbt_run").upstream_task_ids == {
+            "bronze_merge_chunks"
+        }
+
+
+class TestDbtTasks:
+    """Tests para las tasks de Silver y Gold, diarias y del backfill."""
+
+    @pytest.mark.parametrize(
+        "task, kwargs, mensaje",
+        [
+            ("_silver_dbt_run_task", {"ds_nodash": "20251201"}, "dbt run failed"),
+            ("_gold_dbt_tests_task", {"ds_nodash": "20251201"}, "dbt tests failed"),
+            ("_silver_backfill_task", {"params": BACKFILL_PARAMS}, "dbt run failed"),
+            ("_gold_backfill_task", {"params": BACKFILL_PARAMS}, "dbt tests failed"),
+        ],
+        ids=["silver", "gold", "silver_backfill", "gold_backfill"],
+    )
+    def test_falla_de_dbt_no_queda_tapada_por_los_tiempos(
+        self, dag, monkeypatch, task, kwargs, mensaje
+    ):
+        """Verifica que si guardar los tiempos por nodo falla, la task falla por dbt."""
+        dag._bronze_clean_task("20251201", engine="pandas")
+        fallida = DbtInvocation(
+            command="run", mode="inprocess", returncode=1, elapsed_seconds=0.1, stderr="boom"
+        )
+        monkeypatch.setattr(dag, "_run_dbt_command", lambda *args, **kwargs: fallida)
+        monkeypatch.setattr(dag, "_run_quality_checks", lambda *args, **kwargs: (fallida, None))
+
+        def warehouse_bloqueado(*args, **kwargs):
+            raise duckdb.IOException("Could not set lock on file")
+
+        monkeypatch.setattr(timing_history, "record_node_timings", warehouse_bloqueado)
+
+        with pytest.raises(AirflowException, match=mensaje):
+            getattr(dag, task)(**kwargs)
+
+
+
+class TestCompactIdTypes:
+    """Tests para el ancho de los IDs que el DAG le pasa a staging con COMPACT_TYPES=1."""
+
+    def test_dia_int64_ensancha_solo_su_columna(self, dag, monkeypatch):
+        """Verifica que un día con IDs fuera de int32 pasa a bigint esa columna en adelante."""
+        monkeypatch.setattr(dag, "COMPACT_TYPES", True)
+        dag._bronze_clean_task("20251201", engine="pandas")
+        env = dag._build_env("20251201")
+        assert (env["TRANSACTION_ID_TYPE"], env["CUSTOMER_ID_TYPE"]) == ("integer", "integer")
+
+        (dag.RAW_DIR / "transactions_20251202.csv").write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "3000000000,1001,50.0,completed,2025-12-02 08:00:00\n",
+            encoding="utf-8",
+        )
+        dag._bronze_clean_task("20251202", engine="pandas")
+
+        # La marca más alta del manifest: también un día anterior sigue en bigint
+        env = dag._build_env("20251201")
+        assert (env["TRANSACTION_ID_TYPE"], env["CUSTOMER_ID_TYPE"]) == ("bigint", "integer")
+
+    def test_sin_tipos_compactos_ids_bigint(self, dag):
+        """Verifica que sin COMPACT_TYPES staging castea los IDs a bigint."""
+        dag._bronze_clean_task("20251201", engine="pandas")
+        env = dag._build_env("20251201")
+        assert (env["TRANSACTION_ID_TYPE"], env["CUSTOMER_ID_TYPE"]) == ("bigint", "bigint")
+
+
+class TestSilverSkip:
+    """Tests para el salteo de Silver según el manifest y el warehouse."""
+
+    @pytest.fixture
+    def corridas(self, dag, monkeypatch):
+        """Reemplaza dbt por un run que carga la partición del día en el warehouse."""
+        dias: list[str] = []
+
+        def dbt_run(command, ds_nodash, *args, **kwargs):
+            dias.append(ds_nodash)
+            with duckdb.connect(str(dag.WAREHOUSE_PATH)) as con:
+                con.execute(
+                    "CREATE TABLE IF NOT EXISTS int_customer_transactions_daily "
+                    "(ds_nodash VARCHAR, customer_id BIGINT, transaction_count BIGINT, "
+                    "total_amount_all DOUBLE)"
+                )
+                con.execute(
+                    "DELETE FROM int_customer_transactions_daily WHERE ds_nodash = ?", [ds_nodash]
+                )
+                con.execute(
+                    "INSERT INTO int_customer_transactions_daily VALUES (?, 1001, 1, 100.0)",
+                    [ds_nodash],
+                )
+            return DbtInvocation(
+                command=command, mode="inprocess", returncode=0, elapsed_seconds=0.1
+            )
+
+        monkeypatch.setattr(dag, "_run_dbt_command", dbt_run)
+        dag.WAREHOUSE_PATH.parent.mkdir()
+        dag._bronze_clean_task("20251201", engine="pandas")
+        return dias
+
+    def test_saltea_si_el_warehouse_tiene_el_dia(self, dag, corridas):
+        """Verifica que sin cambios en el parquet ni en el warehouse no se invoca dbt."""
+        dag._silver_dbt_run_task("20251201")
+        dag._silver_dbt_run_task("20251201")
+
+        assert corridas == ["20251201"]
+
+    @pytest.mark.parametrize("borrar_warehouse", [True, False], ids=["warehouse", "particion"])
+    def test_recarga_si_el_warehouse_perdio_el_dia(self, dag, corridas, borrar_warehouse):
+        """Verifica que un warehouse recreado o sin la partición del día vuelve a cargarlo."""
+        dag._silver_dbt_run_task("20251201")
+        if borrar_warehouse:
+            dag.WAREHOUSE_PATH.unlink()
+        else:
+            with duckdb.connect(str(dag.WAREHOUSE_PATH)) as con:
+                con.execute("DELETE FROM int_customer_transactions_daily")
+
+        dag._silver_dbt_run_task("20251201")
+
+        assert corridas == ["20251201", "20251201"]
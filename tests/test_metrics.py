@@ -0,0 +1,81 @@
+"""Tests unitarios para las métricas por etapa del pipeline."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.metrics import METRICS_HISTORY_FILE, StageMetrics, record_stage_metrics
+
+
+@pytest.fixture
+def directorio_temporal():
+    """Crea un directorio temporal para archivos de prueba."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+class TestStageMetrics:
+    """Tests unitarios para StageMetrics."""
+
+    def test_timed_acumula_por_paso(self):
+        """Verifica que varios bloques del mismo paso suman su tiempo."""
+        metricas = StageMetrics(stage="bronze")
+
+        with metricas.timed("read"):
+            pass
+        primero = metricas.timings["read"]
+        with metricas.timed("read"):
+            pass
+
+        assert metricas.timings["read"] >= primero
+
+    def test_drop_acumula_por_motivo(self):
+        """Verifica que los descartes se suman por motivo."""
+        metricas = StageMetrics(stage="bronze")
+
+        metricas.drop("duplicate", 2)
+        metricas.drop("duplicate", 3)
+
+        assert metricas.dropped == {"duplicate": 5}
+
+    def test_rows_per_second(self):
+        """Verifica el throughput derivado y que es None sin wall time."""
+        assert StageMetrics(stage="bronze", rows_read=10).rows_per_second is None
+        metricas = StageMetrics(stage="bronze", rows_read=10, wall_seconds=2.0)
+        assert metricas.to_dict()["rows_per_second"] == 5.0
+
+
+class TestRecordStageMetrics:
+    """Tests unitarios para record_stage_metrics."""
+
+    def test_una_clave_por_etapa_y_historial(self, directorio_temporal):
+        """Verifica que cada etapa se guarda en su clave y se agrega al historial."""
+        record_stage_metrics(
+            directorio_temporal, StageMetrics(stage="bronze", ds_nodash="20251201")
+        )
+        ruta = record_stage_metrics(
+            directorio_temporal,
+            StageMetrics(stage="silver", ds_nodash="20251201", wall_seconds=1.5),
+        )
+
+        assert ruta.name == "metrics_20251201.json"
+        etapas = json.loads(ruta.read_text(encoding="utf-8"))
+        assert set(etapas) == {"bronze", "silver"}
+        assert etapas["silver"]["wall_seconds"] == 1.5
+        historial = (directorio_temporal / METRICS_HISTORY_FILE).read_text().splitlines()
+        assert [json.loads(linea)["stage"] for linea in historial] == ["bronze", "silver"]
+
+    def test_reejecucion_reemplaza_la_etapa(self, directorio_temporal):
+        """Verifica que re-ejecutar una etapa reemplaza su registro del día."""
+        for filas in (3, 7):
+            ruta = record_stage_metrics(
+                directorio_temporal,
+                StageMetrics(stage="bronze", ds_nodash="20251201", rows_read=filas),
+            )
+
+        etapas = json.loads(ruta.read_text(encoding="utf-8"))
+        assert etapas["bronze"]["rows_read"] == 7
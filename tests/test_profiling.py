@@ -0,0 +1,84 @@
+"""Tests unitarios para el profiling a pedido de las tasks."""
+
+from __future__ import annotations
+
+import csv
+import pstats
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from src.duckdb_profiling import Plugin
+from src.profiling import QUERY_METRICS, profile_run, summarize_query_log
+
+
+@pytest.fixture
+def directorio_temporal():
+    """Crea un directorio temporal para los artefactos."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+class TestProfileRun:
+    """Tests para profile_run."""
+
+    def test_guarda_perfil_de_cpu_y_memoria(self, directorio_temporal):
+        """Verifica los cuatro artefactos y que tracemalloc queda apagado al salir."""
+        with profile_run(directorio_temporal / "20251201", "bronze") as destino:
+            filas = [list(range(100)) for _ in range(1000)]
+
+        assert len(filas) == 1000
+        assert sorted(path.name for path in destino.iterdir()) == [
+            "bronze.prof",
+            "bronze.tracemalloc",
+            "bronze_alloc.txt",
+            "bronze_cpu.txt",
+        ]
+        assert pstats.Stats(str(destino / "bronze.prof")).total_calls > 0
+        assert tracemalloc.Snapshot.load(str(destino / "bronze.tracemalloc")).traces
+        assert (destino / "bronze_alloc.txt").read_text(encoding="utf-8").startswith(
+            "Peak traced memory"
+        )
+        assert not tracemalloc.is_tracing()
+
+    def test_guarda_el_perfil_aunque_falle(self, directorio_temporal):
+        """Verifica que si la task lanza una excepción el perfil igual se escribe."""
+        with pytest.raises(RuntimeError):
+            with profile_run(directorio_temporal, "silver"):
+                raise RuntimeError("dbt run failed")
+
+        assert (directorio_temporal / "silver.prof").exists()
+
+
+class TestSummarizeQueryLog:
+    """Tests para el plugin de dbt-duckdb y summarize_query_log."""
+
+    def test_una_fila_por_consulta_la_mas_lenta_primero(self, directorio_temporal):
+        """Verifica que se listan solo las consultas perfiladas, ordenadas por latencia."""
+        # La ruta del log se escapa en el SQL de enable_logging
+        log_dir = directorio_temporal / "duckdb d'Artagnan"
+        plugin = Plugin(name="duckdb_profiling", plugin_config={"log_dir": log_dir})
+        con = duckdb.connect(str(directorio_temporal / "warehouse.duckdb"))
+        plugin.configure_connection(con)
+        con.execute("SELECT 'sin profiling'").fetchall()
+        cursor = con.cursor()
+        plugin.configure_cursor(cursor)
+        cursor.execute("CREATE TABLE t AS SELECT range AS i FROM range(200000)")
+        cursor.execute("SELECT sum(i) FROM t").fetchall()
+        con.close()
+
+        ruta = summarize_query_log(log_dir, directorio_temporal / "queries.csv")
+
+        with ruta.open(encoding="utf-8", newline="") as archivo:
+            filas = list(csv.DictReader(archivo))
+        assert sorted(fila["query"] for fila in filas) == [
+            "CREATE TABLE t AS SELECT range AS i FROM range(200000)",
+            "SELECT sum(i) FROM t",
+        ]
+        latencias = [float(fila["latency_seconds"]) for fila in filas]
+        assert latencias == sorted(latencias, reverse=True)
+        assert set(QUERY_METRICS.values()) <= set(filas[0])
+        assert {int(fila["rows_scanned"]) for fila in filas} == {200000}
@@ -0,0 +1,142 @@
+"""Tests unitarios para la API de lectura de métricas de clientes."""
+
+from __future__ import annotations
+
+import tempfile
+import threading
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from src.serving import (
+    POINTER_FILE,
+    SERVING_TABLE,
+    CustomerMetricsReader,
+    LRUCache,
+    publish_snapshot,
+)
+
+
+def _publicar(warehouse: Path, serving: Path, ds_nodash: str, filas: list[tuple]) -> Path:
+    with duckdb.connect(str(warehouse)) as con:
+        con.execute(
+            f"CREATE OR REPLACE TABLE {SERVING_TABLE} "
+            "(customer_id BIGINT, transaction_count BIGINT, total_amount_all DOUBLE)"
+        )
+        con.executemany(f"INSERT INTO {SERVING_TABLE} VALUES (?, ?, ?)", filas)
+        return publish_snapshot(con, serving, ds_nodash)
+
+
+@pytest.fixture
+def directorios():
+    """Crea un warehouse y un directorio de snapshots temporales."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        yield tmp / "warehouse.duckdb", tmp / "serving"
+
+
+class TestLRUCache:
+    """Tests para LRUCache."""
+
+    def test_descarta_el_menos_usado(self):
+        """Verifica que al superar maxsize se descarta la entrada usada hace más tiempo."""
+        cache = LRUCache(2)
+        cache.put(1, "a")
+        cache.put(2, "b")
+        cache.get(1)
+        cache.put(3, "c")
+
+        assert cache.get(2) is None
+        assert (cache.get(1), cache.get(3)) == ("a", "c")
+        assert (cache.hits, cache.misses) == (3, 1)
+
+
+class TestCustomerMetricsReader:
+    """Tests para publish_snapshot y CustomerMetricsReader."""
+
+    def test_busquedas_puntuales_y_en_lote(self, directorios):
+        """Verifica get y get_many, incluidos clientes sin métricas y repetidos."""
+        warehouse, serving = directorios
+        _publicar(warehouse, serving, "20251201", [(1001, 2, 10.0), (1002, 1, 5.5)])
+        lector = CustomerMetricsReader(serving)
+
+        assert lector.ds_nodash == "20251201"
+        assert lector.get(1001) == {
+            "customer_id": 1001,
+            "transaction_count": 2,
+            "total_amount_all": 10.0,
+        }
+        assert lector.get(9999) is None
+        assert set(lector.get_many([1002, 1001, 9999, 1002])) == {1001, 1002}
+
+    def test_publica_en_un_directorio_con_comillas(self, directorios):
+        """Verifica que la ruta del snapshot se escapa en el ATTACH."""
+        warehouse, serving = directorios
+        serving = serving.with_name("serving d'Artagnan")
+        _publicar(warehouse, serving, "20251201", [(1001, 2, 10.0)])
+
+        assert CustomerMetricsReader(serving).get(1001)["transaction_count"] == 2
+
+    def test_la_cache_evita_consultas_repetidas(self, directorios):
+        """Verifica que los clientes ya leídos, con o sin métricas, salen de la caché."""
+        warehouse, serving = directorios
+        _publicar(warehouse, serving, "20251201", [(1001, 2, 10.0)])
+        lector = CustomerMetricsReader(serving)
+
+        lector.get_many([1001, 9999])
+        lector.get_many([1001, 9999])
+
+        assert (lector.cache.hits, lector.cache.misses) == (2, 2)
+
+    def test_un_snapshot_nuevo_invalida_la_cache(self, directorios):
+        """Verifica que al publicar Gold un día nuevo el lector cambia de snapshot."""
+        warehouse, serving = directorios
+        _publicar(warehouse, serving, "20251201", [(1001, 2, 10.0)])
+        lector = CustomerMetricsReader(serving, refresh_seconds=0)
+        assert lector.get(1001)["transaction_count"] == 2
+
+        _publicar(warehouse, serving, "20251203", [(1001, 3, 15.0)])
+
+        assert lector.get(1001)["transaction_count"] == 3
+        assert lector.ds_nodash == "20251203"
+
+    def test_conserva_los_ultimos_snapshots(self, directorios):
+        """Verifica que se borran los snapshots viejos y CURRENT.json apunta al último."""
+        warehouse, serving = directorios
+        for ds_nodash in ("20251201", "20251203", "20251205"):
+            ultimo = _publicar(warehouse, serving, ds_nodash, [(1001, 1, 1.0)])
+
+        snapshots = sorted(path.name for path in serving.glob("*.duckdb"))
+        assert len(snapshots) == 2
+        assert ultimo.name in snapshots
+        assert ultimo.name in (serving / POINTER_FILE).read_text(encoding="utf-8")
+
+    def test_lecturas_concurrentes_con_el_pool(self, directorios):
+        """Verifica que varios hilos comparten el pool de cursores sin errores."""
+        warehouse, serving = directorios
+        _publicar(warehouse, serving, "20251201", [(i, i % 5, float(i)) for i in range(1000)])
+        lector = CustomerMetricsReader(serving, pool_size=2, cache_size=0)
+        errores = []
+
+        def leer(inicio):
+            try:
+                for customer_id in range(inicio, inicio + 50):
+                    assert lector.get(customer_id)["total_amount_all"] == float(customer_id)
+            except Exception as error:  # pylint: disable=broad-except
+                errores.append(error)
+
+        hilos = [threading.Thread(target=leer, args=(inicio,)) for inicio in (0, 200, 400, 600)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        assert not errores
+
+    def test_sin_snapshot_publicado_lanza_error(self, directorios):
+        """Verifica que sin CURRENT.json el lector avisa que no hay nada publicado."""
+        _, serving = directorios
+
+        with pytest.raises(FileNotFoundError, match="No serving snapshot"):
+            CustomerMetricsReader(serving).get(1001)
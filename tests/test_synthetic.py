@@ -0,0 +1,68 @@
+"""Tests unitarios para el generador de archivos sintéticos de la capa Bronze."""
+
+from __future__ import annotations
+
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.synthetic import DirtyRates, generate_transactions
+from src.transformations import ENGINES, clean_daily_transactions
+
+
+@pytest.fixture
+def directorio_temporal():
+    """Crea un directorio temporal para archivos de prueba."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+class TestGenerateTransactions:
+    """Tests unitarios para generate_transactions."""
+
+    def test_archivo_con_bom_y_filas_esperadas(self, directorio_temporal):
+        """Verifica que el archivo empieza con BOM y tiene filas únicas más duplicados."""
+        ruta = directorio_temporal / "transactions_20251201.csv"
+
+        stats = generate_transactions(ruta, 1_000, chunk_rows=300)
+
+        assert ruta.read_bytes().startswith(b"\xef\xbb\xbftransaction_id,")
+        df = pd.read_csv(ruta, dtype=str)
+        assert len(df) == stats.rows == 1_000 + stats.duplicates
+        assert df["transaction_id"].nunique() == 1_000
+        assert stats.duplicates > 0
+        assert all(cantidad > 0 for cantidad in stats.defects.values())
+
+    def test_misma_semilla_mismo_archivo(self, directorio_temporal):
+        """Verifica que la generación es determinística para una semilla dada."""
+        ruta_a = directorio_temporal / "a.csv"
+        ruta_b = directorio_temporal / "b.csv"
+
+        generate_transactions(ruta_a, 500, seed=7)
+        generate_transactions(ruta_b, 500, seed=7)
+
+        assert ruta_a.read_bytes() == ruta_b.read_bytes()
+
+    def test_sin_defectos_todas_las_filas_limpias(self, directorio_temporal):
+        """Verifica que con tasas en cero todas las filas son válidas y únicas."""
+        ruta = directorio_temporal / "limpio.csv"
+        tasas = DirtyRates(bad_amount=0, bad_status=0, bad_timestamp=0, duplicate=0)
+
+        stats = generate_transactions(ruta, 200, rates=tasas)
+
+        assert stats.rows == stats.expected_clean_rows == 200
+
+    @pytest.mark.parametrize("motor", ENGINES)
+    def test_limpieza_conserva_filas_esperadas(self, directorio_temporal, motor):
+        """Verifica que cada motor conserva exactamente las filas válidas únicas."""
+        dir_raw = directorio_temporal / "raw"
+        stats = generate_transactions(dir_raw / "transactions_20251201.csv", 5_000)
+
+        ruta_salida = clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, directorio_temporal / "clean", engine=motor
+        )
+
+        assert len(pd.read_parquet(ruta_salida)) == stats.expected_clean_rows
@@ -0,0 +1,94 @@
+"""Tests unitarios para el historial de tiempos por nodo de dbt."""
+
+from __future__ import annotations
+
+import duckdb
+import pytest
+
+from src.dbt_runner import DbtInvocation
+from src.timing_history import TIMINGS_TABLE, record_node_timings, timing_regressions
+
+MODELO = "model.medallion_dbt.fct_customer_transactions"
+TEST = "test.medallion_dbt.assert_transaction_count_positive"
+
+
+def _invocacion(command: str, tiempos: dict[str, float], status: str = "success") -> DbtInvocation:
+    return DbtInvocation(
+        command=command,
+        mode="inprocess",
+        returncode=0,
+        elapsed_seconds=sum(tiempos.values()),
+        nodes=[
+            {
+                "unique_id": unique_id,
+                "status": status,
+                "execution_time": segundos,
+                "message": None,
+                "failures": None,
+                "rows_affected": 10,
+            }
+            for unique_id, segundos in tiempos.items()
+        ],
+    )
+
+
+@pytest.fixture
+def conexion():
+    """Abre un warehouse DuckDB en memoria."""
+    with duckdb.connect() as con:
+        yield con
+
+
+class TestTimingHistory:
+    """Tests para record_node_timings y timing_regressions."""
+
+    def test_agrega_una_fila_por_nodo(self, conexion):
+        """Verifica que cada invocación agrega sus nodos y los pasos extra a la tabla."""
+        extra = [{"unique_id": "column_checks.stg", "status": "pass", "execution_time": 0.2}]
+
+        record_node_timings(conexion, "silver", _invocacion("run", {MODELO: 1.0}), "20251201")
+        filas = record_node_timings(
+            conexion,
+            "gold",
+            _invocacion("test", {TEST: 0.5}, status="pass"),
+            "20251201",
+            "20251203",
+            extra_nodes=extra,
+        )
+
+        assert filas == 2
+        assert conexion.execute(
+            f"SELECT stage, command, end_ds_nodash, unique_id, rows_affected "
+            f"FROM {TIMINGS_TABLE} ORDER BY stage, unique_id"
+        ).fetchall() == [
+            ("gold", "test", "20251203", "column_checks.stg", None),
+            ("gold", "test", "20251203", TEST, 10),
+            ("silver", "run", "20251201", MODELO, 10),
+        ]
+
+    @pytest.mark.parametrize(
+        "ultimo, regresa",
+        [(3.0, True), (1.2, False), (1.05, False)],
+        ids=["regresion", "dentro_del_factor", "ruido_chico"],
+    )
+    def test_detecta_regresiones_contra_la_mediana(self, conexion, ultimo, regresa):
+        """Verifica que se marca el nodo solo si supera factor y diferencia mínima."""
+        for segundos in (1.0, 0.9, 1.1, 30.0, 1.0):
+            record_node_timings(conexion, "silver", _invocacion("run", {MODELO: segundos}), "d")
+        record_node_timings(conexion, "silver", _invocacion("run", {MODELO: ultimo}), "d")
+
+        regresiones = timing_regressions(conexion, window=5, factor=1.5, min_seconds=0.1)
+
+        assert bool(regresiones) is regresa
+        if regresa:
+            assert regresiones[0]["unique_id"] == MODELO
+            assert regresiones[0]["baseline"] == pytest.approx(1.0)
+            assert regresiones[0]["ratio"] == pytest.approx(3.0)
+
+    def test_sin_historia_no_hay_regresiones(self, conexion):
+        """Verifica que sin tabla o con una sola corrida por nodo no se marca nada."""
+        assert timing_regressions(conexion) == []
+
+        record_node_timings(conexion, "silver", _invocacion("run", {MODELO: 5.0}), "20251201")
+
+        assert timing_regressions(conexion) == []
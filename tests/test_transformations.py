@@ -8,16 +8,39 @@ from __future__ import annotations
 
 import tempfile
 from datetime import date
+from decimal import Decimal
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 
-from src.transformations import (
+from src.arrow_engine import (
+    _coerce_amount_arrow,
+    _coerce_id_arrow,
+    _normalize_status_arrow,
+    _parse_timestamp_arrow,
+)
+from src.cleaning import (
+    STATUS_ARROW_TYPE,
+    STATUS_DTYPE,
+    TIMESTAMP_FORMAT,
     _coerce_amount,
+    _coerce_id,
     _normalize_status,
+)
+from src.id_index import TransactionIdIndex
+from src.metrics import StageMetrics
+from src.transformations import (
+    ENGINES,
+    RawChunk,
     clean_daily_transactions,
+    clean_raw_chunk,
+    raw_chunks,
+    raw_input_files,
 )
+from src.writer_profiles import WriterProfile
 
 class TestCoerceAmount:
     """Tests unitarios para la función _coerce_amount."""
@@ -62,12 +85,15 @@ class TestCoerceAmount:
             (["N/A", "null", "100"], [0, 1]),
             # Caracteres especiales
             (["$100", "100€", "100"], [0, 1]),
+            # Valores no finitos
+            (["inf", "-Infinity", "NaN", "1e400", "100"], [0, 1, 2, 3]),
         ],
         ids=[
             "strings_no_numericos",
             "strings_vacios",
             "strings_tipo_null",
             "simbolos_moneda",
+            "no_finitos",
         ],
     )
     def test_valores_invalidos_se_convierten_en_nan(self, valores_entrada, indices_nan_esperados):
@@ -154,6 +180,14 @@ class TestNormalizeStatus:
         assert resultado.iloc[1] == "completed"
         assert pd.isna(resultado.iloc[2])
 
+    def test_resultado_categorico(self):
+        """Verifica que el resultado es categórico sobre los status válidos."""
+        serie = pd.Series(["Completed", "failed", "otro", None, "completed"])
+        resultado = _normalize_status(serie)
+
+        assert resultado.dtype == STATUS_DTYPE
+        assert list(resultado.cat.codes) == [0, 2, -1, -1, 0]
+
     def test_string_vacio_se_convierte_en_none(self):
         """Verifica que los strings vacíos se manejan correctamente."""
         serie = pd.Series(["", "completed", "   "])
@@ -164,8 +198,118 @@ class TestNormalizeStatus:
         assert pd.isna(resultado.iloc[2])
 
 
+class TestKernelsArrow:
+    """Tests de paridad entre las funciones de pandas y sus equivalentes en Arrow."""
+
+    @pytest.mark.parametrize(
+        "valores_entrada",
+        [
+            ["100", "200.50", "300"],
+            ["0", "-10", "-20.5"],
+            ["abc", "100", "xyz"],
+            ["", "100", None],
+            ["N/A", "null", "100"],
+            ["$100", "100€", " 100 "],
+            ["1e3", ".5", "5."],
+            ["inf", "-Infinity", "NaN", "1e400"],
+        ],
+        ids=[
+            "strings_numericos",
+            "ceros_y_negativos",
+            "strings_no_numericos",
+            "vacios_y_nulos",
+            "strings_tipo_null",
+            "simbolos_moneda",
+            "notacion_cientifica",
+            "no_finitos",
+        ],
+    )
+    def test_coerce_amount_igual_a_pandas(self, valores_entrada):
+        """Verifica que _coerce_amount_arrow coincide con _coerce_amount."""
+        esperado = _coerce_amount(pd.Series(valores_entrada, dtype=object))
+        resultado = _coerce_amount_arrow(pa.array(valores_entrada, type=pa.string()))
+
+        assert resultado.to_pandas().tolist() == pytest.approx(
+            esperado.tolist(), nan_ok=True
+        )
+
+    @pytest.mark.parametrize(
+        "valores_entrada",
+        [
+            ["1", "-20", " 300 ", "000012"],
+            ["abc", "1.5", "+5", "1e3"],
+            ["", None, "9223372036854775807"],
+        ],
+        ids=["enteros", "no_enteros", "vacios_y_desbordes"],
+    )
+    def test_coerce_id_igual_a_pandas(self, valores_entrada):
+        """Verifica que _coerce_id_arrow coincide con _coerce_id."""
+        esperado = _coerce_id(pd.Series(valores_entrada, dtype=object))
+        resultado = _coerce_id_arrow(pa.array(valores_entrada, type=pa.string()))
+
+        assert resultado.to_pylist() == [
+            None if pd.isna(valor) else valor for valor in esperado.tolist()
+        ]
+
+    @pytest.mark.parametrize(
+        "valores_entrada",
+        [
+            ["completed", "pending", "failed"],
+            ["COMPLETED", "Pending", "  failed  "],
+            ["invalid", "success", "cancelled"],
+            [None, "", "   "],
+        ],
+        ids=[
+            "minusculas",
+            "mayusculas_y_espacios",
+            "status_invalidos",
+            "nulos_y_vacios",
+        ],
+    )
+    def test_normalize_status_igual_a_pandas(self, valores_entrada):
+        """Verifica que _normalize_status_arrow coincide con _normalize_status."""
+        esperado = _normalize_status(pd.Series(valores_entrada, dtype=object))
+        resultado = _normalize_status_arrow(pa.array(valores_entrada, type=pa.string()))
+
+        assert resultado.to_pylist() == [None if pd.isna(v) else v for v in esperado]
+
+    @pytest.mark.parametrize(
+        "valores_entrada",
+        [
+            ["2025-12-01 08:00:00", "2024-02-29 10:00:00"],
+            ["2025-02-30 10:00:00", "2025-02-29 10:00:00", "2025-04-31 00:00:00"],
+            ["2025-13-01 08:00:00", "2025-12-01 24:00:00"],
+            [" 2025-12-01 08:00:00 ", "", None],
+        ],
+        ids=[
+            "fechas_validas",
+            "fechas_imposibles",
+            "campos_fuera_de_rango",
+            "espacios_y_nulos",
+        ],
+    )
+    def test_parse_timestamp_igual_a_pandas(self, valores_entrada):
+        """Verifica que una fecha imposible es nula en Arrow y no pasa al mes siguiente."""
+        esperado = pd.to_datetime(
+            pd.Series(valores_entrada, dtype=object), format=TIMESTAMP_FORMAT, errors="coerce"
+        )
+        resultado = _parse_timestamp_arrow(
+            pa.chunked_array([pa.array(valores_entrada, type=pa.string())])
+        )
+
+        assert resultado.to_pylist() == [None if pd.isna(v) else v for v in esperado]
+
+
 class TestCleanDailyTransactions:
-    """Tests de integración para la función clean_daily_transactions."""
+    """Tests de integración para la función clean_daily_transactions.
+
+    Cada test se ejecuta con todos los motores de limpieza disponibles.
+    """
+
+    @pytest.fixture(params=ENGINES)
+    def motor(self, request):
+        """Motor de limpieza con el que se ejecuta cada test."""
+        return request.param
 
     @pytest.fixture
     def directorios_temporales(self):
@@ -189,7 +333,7 @@ class TestCleanDailyTransactions:
             "6,1005,62.10,pending,2025-12-01 13:15:00\n"
         )
 
-    def test_limpieza_exitosa(self, directorios_temporales, contenido_csv_ejemplo):
+    def test_limpieza_exitosa(self, directorios_temporales, motor, contenido_csv_ejemplo):
         """Verifica que un CSV válido se limpia y guarda como parquet."""
         dir_raw, dir_clean = directorios_temporales
         fecha_ejecucion = date(2025, 12, 1)
@@ -199,7 +343,7 @@ class TestCleanDailyTransactions:
         ruta_csv.write_text(contenido_csv_ejemplo)
 
         # Ejecutar la función de limpieza
-        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean)
+        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean, engine=motor)
 
         # Verificar que el archivo de salida existe
         assert ruta_salida.exists()
@@ -212,7 +356,7 @@ class TestCleanDailyTransactions:
         assert len(df) == 5
         assert 3 not in df["transaction_id"].values
 
-    def test_nombres_columnas_normalizados(self, directorios_temporales):
+    def test_nombres_columnas_normalizados(self, directorios_temporales, motor):
         """Verifica que los nombres de columnas se normalizan a minúsculas."""
         dir_raw, dir_clean = directorios_temporales
         fecha_ejecucion = date(2025, 12, 1)
@@ -225,7 +369,7 @@ class TestCleanDailyTransactions:
         ruta_csv = dir_raw / "transactions_20251201.csv"
         ruta_csv.write_text(contenido_csv)
 
-        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean)
+        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean, engine=motor)
         df = pd.read_parquet(ruta_salida)
 
         # Todos los nombres de columnas deberían estar en minúsculas
@@ -233,7 +377,7 @@ class TestCleanDailyTransactions:
         assert "transaction_id" in df.columns
         assert "customer_id" in df.columns
 
-    def test_duplicados_eliminados(self, directorios_temporales):
+    def test_duplicados_eliminados(self, directorios_temporales, motor):
         """Verifica que las filas duplicadas se eliminan."""
         dir_raw, dir_clean = directorios_temporales
         fecha_ejecucion = date(2025, 12, 1)
@@ -248,13 +392,13 @@ class TestCleanDailyTransactions:
         ruta_csv = dir_raw / "transactions_20251201.csv"
         ruta_csv.write_text(contenido_csv)
 
-        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean)
+        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean, engine=motor)
         df = pd.read_parquet(ruta_salida)
 
         # Debería haber 2 filas únicas
         assert len(df) == 2
 
-    def test_status_normalizado(self, directorios_temporales):
+    def test_status_normalizado(self, directorios_temporales, motor):
         """Verifica que los valores de status se normalizan correctamente."""
         dir_raw, dir_clean = directorios_temporales
         fecha_ejecucion = date(2025, 12, 1)
@@ -268,13 +412,13 @@ class TestCleanDailyTransactions:
         ruta_csv = dir_raw / "transactions_20251201.csv"
         ruta_csv.write_text(contenido_csv)
 
-        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean)
+        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean, engine=motor)
         df = pd.read_parquet(ruta_salida)
 
         # Todos los valores de status deberían estar en minúsculas
         assert set(df["status"].unique()) == {"completed", "pending", "failed"}
 
-    def test_transaction_date_derivado(self, directorios_temporales):
+    def test_transaction_date_derivado(self, directorios_temporales, motor):
         """Verifica que transaction_date se deriva de transaction_ts."""
         dir_raw, dir_clean = directorios_temporales
         fecha_ejecucion = date(2025, 12, 1)
@@ -287,7 +431,7 @@ class TestCleanDailyTransactions:
         ruta_csv = dir_raw / "transactions_20251201.csv"
         ruta_csv.write_text(contenido_csv)
 
-        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean)
+        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean, engine=motor)
         df = pd.read_parquet(ruta_salida)
 
         # La columna transaction_date debería existir
@@ -295,18 +439,18 @@ class TestCleanDailyTransactions:
         assert df.loc[df["transaction_id"] == 1, "transaction_date"].iloc[0] == date(2025, 12, 1)
         assert df.loc[df["transaction_id"] == 2, "transaction_date"].iloc[0] == date(2025, 12, 5)
 
-    def test_archivo_no_encontrado_lanza_error(self, directorios_temporales):
+    def test_archivo_no_encontrado_lanza_error(self, directorios_temporales, motor):
         """Verifica que se lanza FileNotFoundError cuando el archivo raw no existe."""
         dir_raw, dir_clean = directorios_temporales
         fecha_ejecucion = date(2025, 12, 25)  # El archivo para esta fecha no existe
 
         with pytest.raises(FileNotFoundError) as exc_info:
-            clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean)
+            clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean, engine=motor)
 
         assert "Raw data not found" in str(exc_info.value)
         assert "20251225" in str(exc_info.value)
 
-    def test_filas_con_amount_invalido_eliminadas(self, directorios_temporales):
+    def test_filas_con_amount_invalido_eliminadas(self, directorios_temporales, motor):
         """Verifica que las filas con montos inválidos se eliminan."""
         dir_raw, dir_clean = directorios_temporales
         fecha_ejecucion = date(2025, 12, 1)
@@ -320,14 +464,35 @@ class TestCleanDailyTransactions:
         ruta_csv = dir_raw / "transactions_20251201.csv"
         ruta_csv.write_text(contenido_csv)
 
-        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean)
+        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean, engine=motor)
         df = pd.read_parquet(ruta_salida)
 
         # Solo la primera fila debería permanecer (las otras tienen montos inválidos)
         assert len(df) == 1
         assert df["transaction_id"].iloc[0] == 1
 
-    def test_filas_con_status_invalido_eliminadas(self, directorios_temporales):
+    def test_montos_no_finitos_rechazados(self, directorios_temporales, motor):
+        """Verifica que todos los motores rechazan inf, Infinity, NaN y desbordes."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "1,1001,inf,completed,2025-12-01 08:10:00\n"
+            "2,1002,-Infinity,pending,2025-12-01 09:45:00\n"
+            "3,1003,NaN,failed,2025-12-01 11:00:00\n"
+            "4,1004,1e400,completed,2025-12-01 12:30:00\n"
+            "5,1005,17.40,completed,2025-12-01 13:15:00\n",
+            encoding="utf-8",
+        )
+        metricas = StageMetrics(stage="bronze")
+
+        ruta = clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, dir_clean, engine=motor, metrics=metricas
+        )
+
+        assert pq.read_table(ruta).column("amount").to_pylist() == [17.40]
+        assert metricas.dropped["invalid_amount"] == 4
+
+    def test_filas_con_status_invalido_eliminadas(self, directorios_temporales, motor):
         """Verifica que las filas con valores de status inválidos se eliminan."""
         dir_raw, dir_clean = directorios_temporales
         fecha_ejecucion = date(2025, 12, 1)
@@ -341,14 +506,14 @@ class TestCleanDailyTransactions:
         ruta_csv = dir_raw / "transactions_20251201.csv"
         ruta_csv.write_text(contenido_csv)
 
-        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean)
+        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean, engine=motor)
         df = pd.read_parquet(ruta_salida)
 
         # Solo la primera fila debería permanecer (las otras tienen status inválido)
         assert len(df) == 1
         assert df["transaction_id"].iloc[0] == 1
 
-    def test_directorio_clean_se_crea_si_no_existe(self, directorios_temporales):
+    def test_directorio_clean_se_crea_si_no_existe(self, directorios_temporales, motor):
         """Verifica que el directorio clean se crea si no existe."""
         dir_raw, _ = directorios_temporales
         fecha_ejecucion = date(2025, 12, 1)
@@ -363,12 +528,12 @@ class TestCleanDailyTransactions:
         ruta_csv = dir_raw / "transactions_20251201.csv"
         ruta_csv.write_text(contenido_csv)
 
-        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean)
+        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean, engine=motor)
 
         assert dir_clean.exists()
         assert ruta_salida.exists()
 
-    def test_filas_con_timestamp_invalido_eliminadas(self, directorios_temporales):
+    def test_filas_con_timestamp_invalido_eliminadas(self, directorios_temporales, motor):
         """Verifica que las filas con timestamps inválidos se eliminan."""
         dir_raw, dir_clean = directorios_temporales
         fecha_ejecucion = date(2025, 12, 1)
@@ -378,13 +543,957 @@ class TestCleanDailyTransactions:
             "1,1001,100.0,completed,2025-12-01 08:00:00\n"
             "2,1002,200.0,pending,no_es_timestamp\n"
             "3,1003,300.0,failed,invalido\n"
+            "4,1004,400.0,completed,2025-02-30 10:00:00\n"
         )
         ruta_csv = dir_raw / "transactions_20251201.csv"
         ruta_csv.write_text(contenido_csv)
 
-        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean)
+        ruta_salida = clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean, engine=motor)
         df = pd.read_parquet(ruta_salida)
 
-        # Solo la primera fila debería permanecer (las otras tienen timestamps inválidos)
+        # Solo la primera fila debería permanecer (las otras tienen timestamps inválidos,
+        # incluida una fecha imposible que no debe desplazarse al 2 de marzo)
         assert len(df) == 1
         assert df["transaction_id"].iloc[0] == 1
+
+    def test_layout_particionado(self, directorios_temporales, motor):
+        """Verifica que el layout particionado escribe un directorio por transaction_date."""
+        dir_raw, dir_clean = directorios_temporales
+        fecha_ejecucion = date(2025, 12, 1)
+
+        contenido_csv = (
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "1,1001,100.0,completed,2025-12-01 08:00:00\n"
+            "2,1002,200.0,pending,2025-12-05 09:00:00\n"
+            "3,1003,300.0,failed,2025-12-01 10:00:00\n"
+        )
+        ruta_csv = dir_raw / "transactions_20251201.csv"
+        ruta_csv.write_text(contenido_csv)
+
+        ruta_salida = clean_daily_transactions(
+            fecha_ejecucion, dir_raw, dir_clean, engine=motor, layout="partitioned"
+        )
+
+        assert ruta_salida == dir_clean
+        particiones = sorted(p.name for p in dir_clean.iterdir() if p.name != "_rejected")
+        assert particiones == ["transaction_date=2025-12-01", "transaction_date=2025-12-05"]
+        archivos = list(dir_clean.glob("transaction_date=2025-12-01/part-20251201-*.parquet"))
+        assert len(archivos) == 1
+        # La columna de partición no se repite dentro de los archivos
+        assert "transaction_date" not in pq.read_schema(archivos[0]).names
+
+    def test_layout_particionado_reemplaza_archivos_del_dia(self, directorios_temporales, motor):
+        """Verifica que re-ejecutar un día reemplaza sus archivos sin tocar los de otros días."""
+        dir_raw, dir_clean = directorios_temporales
+        fecha_ejecucion = date(2025, 12, 1)
+
+        otro_dia = dir_clean / "transaction_date=2025-12-05" / "part-20251205-0.parquet"
+        otro_dia.parent.mkdir(parents=True)
+        otro_dia.write_bytes(b"")
+
+        ruta_csv = dir_raw / "transactions_20251201.csv"
+        ruta_csv.write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "1,1001,100.0,completed,2025-12-01 08:00:00\n"
+            "2,1002,200.0,pending,2025-12-05 09:00:00\n"
+        )
+        clean_daily_transactions(
+            fecha_ejecucion, dir_raw, dir_clean, engine=motor, layout="partitioned"
+        )
+
+        # Segunda corrida: la fila del 2025-12-05 ya no está en el archivo crudo
+        ruta_csv.write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "1,1001,100.0,completed,2025-12-01 08:00:00\n"
+        )
+        clean_daily_transactions(
+            fecha_ejecucion, dir_raw, dir_clean, engine=motor, layout="partitioned"
+        )
+
+        archivos = sorted(
+            str(p.relative_to(dir_clean)) for p in dir_clean.glob("transaction_date=*/*.parquet")
+        )
+        assert archivos == [
+            "transaction_date=2025-12-01/part-20251201-0.parquet",
+            "transaction_date=2025-12-05/part-20251205-0.parquet",
+        ]
+
+    def test_resultado_igual_entre_motores(self, directorios_temporales):
+        """Verifica que todos los motores producen exactamente el mismo parquet."""
+        dir_raw, dir_clean = directorios_temporales
+        fecha_ejecucion = date(2025, 12, 1)
+
+        # Encabezados sucios, BOM, duplicados, montos, status y timestamps inválidos
+        contenido_csv = (
+            "\ufeff Transaction_ID ,Customer_ID,AMOUNT,Status,transaction_ts,canal\n"
+            "1,1001,250.50,completed,2025-12-01 08:10:00,web\n"
+            "2,1002,99.99,Completed,2025-12-01 09:45:00,app\n"
+            "1,1001,250.50,completed,2025-12-01 08:10:00,web\n"
+            "3,1003,,failed,2025-12-01 11:00:00,web\n"
+            "4,1004,abc,pending,2025-12-01 11:30:00,app\n"
+            "5,1005,17.40,  PENDING ,2025-12-01 12:30:00,\n"
+            "6,1006,62.10,desconocido,2025-12-01 13:15:00,web\n"
+            "7,1007,10.00,failed,no_es_timestamp,app\n"
+            "8,1002,0,FAILED,2025-12-01 15:00:00,web\n"
+            "2,1002,99.99,Completed,2025-12-01 09:45:00,app\n"
+            ",1009,5.00,completed,2025-12-01 16:00:00,web\n"
+            "NA,1010,5.00,completed,2025-12-01 16:10:00,web\n"
+            "11,N/A,5.00,completed,2025-12-01 16:20:00,web\n"
+            "abc,1012,5.00,completed,2025-12-01 16:30:00,web\n"
+            " 13 ,1013,5.00,completed,2025-12-01 16:40:00,web\n"
+            "14,1014,NaN,completed,2025-12-01 16:50:00,web\n"
+            "15,1015,NA,completed,2025-12-01 17:00:00,web\n"
+        )
+        (dir_raw / "transactions_20251201.csv").write_text(contenido_csv, encoding="utf-8")
+
+        rutas = [
+            clean_daily_transactions(
+                fecha_ejecucion,
+                dir_raw,
+                dir_clean,
+                clean_template=f"{motor}_{{ds_nodash}}.parquet",
+                engine=motor,
+            )
+            for motor in ENGINES
+        ]
+        resultados = [pd.read_parquet(ruta) for ruta in rutas]
+
+        # Un ID faltante en el crudo no cambia el tipo de las columnas de IDs
+        for ruta in rutas:
+            esquema = pq.read_schema(ruta)
+            assert esquema.field("transaction_id").type == pa.int64()
+            assert esquema.field("customer_id").type == pa.int64()
+        assert list(resultados[0]["transaction_id"]) == [1, 2, 5, 8, 13]
+        for resultado in resultados[1:]:
+            pd.testing.assert_frame_equal(resultado, resultados[0])
+
+    def test_columnas_extra_con_el_mismo_tipo_en_todos_los_caminos(self, directorios_temporales):
+        """Verifica que motores, batches, shards y chunks tipan igual las columnas extra."""
+        dir_raw, dir_clean = directorios_temporales
+        encabezado = (
+            "transaction_id,customer_id,amount,status,transaction_ts,store_id,score,canal,vacia\n"
+        )
+        filas = [
+            "1,1001,250.50,completed,2025-12-01 08:10:00,7,1,web,\n",
+            "2,1002,99.99,pending,2025-12-01 09:45:00, 12 ,2.5,app,\n",
+            "abc,1003,10.00,failed,2025-12-01 10:00:00,13,1e2,web,\n",
+            "4,1004,17.40,completed,2025-12-01 12:30:00,NA,.5,3,\n",
+            "1,1001,250.50,completed,2025-12-01 08:10:00,7,1,web,\n",
+        ]
+        (dir_raw / "transactions_20251201.csv").write_text(encabezado + "".join(filas))
+        dir_shards = dir_raw / "shards"
+        dir_shards.mkdir()
+        for indice, fila in enumerate(filas, start=1):
+            (dir_shards / f"transactions_20251201_{indice}.csv").write_text(encabezado + fila)
+
+        rutas = [
+            clean_daily_transactions(
+                date(2025, 12, 1),
+                dir_raw,
+                dir_clean,
+                clean_template=f"{motor}_{{ds_nodash}}.parquet",
+                engine=motor,
+            )
+            for motor in ENGINES
+        ]
+        rutas.append(
+            clean_daily_transactions(
+                date(2025, 12, 1),
+                dir_raw,
+                dir_clean,
+                clean_template="streaming_{ds_nodash}.parquet",
+                batch_size=1,
+            )
+        )
+        rutas.append(
+            clean_daily_transactions(
+                date(2025, 12, 1),
+                dir_shards,
+                dir_clean,
+                clean_template="shards_{ds_nodash}.parquet",
+                shard_workers=1,
+            )
+        )
+        chunks = [
+            clean_raw_chunk(chunk, dir_raw / "chunks", indice)
+            for indice, chunk in enumerate(raw_chunks(dir_raw, "20251201", 1))
+        ]
+        rutas.append(
+            clean_daily_transactions(
+                date(2025, 12, 1),
+                dir_raw,
+                dir_clean,
+                clean_template="chunks_{ds_nodash}.parquet",
+                chunk_paths=chunks,
+            )
+        )
+
+        tablas = [pq.read_table(ruta) for ruta in rutas]
+        esquema = tablas[0].schema
+        assert esquema.field("store_id").type == pa.int64()
+        assert esquema.field("score").type == pa.float64()
+        # Un valor no numérico o una columna sin valores quedan como texto
+        assert esquema.field("canal").type == pa.string()
+        assert esquema.field("vacia").type == pa.string()
+        assert tablas[0].column("store_id").to_pylist() == [7, 12, None]
+        assert tablas[0].column("score").to_pylist() == [1.0, 2.5, 0.5]
+        for tabla in tablas[1:]:
+            assert tabla.schema.remove_metadata() == esquema.remove_metadata()
+            assert tabla.to_pylist() == tablas[0].to_pylist()
+
+    def test_id_no_numerico_se_rechaza_en_pandas(self, directorios_temporales):
+        """Verifica que pandas rechaza como missing_id los IDs que no son enteros."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "1,1001,250.50,completed,2025-12-01 08:10:00\n"
+            "abc,1002,99.99,pending,2025-12-01 09:45:00\n"
+            "3,N/A,10.00,failed,2025-12-01 10:00:00\n"
+            "4.5,1004,17.40,completed,2025-12-01 12:30:00\n",
+            encoding="utf-8",
+        )
+        metricas = StageMetrics(stage="bronze")
+
+        ruta = clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, dir_clean, engine="pandas", metrics=metricas
+        )
+
+        limpio = pq.read_table(ruta)
+        assert limpio.schema.field("transaction_id").type == pa.int64()
+        assert limpio.column("transaction_id").to_pylist() == [1]
+        assert metricas.dropped["missing_id"] == 3
+        rechazos = pq.read_table(dir_clean / "transactions_20251201_rejected.parquet")
+        assert rechazos.column("reject_reason").to_pylist() == ["missing_id"] * 3
+
+    def test_metricas_por_motivo(self, directorios_temporales, motor):
+        """Verifica que las métricas cuentan cada fila descartada una sola vez por motivo."""
+        dir_raw, dir_clean = directorios_temporales
+
+        contenido_csv = (
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "1,1001,250.50,completed,2025-12-01 08:10:00\n"
+            "1,1001,250.50,completed,2025-12-01 08:10:00\n"
+            ",1002,99.99,completed,2025-12-01 09:45:00\n"
+            "3,1003,,failed,2025-12-01 11:00:00\n"
+            "4,1004,abc,desconocido,no_es_timestamp\n"
+            "5,1005,17.40,desconocido,2025-12-01 12:30:00\n"
+            "6,1006,62.10,pending,no_es_timestamp\n"
+            "7,1007,10.00,failed,2025-12-01 15:00:00\n"
+        )
+        ruta_csv = dir_raw / "transactions_20251201.csv"
+        ruta_csv.write_text(contenido_csv)
+        metricas = StageMetrics(stage="bronze")
+
+        ruta_salida = clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, dir_clean, engine=motor, metrics=metricas
+        )
+
+        assert metricas.ds_nodash == "20251201"
+        assert metricas.rows_read == 8
+        assert metricas.rows_written == 2
+        assert metricas.dropped == {
+            "duplicate": 1,
+            "missing_id": 1,
+            "invalid_amount": 2,
+            "invalid_status": 1,
+            "invalid_timestamp": 1,
+            "cross_day_duplicate": 0,
+        }
+        assert metricas.bytes_in == ruta_csv.stat().st_size
+        assert metricas.bytes_out == ruta_salida.stat().st_size
+        assert metricas.peak_rss_bytes > 0
+
+    def test_cuarentena_conserva_valores_crudos(self, directorios_temporales, motor):
+        """Verifica que las filas rechazadas se guardan con sus valores originales y el motivo."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "1,1001,250.50,completed,2025-12-01 08:10:00\n"
+            "1,1001,250.50,completed,2025-12-01 08:10:00\n"
+            ",1002,99.99,completed,2025-12-01 09:45:00\n"
+            "4,1004,abc,desconocido,no_es_timestamp\n"
+            "5,1005,17.40, Desconocido ,2025-12-01 12:30:00\n"
+            "6,1006,62.10,pending,no_es_timestamp\n"
+        )
+
+        clean_daily_transactions(date(2025, 12, 1), dir_raw, dir_clean, engine=motor)
+
+        rechazadas = pq.read_table(dir_clean / "transactions_20251201_rejected.parquet")
+        # Los duplicados exactos no son rechazos: la primera copia sigue en el archivo limpio
+        assert rechazadas.to_pylist() == [
+            {
+                "transaction_id": None,
+                "customer_id": 1002,
+                "amount": "99.99",
+                "status": "completed",
+                "transaction_ts": "2025-12-01 09:45:00",
+                "reject_reason": "missing_id",
+            },
+            {
+                "transaction_id": 4,
+                "customer_id": 1004,
+                "amount": "abc",
+                "status": "desconocido",
+                "transaction_ts": "no_es_timestamp",
+                "reject_reason": "invalid_amount",
+            },
+            {
+                "transaction_id": 5,
+                "customer_id": 1005,
+                "amount": "17.40",
+                "status": " Desconocido ",
+                "transaction_ts": "2025-12-01 12:30:00",
+                "reject_reason": "invalid_status",
+            },
+            {
+                "transaction_id": 6,
+                "customer_id": 1006,
+                "amount": "62.10",
+                "status": "pending",
+                "transaction_ts": "no_es_timestamp",
+                "reject_reason": "invalid_timestamp",
+            },
+        ]
+
+    def test_cuarentena_igual_entre_motores(self, directorios_temporales):
+        """Verifica que todos los motores escriben el mismo archivo de rechazos."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(
+            "\ufeff Transaction_ID ,Customer_ID,AMOUNT,Status,transaction_ts,canal\n"
+            "1,1001,250.50,completed,2025-12-01 08:10:00,web\n"
+            "3,1003,,failed,2025-12-01 11:00:00,web\n"
+            "3,1003,,failed,2025-12-01 11:00:00,web\n"
+            "4,1004,abc,pending,2025-12-01 11:30:00,app\n"
+            "6,1006,62.10,desconocido,2025-12-01 13:15:00,web\n"
+            "7,1007,10.00,failed,no_es_timestamp,\n"
+            "N/A,1008,5.00,completed,2025-12-01 16:00:00,web\n"
+            "abc,1009,5.00,completed,2025-12-01 16:10:00,NA\n"
+            "10,1010,NaN,completed,2025-12-01 16:20:00,web\n",
+            encoding="utf-8",
+        )
+
+        resultados = []
+        for motor in ENGINES:
+            clean_daily_transactions(
+                date(2025, 12, 1),
+                dir_raw,
+                dir_clean,
+                clean_template=f"{motor}_{{ds_nodash}}.parquet",
+                rejected_template=f"{motor}_{{ds_nodash}}_rejected.parquet",
+                engine=motor,
+            )
+            resultados.append(pq.read_table(dir_clean / f"{motor}_20251201_rejected.parquet"))
+
+        assert resultados[0].column("reject_reason").to_pylist() == [
+            "invalid_amount",
+            "invalid_amount",
+            "invalid_status",
+            "invalid_timestamp",
+            "missing_id",
+            "missing_id",
+            "invalid_amount",
+        ]
+        for resultado in resultados[1:]:
+            assert resultado.equals(resultados[0])
+
+    def test_status_codificado_con_diccionario(
+        self, directorios_temporales, contenido_csv_ejemplo, motor
+    ):
+        """Verifica que status se escribe con diccionario sobre los status válidos."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(contenido_csv_ejemplo)
+
+        ruta_salida = clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, dir_clean, engine=motor
+        )
+
+        columna = pq.ParquetFile(ruta_salida).metadata.row_group(0).column(3)
+        assert columna.path_in_schema == "status"
+        assert "RLE_DICTIONARY" in columna.encodings
+        assert pq.read_schema(ruta_salida).field("status").type == STATUS_ARROW_TYPE
+
+    def test_alias_de_status_configurables(self, directorios_temporales, motor):
+        """Verifica que status_mapping reemplaza la tabla de alias por defecto."""
+        dir_raw, dir_clean = directorios_temporales
+        contenido_csv = (
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "1,1001,10.0,Done,2025-12-01 08:00:00\n"
+            "2,1002,20.0,completed,2025-12-01 09:00:00\n"
+            "3,1003,30.0, en curso ,2025-12-01 10:00:00\n"
+            "4,1004,40.0,failed,2025-12-01 11:00:00\n"
+        )
+        (dir_raw / "transactions_20251201.csv").write_text(contenido_csv)
+        alias = {"done": "completed", "completed": "completed", "EN CURSO": "pending"}
+
+        ruta_salida = clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, dir_clean, engine=motor, status_mapping=alias
+        )
+        df = pd.read_parquet(ruta_salida)
+
+        assert list(df["transaction_id"]) == [1, 2, 3]
+        assert list(df["status"].astype(str)) == ["completed", "completed", "pending"]
+
+    def test_alias_a_status_desconocido_lanza_error(self, directorios_temporales):
+        """Verifica que un alias hacia un status fuera de STATUS_VALUES lanza ValueError."""
+        dir_raw, dir_clean = directorios_temporales
+
+        with pytest.raises(ValueError, match="Status aliases"):
+            clean_daily_transactions(
+                date(2025, 12, 1),
+                dir_raw,
+                dir_clean,
+                status_mapping={"ok": "success"},
+            )
+
+    def test_duplicados_entre_dias_con_indice(self, directorios_temporales, motor):
+        """Verifica que se descartan los transaction_id ya cargados en días anteriores."""
+        dir_raw, dir_clean = directorios_temporales
+        indice = TransactionIdIndex(dir_clean.parent / "index")
+        encabezado = "transaction_id,customer_id,amount,status,transaction_ts\n"
+        (dir_raw / "transactions_20251201.csv").write_text(
+            encabezado
+            + "1,1001,10.0,completed,2025-12-01 08:00:00\n"
+            + "2,1002,20.0,pending,2025-12-01 09:00:00\n"
+        )
+        (dir_raw / "transactions_20251202.csv").write_text(
+            encabezado
+            + "2,1002,20.0,pending,2025-12-01 09:00:00\n"
+            + "3,1003,30.0,failed,2025-12-02 10:00:00\n"
+        )
+
+        for dia in (date(2025, 12, 1), date(2025, 12, 2), date(2025, 12, 1)):
+            metricas = StageMetrics(stage="bronze")
+            ruta_salida = clean_daily_transactions(
+                dia, dir_raw, dir_clean, engine=motor, id_index=indice, metrics=metricas
+            )
+            if dia.day == 2:
+                assert list(pd.read_parquet(ruta_salida)["transaction_id"]) == [3]
+                assert metricas.dropped["cross_day_duplicate"] == 1
+
+        # Re-procesar el primer día no lo compara contra sí mismo ni contra días posteriores
+        assert list(pd.read_parquet(ruta_salida)["transaction_id"]) == [1, 2]
+        assert metricas.dropped["cross_day_duplicate"] == 0
+        assert indice.days == {"20251201": 2, "20251202": 1}
+
+    def test_handoff_recibe_la_misma_tabla_que_el_parquet(
+        self, directorios_temporales, contenido_csv_ejemplo, motor
+    ):
+        """Verifica que el handoff recibe en Arrow las mismas filas que se escriben en parquet."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(contenido_csv_ejemplo)
+        recibidas = []
+        metricas = StageMetrics(stage="bronze")
+
+        ruta_salida = clean_daily_transactions(
+            date(2025, 12, 1),
+            dir_raw,
+            dir_clean,
+            engine=motor,
+            metrics=metricas,
+            handoff=recibidas.append,
+        )
+
+        assert len(recibidas) == 1
+        assert recibidas[0].equals(pq.read_table(ruta_salida))
+        assert "handoff" in metricas.timings
+
+    def test_handoff_con_batch_size_lanza_error(self, directorios_temporales):
+        """Verifica que el handoff no se combina con el modo streaming."""
+        dir_raw, dir_clean = directorios_temporales
+
+        with pytest.raises(ValueError, match="handoff"):
+            clean_daily_transactions(
+                date(2025, 12, 1), dir_raw, dir_clean, batch_size=10, handoff=print
+            )
+
+    def test_tipos_compactos(self, directorios_temporales, motor):
+        """Verifica que compact_types escribe IDs int32 y amount DECIMAL(18,2) exacto."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "1,1001,0.10,completed,2025-12-01 08:10:00\n"
+            "2,1002,0.20,completed,2025-12-01 09:45:00\n"
+            "3,1003,17.405,pending,2025-12-01 11:00:00\n"
+        )
+
+        ruta_salida = clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, dir_clean, engine=motor, compact_types=True
+        )
+
+        tabla = pq.read_table(ruta_salida)
+        assert tabla.schema.field("transaction_id").type == pa.int32()
+        assert tabla.schema.field("customer_id").type == pa.int32()
+        assert tabla.schema.field("amount").type == pa.decimal128(18, 2)
+        montos = tabla.column("amount").to_pylist()
+        assert montos == [Decimal("0.10"), Decimal("0.20"), Decimal("17.41")]
+        assert sum(montos[:2]) == Decimal("0.30")
+
+    @pytest.mark.parametrize("batch_size", [None, 1], ids=["completo", "streaming"])
+    def test_tipos_compactos_ancho_por_columna(self, directorios_temporales, motor, batch_size):
+        """Verifica que un ID fuera de int32 pasa su columna a int64 y deja la otra en int32."""
+        if batch_size is not None and motor != "pandas":
+            pytest.skip("batch_size solo se soporta con el motor pandas")
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "1,1001,10.00,completed,2025-12-01 08:10:00\n"
+            "3000000000,1002,20.00,completed,2025-12-01 09:45:00\n"
+        )
+        metricas = StageMetrics(stage="bronze")
+
+        ruta_salida = clean_daily_transactions(
+            date(2025, 12, 1),
+            dir_raw,
+            dir_clean,
+            batch_size=batch_size,
+            engine=motor,
+            metrics=metricas,
+            compact_types=True,
+        )
+
+        tabla = pq.read_table(ruta_salida)
+        assert tabla.schema.field("transaction_id").type == pa.int64()
+        assert tabla.schema.field("customer_id").type == pa.int32()
+        assert tabla.column("transaction_id").to_pylist() == [1, 3000000000]
+        assert metricas.details["id_types"] == {
+            "transaction_id": "int64",
+            "customer_id": "int32",
+        }
+
+    def test_perfil_clustered_ordena_por_cliente(self, directorios_temporales, motor):
+        """Verifica que el perfil clustered escribe las mismas filas ordenadas por cliente y ts."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+            "1,1005,10.00,completed,2025-12-01 08:00:00\n"
+            "2,1001,20.00,completed,2025-12-01 09:00:00\n"
+            "3,1005,30.00,pending,2025-12-01 07:00:00\n"
+            "4,1002,40.00,failed,2025-12-01 10:00:00\n"
+        )
+
+        ruta_default = clean_daily_transactions(
+            date(2025, 12, 1),
+            dir_raw,
+            dir_clean,
+            engine=motor,
+            clean_template="default_{ds_nodash}.parquet",
+        )
+        ruta_salida = clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, dir_clean, engine=motor, parquet_profile="clustered"
+        )
+
+        filas = pq.read_table(ruta_salida).to_pylist()
+        assert [fila["transaction_id"] for fila in filas] == [2, 4, 3, 1]
+        assert sorted(filas, key=lambda fila: fila["transaction_id"]) == sorted(
+            pq.read_table(ruta_default).to_pylist(), key=lambda fila: fila["transaction_id"]
+        )
+        metadatos = pq.ParquetFile(ruta_salida).metadata
+        assert metadatos.row_group(0).column(0).compression == "ZSTD"
+
+    def test_perfil_a_medida(self, directorios_temporales, motor, contenido_csv_ejemplo):
+        """Verifica que un WriterProfile a medida aplica codec y desactiva el diccionario."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(contenido_csv_ejemplo)
+        perfil = WriterProfile(compression="gzip", use_dictionary=False)
+        metricas = StageMetrics(stage="bronze")
+
+        ruta_salida = clean_daily_transactions(
+            date(2025, 12, 1),
+            dir_raw,
+            dir_clean,
+            engine=motor,
+            metrics=metricas,
+            parquet_profile=perfil,
+        )
+
+        columna = pq.ParquetFile(ruta_salida).metadata.row_group(0).column(1)
+        assert columna.compression == "GZIP"
+        assert not any("DICTIONARY" in codificacion for codificacion in columna.encodings)
+        assert metricas.details["parquet_profile"] == "custom"
+
+    def test_perfil_desconocido_lanza_error(self, directorios_temporales):
+        """Verifica que un perfil de escritura inexistente lanza ValueError."""
+        dir_raw, dir_clean = directorios_temporales
+
+        with pytest.raises(ValueError, match="Unknown writer profile"):
+            clean_daily_transactions(
+                date(2025, 12, 1), dir_raw, dir_clean, parquet_profile="turbo"
+            )
+
+    def test_motor_desconocido_lanza_error(self, directorios_temporales):
+        """Verifica que un motor no soportado lanza ValueError."""
+        dir_raw, dir_clean = directorios_temporales
+
+        with pytest.raises(ValueError, match="Unknown engine"):
+            clean_daily_transactions(date(2025, 12, 1), dir_raw, dir_clean, engine="spark")
+
+
+class TestCleanDailyTransactionsStreaming:
+    """Tests de integración para el modo streaming (batch_size) de clean_daily_transactions."""
+
+    @pytest.fixture
+    def directorios_temporales(self):
+        """Crea directorios temporales para datos crudos y limpios."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dir_raw = Path(tmpdir) / "raw"
+            dir_clean = Path(tmpdir) / "clean"
+            dir_raw.mkdir()
+            yield dir_raw, dir_clean
+
+    @pytest.fixture
+    def contenido_csv_ejemplo(self):
+        """Retorna contenido CSV con duplicados separados en distintos batches."""
+        return (
+            "﻿Transaction_ID,customer_id,amount,status,transaction_ts\n"
+            "1,1001,250.50,completed,2025-12-01 08:10:00\n"
+            "2,1002,99.99,Completed,2025-12-01 09:45:00\n"
+            "3,1003,,failed,2025-12-01 11:00:00\n"
+            "1,1001,250.50,completed,2025-12-01 08:10:00\n"
+            "5,1004,17.40,desconocido,2025-12-01 12:30:00\n"
+            "6,1005,62.10,pending,no_es_timestamp\n"
+            "2,1002,99.99,Completed,2025-12-01 09:45:00\n"
+            "7,1006,10.00,FAILED,2025-12-01 14:00:00\n"
+        )
+
+    @pytest.mark.parametrize("tamanio_batch", [1, 2, 3, 100], ids=["1", "2", "3", "100"])
+    @pytest.mark.parametrize(
+        "filas_extra",
+        [
+            "",
+            "8,1007,5.00,completed,2025-12-01\n9,1008,6.00,pending,2025-12-01T10:00:00\n",
+        ],
+        ids=["un_formato", "formatos_mixtos"],
+    )
+    def test_resultado_igual_al_modo_completo(
+        self, directorios_temporales, contenido_csv_ejemplo, tamanio_batch, filas_extra
+    ):
+        """Verifica que el modo streaming produce las mismas filas que el modo completo."""
+        dir_raw, dir_clean = directorios_temporales
+        fecha_ejecucion = date(2025, 12, 1)
+        (dir_raw / "transactions_20251201.csv").write_text(contenido_csv_ejemplo + filas_extra)
+
+        ruta_completa = clean_daily_transactions(
+            fecha_ejecucion, dir_raw, dir_clean, clean_template="completo_{ds_nodash}.parquet"
+        )
+        ruta_streaming = clean_daily_transactions(
+            fecha_ejecucion, dir_raw, dir_clean, batch_size=tamanio_batch
+        )
+
+        esperado = pd.read_parquet(ruta_completa).reset_index(drop=True)
+        resultado = pd.read_parquet(ruta_streaming).reset_index(drop=True)
+
+        pd.testing.assert_frame_equal(resultado, esperado)
+        assert list(resultado["transaction_id"]) == [1, 2, 7]
+
+    def test_tipos_compactos_igual_al_modo_completo(
+        self, directorios_temporales, contenido_csv_ejemplo
+    ):
+        """Verifica que compact_types da el mismo esquema y filas en streaming y modo completo."""
+        dir_raw, dir_clean = directorios_temporales
+        fecha_ejecucion = date(2025, 12, 1)
+        (dir_raw / "transactions_20251201.csv").write_text(contenido_csv_ejemplo)
+
+        ruta_completa = clean_daily_transactions(
+            fecha_ejecucion,
+            dir_raw,
+            dir_clean,
+            clean_template="completo_{ds_nodash}.parquet",
+            compact_types=True,
+        )
+        ruta_streaming = clean_daily_transactions(
+            fecha_ejecucion, dir_raw, dir_clean, batch_size=2, compact_types=True
+        )
+
+        esperado = pq.read_table(ruta_completa)
+        resultado = pq.read_table(ruta_streaming)
+        assert resultado.schema == esperado.schema
+        assert resultado.to_pylist() == esperado.to_pylist()
+
+    def test_un_row_group_por_batch(self, directorios_temporales, contenido_csv_ejemplo):
+        """Verifica que cada batch con filas válidas se escribe como un row group."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(contenido_csv_ejemplo)
+
+        ruta_salida = clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, dir_clean, batch_size=2
+        )
+
+        # Batches: [1, 2], [3, 1dup], [5, 6], [2dup, 7] -> solo el 1ro y el 4to tienen filas
+        assert pq.ParquetFile(ruta_salida).num_row_groups == 2
+
+    @pytest.mark.parametrize("tamanio_batch", [1, 3, 100], ids=["1", "3", "100"])
+    def test_huellas_ocupan_8_bytes_por_fila_distinta(
+        self, directorios_temporales, contenido_csv_ejemplo, tamanio_batch
+    ):
+        """Verifica que las huellas vistas ocupan 8 bytes por fila distinta, sin importar el batch."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(
+            contenido_csv_ejemplo + "1,1001,250.50,completed,2025-12-01 08:10:00\n"
+        )
+        metricas = StageMetrics(stage="bronze")
+
+        clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, dir_clean, batch_size=tamanio_batch, metrics=metricas
+        )
+
+        # 9 filas, 3 duplicados -> 6 filas distintas
+        assert metricas.dropped["duplicate"] == 3
+        assert metricas.details["fingerprint_bytes"] == 6 * 8
+
+    def test_row_group_size_del_perfil(self, directorios_temporales, contenido_csv_ejemplo):
+        """Verifica que el row_group_size del perfil parte cada batch en row groups."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(contenido_csv_ejemplo)
+
+        ruta_salida = clean_daily_transactions(
+            date(2025, 12, 1),
+            dir_raw,
+            dir_clean,
+            batch_size=100,
+            parquet_profile=WriterProfile(row_group_size=1),
+        )
+
+        assert pq.ParquetFile(ruta_salida).metadata.num_row_groups == 3
+
+    def test_archivo_solo_encabezado(self, directorios_temporales):
+        """Verifica que un archivo sin filas genera un parquet vacío con el schema esperado."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(
+            "transaction_id,customer_id,amount,status,transaction_ts\n"
+        )
+
+        ruta_salida = clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, dir_clean, batch_size=10
+        )
+        df = pd.read_parquet(ruta_salida)
+
+        assert len(df) == 0
+        assert "transaction_date" in df.columns
+
+    def test_cuarentena_igual_al_modo_completo(
+        self, directorios_temporales, contenido_csv_ejemplo
+    ):
+        """Verifica que el modo streaming escribe los mismos rechazos que el modo completo."""
+        dir_raw, dir_clean = directorios_temporales
+        fecha_ejecucion = date(2025, 12, 1)
+        (dir_raw / "transactions_20251201.csv").write_text(contenido_csv_ejemplo)
+
+        clean_daily_transactions(
+            fecha_ejecucion,
+            dir_raw,
+            dir_clean,
+            clean_template="completo_{ds_nodash}.parquet",
+            rejected_template="completo_{ds_nodash}_rejected.parquet",
+        )
+        clean_daily_transactions(fecha_ejecucion, dir_raw, dir_clean, batch_size=2)
+
+        esperado = pq.read_table(dir_clean / "completo_20251201_rejected.parquet")
+        resultado = pq.read_table(dir_clean / "transactions_20251201_rejected.parquet")
+
+        assert resultado.to_pylist() == esperado.to_pylist()
+        assert resultado.column("transaction_id").to_pylist() == [3, 5, 6]
+
+    def test_layout_particionado(self, directorios_temporales, contenido_csv_ejemplo):
+        """Verifica que el modo streaming también escribe el dataset particionado."""
+        dir_raw, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(contenido_csv_ejemplo)
+
+        clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, dir_clean, batch_size=2, layout="partitioned"
+        )
+        df = pd.read_parquet(dir_clean)
+
+        assert sorted(df["transaction_id"]) == [1, 2, 7]
+        assert list(dir_clean.glob("transaction_date=2025-12-01/part-20251201-*.parquet"))
+
+
+class TestCleanDailyTransactionsShards:
+    """Tests de integración para los días partidos en shards comprimidos."""
+
+    @pytest.fixture
+    def directorios_temporales(self):
+        """Crea directorios temporales para datos crudos y limpios."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dir_raw = Path(tmpdir) / "raw"
+            dir_clean = Path(tmpdir) / "clean"
+            dir_raw.mkdir()
+            yield dir_raw, dir_clean
+
+    @pytest.fixture
+    def filas_por_shard(self):
+        """Retorna las filas de tres shards, con duplicados dentro y entre shards."""
+        return [
+            [
+                "1,1001,250.50,completed,2025-12-01 08:10:00,web",
+                "2,1002,99.99,Completed,2025-12-01 09:45:00,app",
+                "1,1001,250.50,completed,2025-12-01 08:10:00,web",
+            ],
+            [
+                "3,1003,,failed,2025-12-01 11:00:00,web",
+                "2,1002,99.99,Completed,2025-12-01 09:45:00,app",
+                "4,1004,17.40,  PENDING ,2025-12-01 12:30:00,",
+            ],
+            [
+                "3,1003,,failed,2025-12-01 11:00:00,web",
+                "2,1002,99.99,completed,2025-12-01 09:45:00,app",
+                "5,1005,10.00,failed,no_es_timestamp,app",
+            ],
+        ]
+
+    @staticmethod
+    def _escribir_shard(ruta: Path, filas: list[str]) -> None:
+        contenido = "﻿Transaction_ID,customer_id,amount,status,transaction_ts,canal\n"
+        contenido += "".join(f"{fila}\n" for fila in filas)
+        compresion = {".gz": "gzip", ".zst": "zstd"}.get(ruta.suffix)
+        with pa.output_stream(str(ruta), compression=compresion) as salida:
+            salida.write(contenido.encode("utf-8"))
+
+    @pytest.mark.parametrize("procesos", [1, 2], ids=["en_serie", "en_paralelo"])
+    def test_resultado_igual_al_archivo_unico(
+        self, directorios_temporales, filas_por_shard, procesos
+    ):
+        """Verifica que los shards .csv, .gz y .zst dan el mismo resultado que un solo CSV."""
+        dir_raw, dir_clean = directorios_temporales
+        dir_unico = dir_raw / "unico"
+        dir_unico.mkdir()
+        self._escribir_shard(
+            dir_unico / "transactions_20251201.csv", sum(filas_por_shard, [])
+        )
+        for nombre, filas in zip(("1.csv", "2.csv.gz", "10.csv.zst"), filas_por_shard):
+            self._escribir_shard(dir_raw / f"transactions_20251201_{nombre}", filas)
+        metricas = StageMetrics(stage="bronze")
+
+        clean_daily_transactions(
+            date(2025, 12, 1),
+            dir_raw,
+            dir_clean,
+            engine="pandas",
+            metrics=metricas,
+            shard_workers=procesos,
+        )
+        clean_daily_transactions(
+            date(2025, 12, 1),
+            dir_unico,
+            dir_clean,
+            clean_template="unico_{ds_nodash}_clean.parquet",
+            rejected_template="unico_{ds_nodash}_rejected.parquet",
+            engine="arrow",
+        )
+
+        for nombre in ("{}_clean.parquet", "{}_rejected.parquet"):
+            shards = pq.read_table(dir_clean / nombre.format("transactions_20251201"))
+            unico = pq.read_table(dir_clean / nombre.format("unico_20251201"))
+            assert shards.equals(unico)
+        assert metricas.rows_read == 9
+        assert metricas.dropped["duplicate"] == 3
+        assert metricas.details["raw_files"] == 3
+
+    def test_shards_en_orden_natural(self, directorios_temporales):
+        """Verifica que el shard 10 va después del 9 y que el CSV único tiene prioridad."""
+        dir_raw, _ = directorios_temporales
+        for nombre in ("10.csv.zst", "9.csv.gz", "1.csv", "1.json"):
+            (dir_raw / f"transactions_20251201_{nombre}").touch()
+
+        assert [ruta.name for ruta in raw_input_files(dir_raw, "20251201")] == [
+            "transactions_20251201_1.csv",
+            "transactions_20251201_9.csv.gz",
+            "transactions_20251201_10.csv.zst",
+        ]
+        (dir_raw / "transactions_20251201.csv").touch()
+        assert raw_input_files(dir_raw, "20251201") == [dir_raw / "transactions_20251201.csv"]
+
+    def test_columnas_distintas_entre_shards_lanza_error(self, directorios_temporales):
+        """Verifica que un shard con otro encabezado falla el día en vez de mezclar columnas."""
+        dir_raw, dir_clean = directorios_temporales
+        self._escribir_shard(dir_raw / "transactions_20251201_1.csv", [])
+        (dir_raw / "transactions_20251201_2.csv").write_text(
+            "transaction_id,customer_id,amount,status\n1,1001,2.50,completed\n"
+        )
+
+        with pytest.raises(ValueError, match="transactions_20251201_2.csv"):
+            clean_daily_transactions(date(2025, 12, 1), dir_raw, dir_clean, shard_workers=1)
+
+
+class TestCleanDailyTransactionsChunks:
+    """Tests para la limpieza por chunks de bytes de un mismo día (tasks mapeadas)."""
+
+    @pytest.fixture
+    def directorios_temporales(self):
+        """Crea directorios temporales para datos crudos, chunks y limpios."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dir_raw = Path(tmpdir) / "raw"
+            dir_raw.mkdir()
+            yield dir_raw, Path(tmpdir) / "chunks", Path(tmpdir) / "clean"
+
+    @pytest.fixture
+    def contenido_csv_ejemplo(self):
+        """Retorna un CSV con duplicados lejanos entre sí y filas rechazadas."""
+        return (
+            "﻿Transaction_ID,customer_id,amount,status,transaction_ts,canal\n"
+            "1,1001,250.50,completed,2025-12-01 08:10:00,web\n"
+            "2,1002,99.99,Completed,2025-12-01 09:45:00,app\n"
+            "3,1003,,failed,2025-12-01 11:00:00,web\n"
+            "1,1001,250.50,completed,2025-12-01 08:10:00,web\n"
+            "5,1004,17.40,desconocido,2025-12-01 12:30:00,\n"
+            "6,1005,62.10,pending,no_es_timestamp,app\n"
+            "3,1003,,failed,2025-12-01 11:00:00,web\n"
+            "2,1002,99.99,Completed,2025-12-01 09:45:00,app\n"
+            "7,1006,10.00,FAILED,2025-12-01 14:00:00,web"
+        )
+
+    @pytest.mark.parametrize(
+        "bytes_por_chunk, cantidad_esperada",
+        [(1, 9), (60, 5), (10_000, 1)],
+        ids=["una_linea_por_chunk", "varias_lineas", "un_solo_chunk"],
+    )
+    def test_chunks_cubren_el_archivo_en_lineas_completas(
+        self, directorios_temporales, contenido_csv_ejemplo, bytes_por_chunk, cantidad_esperada
+    ):
+        """Verifica que los chunks no se solapan, cortan en fin de línea y suman todo el CSV."""
+        dir_raw, _, _ = directorios_temporales
+        ruta = dir_raw / "transactions_20251201.csv"
+        ruta.write_text(contenido_csv_ejemplo, encoding="utf-8")
+        datos = ruta.read_bytes()
+
+        chunks = raw_chunks(dir_raw, "20251201", bytes_por_chunk)
+
+        assert chunks[0].start == datos.index(b"\n") + 1
+        assert chunks[-1].end == len(datos)
+        for anterior, siguiente in zip(chunks, chunks[1:]):
+            assert anterior.end == siguiente.start
+            assert datos[anterior.end - 1 : anterior.end] == b"\n"
+        assert len(chunks) == cantidad_esperada
+
+    @pytest.mark.parametrize("bytes_por_chunk", [1, 100, 10_000], ids=str)
+    def test_merge_igual_a_una_sola_task(
+        self, directorios_temporales, contenido_csv_ejemplo, bytes_por_chunk
+    ):
+        """Verifica que limpiar los chunks por separado y unirlos escribe los mismos bytes."""
+        dir_raw, dir_chunks, dir_clean = directorios_temporales
+        (dir_raw / "transactions_20251201.csv").write_text(contenido_csv_ejemplo, encoding="utf-8")
+        chunks = raw_chunks(dir_raw, "20251201", bytes_por_chunk)
+        # Cada chunk pasa por un dict, como en el XCom de la task mapeada
+        rutas = [
+            clean_raw_chunk(RawChunk.from_dict(chunk.to_dict()), dir_chunks, indice)
+            for indice, chunk in enumerate(chunks)
+        ]
+        metricas = StageMetrics(stage="bronze")
+
+        clean_daily_transactions(
+            date(2025, 12, 1), dir_raw, dir_clean, metrics=metricas, chunk_paths=rutas
+        )
+        clean_daily_transactions(
+            date(2025, 12, 1),
+            dir_raw,
+            dir_clean,
+            clean_template="unico_{ds_nodash}_clean.parquet",
+            rejected_template="unico_{ds_nodash}_rejected.parquet",
+            engine="arrow",
+        )
+
+        for nombre in ("{}_clean.parquet", "{}_rejected.parquet"):
+            assert (dir_clean / nombre.format("transactions_20251201")).read_bytes() == (
+                dir_clean / nombre.format("unico_20251201")
+            ).read_bytes()
+        assert (metricas.rows_read, metricas.dropped["duplicate"]) == (9, 3)
+        assert metricas.details["chunks"] == len(chunks)
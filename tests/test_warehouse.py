@@ -0,0 +1,130 @@
+"""Tests unitarios para la carga de tablas Arrow en el warehouse DuckDB."""
+
+from __future__ import annotations
+
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+import duckdb
+import pyarrow as pa
+import pytest
+
+from src.cleaning import STATUS_ARROW_TYPE
+from src.warehouse import BRONZE_TABLE, STATUS_ENUM, load_clean_table
+
+
+@pytest.fixture
+def conexion():
+    """Abre un warehouse DuckDB en un directorio temporal."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with duckdb.connect(str(Path(tmpdir) / "warehouse.duckdb")) as con:
+            yield con
+
+
+def _tabla_limpia(ids: list[int]) -> pa.Table:
+    """Tabla con el schema que produce clean_daily_transactions."""
+    return pa.table(
+        {
+            "transaction_id": pa.array(ids, pa.int64()),
+            "customer_id": pa.array([1000 + i for i in ids], pa.int64()),
+            "amount": pa.array([10.0 * i for i in ids], pa.float64()),
+            "status": pa.array(["completed"] * len(ids)).cast(STATUS_ARROW_TYPE),
+            "transaction_ts": pa.array(
+                [datetime(2025, 12, 1, 8, i) for i in ids], pa.timestamp("ns")
+            ),
+            "transaction_date": pa.array([date(2025, 12, 1)] * len(ids), pa.date32()),
+            "canal": pa.array(["web"] * len(ids)),
+        }
+    )
+
+
+class TestLoadCleanTable:
+    """Tests unitarios para load_clean_table."""
+
+    def test_carga_las_filas_del_dia(self, conexion):
+        """Verifica que se cargan las filas con sus tipos y el ds_nodash del día."""
+        filas = load_clean_table(conexion, "20251201", _tabla_limpia([1, 2]))
+
+        assert filas == 2
+        assert conexion.execute(
+            f"SELECT transaction_id, amount, status, transaction_ts, ds_nodash FROM {BRONZE_TABLE}"
+        ).fetchall() == [
+            (1, 10.0, "completed", datetime(2025, 12, 1, 8, 1), "20251201"),
+            (2, 20.0, "completed", datetime(2025, 12, 1, 8, 2), "20251201"),
+        ]
+        # status queda con el mismo ENUM que le da stg_transactions
+        assert conexion.execute(
+            "SELECT data_type FROM information_schema.columns "
+            f"WHERE table_name = '{BRONZE_TABLE}' AND column_name = 'status'"
+        ).fetchone() == (STATUS_ENUM,)
+
+    def test_recarga_reemplaza_solo_el_dia(self, conexion):
+        """Verifica que volver a cargar un día reemplaza sus filas sin tocar otros días."""
+        load_clean_table(conexion, "20251201", _tabla_limpia([1, 2]))
+        load_clean_table(conexion, "20251202", _tabla_limpia([3]))
+
+        load_clean_table(conexion, "20251201", _tabla_limpia([4]))
+
+        assert conexion.execute(
+            f"SELECT ds_nodash, list(transaction_id ORDER BY transaction_id) "
+            f"FROM {BRONZE_TABLE} GROUP BY ALL ORDER BY ds_nodash"
+        ).fetchall() == [("20251201", [4]), ("20251202", [3])]
+
+    def test_error_no_deja_el_dia_a_medias(self, conexion):
+        """Verifica que si la carga falla se conservan las filas anteriores del día."""
+        load_clean_table(conexion, "20251201", _tabla_limpia([1, 2]))
+
+        with pytest.raises(duckdb.Error):
+            load_clean_table(conexion, "20251201", _tabla_limpia([5]).drop_columns(["amount"]))
+
+        assert conexion.execute(f"SELECT count(*) FROM {BRONZE_TABLE}").fetchone() == (2,)
+
+    def test_tabla_compacta_crea_tipos_compactos(self, conexion):
+        """Verifica que una tabla con amount decimal crea la tabla con DECIMAL e INTEGER."""
+        tabla = _tabla_limpia([1]).cast(
+            _tabla_limpia([1])
+            .schema.set(0, pa.field("transaction_id", pa.int32()))
+            .set(1, pa.field("customer_id", pa.int32()))
+            .set(2, pa.field("amount", pa.decimal128(18, 2)))
+        )
+
+        load_clean_table(conexion, "20251201", tabla)
+
+        tipos = dict(
+            conexion.execute(
+                f"SELECT column_name, data_type FROM information_schema.columns "
+                f"WHERE table_name = '{BRONZE_TABLE}'"
+            ).fetchall()
+        )
+        assert tipos["transaction_id"] == "INTEGER"
+        assert tipos["amount"] == "DECIMAL(18,2)"
+        assert conexion.execute(f"SELECT amount FROM {BRONZE_TABLE}").fetchone() == (
+            Decimal("10.00"),
+        )
+
+    def test_dia_con_ids_int64_ensancha_la_tabla_compacta(self, conexion):
+        """Verifica que un día con IDs int64 pasa a BIGINT la columna creada como INTEGER."""
+        esquema = _tabla_limpia([1]).schema.set(2, pa.field("amount", pa.decimal128(18, 2)))
+        angosta = esquema.set(0, pa.field("transaction_id", pa.int32())).set(
+            1, pa.field("customer_id", pa.int32())
+        )
+        load_clean_table(conexion, "20251201", _tabla_limpia([1]).cast(angosta))
+
+        ancha = _tabla_limpia([1]).set_column(
+            0, "transaction_id", pa.array([3000000000], pa.int64())
+        )
+        load_clean_table(conexion, "20251202", ancha.cast(esquema.set(1, angosta.field(1))))
+
+        tipos = dict(
+            conexion.execute(
+                f"SELECT column_name, data_type FROM information_schema.columns "
+                f"WHERE table_name = '{BRONZE_TABLE}'"
+            ).fetchall()
+        )
+        assert tipos["transaction_id"] == "BIGINT"
+        assert tipos["customer_id"] == "INTEGER"
+        assert conexion.execute(
+            f"SELECT list(transaction_id ORDER BY ds_nodash) FROM {BRONZE_TABLE}"
+        ).fetchone() == ([1, 3000000000],)
@@ -0,0 +1,61 @@
+"""Tests unitarios para los perfiles de escritura parquet de la capa Bronze."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.writer_profiles import WRITER_PROFILES, WriterProfile, writer_profile
+
+
+class TestWriterProfile:
+    """Tests unitarios para WriterProfile y writer_profile."""
+
+    def test_perfil_default_no_cambia_los_escritores(self):
+        """Verifica que el perfil default deja las opciones por defecto de pyarrow y DuckDB."""
+        perfil = WRITER_PROFILES["default"]
+
+        assert perfil.pyarrow_options() == {}
+        assert perfil.duckdb_options() == ""
+        assert perfil.row_group_size is None
+
+    def test_opciones_de_un_perfil_completo(self):
+        """Verifica la traducción de un perfil a opciones de pyarrow y de COPY de DuckDB."""
+        perfil = WriterProfile(
+            compression="none",
+            compression_level=1,
+            row_group_size=1000,
+            use_dictionary=False,
+            write_statistics=False,
+            page_index=True,
+        )
+
+        assert perfil.pyarrow_options() == {
+            "compression": "none",
+            "compression_level": 1,
+            "use_dictionary": False,
+            "write_statistics": False,
+            "write_page_index": True,
+        }
+        assert perfil.duckdb_options() == (
+            ", COMPRESSION uncompressed, COMPRESSION_LEVEL 1"
+            ", ROW_GROUP_SIZE 1000, DICTIONARY_SIZE_LIMIT 0"
+        )
+
+    @pytest.mark.parametrize(
+        "argumentos",
+        [{"compression": "bzip2"}, {"row_group_size": 0}],
+        ids=["codec_desconocido", "row_group_vacio"],
+    )
+    def test_perfil_invalido_lanza_error(self, argumentos):
+        """Verifica que un codec o un tamaño de row group inválido lanza ValueError."""
+        with pytest.raises(ValueError):
+            WriterProfile(**argumentos)
+
+    def test_resuelve_nombres_e_instancias(self):
+        """Verifica que writer_profile resuelve nombres y deja pasar instancias."""
+        perfil = WriterProfile(compression="lz4")
+
+        assert writer_profile("clustered") is WRITER_PROFILES["clustered"]
+        assert writer_profile(perfil) is perfil
+        with pytest.raises(ValueError, match="Unknown writer profile"):
+            writer_profile("turbo")